@@ -0,0 +1,93 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+
+import time
+_process_start = time.perf_counter()
+
+import argparse
+from datetime import datetime
+from dotenv import load_dotenv
+from src.daemon import AuditDaemon, DaemonUnavailable, request
+
+def _print_outcome(outcome: dict) -> None:
+    print(f"Audit {outcome['audit_id']}: {outcome['status']}")
+    if outcome.get("overall_score") is not None:
+        print(f"Overall Score: {outcome['overall_score']}")
+    if outcome.get("error"):
+        print(f"Error: {outcome['error']}")
+    print(f"Results written to {outcome['output_dir']}")
+
+def _audit(args) -> int:
+    job = {
+        "audit_id": args.audit_id or datetime.now().strftime("audit_%Y%m%d_%H%M%S"),
+        "repo_url": args.repo_url,
+        "pdf_path": str(os.path.abspath(args.pdf_path)),
+        "rubric_path": os.path.abspath(args.rubric) if args.rubric else None,
+    }
+    output_dir = os.path.abspath(args.output_dir)
+
+    if not args.in_process:
+        try:
+            response = request({"op": "audit", "job": job, "output_dir": output_dir}, args.socket)
+        except DaemonUnavailable:
+            print("No audit daemon running; running in-process (cold start).")
+        else:
+            if not response.get("ok"):
+                print(f"Daemon error: {response.get('error')}")
+                return 1
+            _print_outcome(response["outcome"])
+            total = time.perf_counter() - _process_start
+            print(f"Warm start (daemon): {total:.1f}s total, {response['server_time_s']:.1f}s in the audit, "
+                  f"{total - response['server_time_s']:.1f}s startup/transport")
+            return 0 if response["outcome"]["status"] == "succeeded" else 1
+
+    from src.batch import AuditJob, get_graph, run_audit_job
+    get_graph()
+    audit_start = time.perf_counter()
+    outcome = run_audit_job(AuditJob(**job), output_dir).model_dump()
+    _print_outcome(outcome)
+    total = time.perf_counter() - _process_start
+    print(f"Cold start (in-process): {total:.1f}s total, {time.perf_counter() - audit_start:.1f}s in the audit, "
+          f"{audit_start - _process_start:.1f}s startup (models load lazily inside the audit)")
+    return 0 if outcome["status"] == "succeeded" else 1
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Warm audit daemon and its one-shot client.")
+    parser.add_argument("--socket", default=None, help="Unix socket path (defaults to AUDITOR_DAEMON_SOCKET)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("serve", help="Preload models and serve audit jobs until stopped")
+    sub.add_parser("ping", help="Show whether a daemon is running")
+    sub.add_parser("stop", help="Stop the running daemon")
+
+    audit = sub.add_parser("audit", help="Run one audit, through the daemon if it is running")
+    audit.add_argument("repo_url")
+    audit.add_argument("pdf_path")
+    audit.add_argument("--rubric", default=None, help="Rubric JSON (defaults to rubric/rubric.json)")
+    audit.add_argument("--output-dir", default="audit/runs", help="Results go to <output-dir>/<audit_id>/")
+    audit.add_argument("--audit-id", default=None)
+    audit.add_argument("--in-process", action="store_true", help="Do not use the daemon")
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        daemon = AuditDaemon(args.socket)
+        daemon.start()
+        try:
+            daemon.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        return 0
+    if args.command in ("ping", "stop"):
+        try:
+            response = request({"op": "ping" if args.command == "ping" else "shutdown"}, args.socket, timeout=5)
+        except DaemonUnavailable:
+            print("No audit daemon running.")
+            return 1
+        print(response)
+        return 0
+    return _audit(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+
+import argparse
+import json
+import resource
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+import numpy as np
+
+DEFAULT_QUERIES = [
+    "How is the StateGraph wired between detectives and judges?",
+    "Which judge personas are used and how do they disagree?",
+    "How is evidence aggregated before judgement?",
+    "What does the report say about parallel execution?",
+    "Which files implement the tools?",
+    "How is the final verdict synthesized?",
+]
+
+def _load_chunks(pdf_path: str) -> List[str]:
+    from src.tools.chunking import chunk_markdown
+    from src.tools.pdf_conversion import fast_text
+    if pdf_path:
+        text = fast_text(pdf_path)
+    else:
+        text = Path("README.md").read_text(encoding="utf-8")
+    return [chunk.render() for chunk in chunk_markdown(text, max_chars=800)]
+
+def _worker(backend: str, batch_size: int, texts_file: str, out_file: str) -> None:
+    """Runs in a fresh process so load time and peak RSS belong to one backend only."""
+    from src.tools.docs_tools import build_embeddings
+    payload = json.loads(Path(texts_file).read_text(encoding="utf-8"))
+
+    start = time.perf_counter()
+    embeddings = build_embeddings(backend=backend, batch_size=batch_size)
+    embeddings.embed_query("warm up")
+    load_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    doc_vectors = np.asarray(embeddings.embed_documents(payload["chunks"]), dtype=np.float32)
+    encode_s = time.perf_counter() - start
+    query_vectors = np.asarray(embeddings.embed_documents(payload["queries"]), dtype=np.float32)
+
+    np.savez(out_file, docs=doc_vectors, queries=query_vectors)
+    # ru_maxrss is in KiB on Linux
+    print(json.dumps({
+        "load_s": round(load_s, 3),
+        "encode_s": round(encode_s, 3),
+        "chunks_per_s": round(len(payload["chunks"]) / encode_s, 1) if encode_s else None,
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }))
+
+def _top_k(docs: np.ndarray, queries: np.ndarray, k: int) -> List[set]:
+    docs = docs / np.linalg.norm(docs, axis=1, keepdims=True)
+    queries = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+    scores = queries @ docs.T
+    return [set(np.argsort(-row)[:k].tolist()) for row in scores]
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare embedding backends: throughput, peak RSS, retrieval agreement.")
+    parser.add_argument("--pdf", default="", help="Report to chunk (defaults to README.md text)")
+    parser.add_argument("--backends", default="torch,onnx,onnx-int8", help="Comma-separated backends; the first is the baseline")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--k", type=int, default=5, help="Top-k used for retrieval agreement")
+    parser.add_argument("--_worker", nargs=3, metavar=("BACKEND", "TEXTS", "OUT"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args._worker:
+        _worker(args._worker[0], args.batch_size, args._worker[1], args._worker[2])
+        return
+
+    chunks = _load_chunks(args.pdf)
+    print(f"Benchmarking {len(chunks)} chunks, {len(DEFAULT_QUERIES)} queries, batch size {args.batch_size}")
+    results: Dict[str, Dict] = {}
+    vectors: Dict[str, Dict[str, np.ndarray]] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        texts_file = Path(tmp) / "texts.json"
+        texts_file.write_text(json.dumps({"chunks": chunks, "queries": DEFAULT_QUERIES}), encoding="utf-8")
+        for backend in args.backends.split(","):
+            out_file = Path(tmp) / f"{backend}.npz"
+            proc = subprocess.run(
+                [sys.executable, __file__, "--batch-size", str(args.batch_size), "--_worker", backend, str(texts_file), str(out_file)],
+                capture_output=True, text=True
+            )
+            if proc.returncode != 0:
+                print(f"{backend}: failed\n{proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else ''}")
+                continue
+            results[backend] = json.loads(proc.stdout.strip().splitlines()[-1])
+            loaded = np.load(out_file)
+            vectors[backend] = {"docs": loaded["docs"], "queries": loaded["queries"]}
+
+    baseline = args.backends.split(",")[0]
+    print(f"\n{'backend':<12}{'load s':>9}{'chunks/s':>11}{'peak RSS MB':>13}{f'top-{args.k} agree':>14}")
+    for backend, r in results.items():
+        agreement = "-"
+        if baseline in vectors and backend != baseline:
+            ref = _top_k(vectors[baseline]["docs"], vectors[baseline]["queries"], args.k)
+            got = _top_k(vectors[backend]["docs"], vectors[backend]["queries"], args.k)
+            agreement = f"{np.mean([len(a & b) / len(a) for a, b in zip(ref, got)]):.2f}"
+        print(f"{backend:<12}{r['load_s']:>9}{r['chunks_per_s']:>11}{r['peak_rss_mb']:>13}{agreement:>14}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+
+import argparse
+import subprocess
+from typing import List, Tuple
+
+# Modules that must only be imported on first use, never at startup
+HEAVY_MODULES = [
+    "docling", "torch", "transformers", "sentence_transformers", "langchain_huggingface",
+    "fitz", "huggingface_hub", "langchain_google_genai", "langchain_openai",
+]
+
+def measure(module: str) -> Tuple[float, List[Tuple[float, str]], List[str]]:
+    """
+    Imports `module` in a fresh interpreter with -X importtime.
+    Returns (total seconds, [(cumulative seconds, module)], heavy modules loaded).
+    """
+    probe = f"import sys, {module}; print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", probe],
+        capture_output=True, text=True, check=True, cwd=os.getcwd()
+    )
+    timings = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        timings.append((int(cumulative) / 1e6, name.strip()))
+    total = next((t for t, name in reversed(timings) if name == module), 0.0)
+    heavy = [m for m in result.stdout.strip().split(",") if m]
+    return total, timings, heavy
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold-start import time of the auditor.")
+    parser.add_argument("--module", default="src.graph", help="Module to import")
+    parser.add_argument("--top", type=int, default=15, help="Slowest imports to list")
+    parser.add_argument("--max-seconds", type=float, default=None, help="Exit non-zero if the import is slower")
+    args = parser.parse_args()
+
+    total, timings, heavy = measure(args.module)
+    print(f"import {args.module}: {total:.3f}s")
+    print("\nSlowest imports (cumulative):")
+    for seconds, name in sorted(timings, reverse=True)[:args.top]:
+        print(f"  {seconds:8.3f}s  {name}")
+
+    failed = False
+    if heavy:
+        print(f"\nFAIL: heavy modules imported at startup: {', '.join(heavy)}")
+        failed = True
+    if args.max_seconds is not None and total > args.max_seconds:
+        print(f"\nFAIL: {total:.3f}s exceeds the {args.max_seconds}s budget")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
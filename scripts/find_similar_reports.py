@@ -0,0 +1,36 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+
+import argparse
+import json
+import time
+from dotenv import load_dotenv
+from src.config import corpus_index_settings
+from src.tools.corpus_index import get_corpus_index
+
+def main():
+    load_dotenv()
+    settings = corpus_index_settings()
+    parser = argparse.ArgumentParser(description="List near-duplicate reports across everything in the corpus index.")
+    parser.add_argument("--threshold", type=float, default=settings["duplicate_threshold"],
+                        help="Cosine similarity at which two chunks count as near-duplicates")
+    parser.add_argument("--min-similarity", type=float, default=settings["min_similarity"],
+                        help="Share of shared chunks at which a pair is listed")
+    parser.add_argument("--json", action="store_true", help="Print the pairs as JSON")
+    args = parser.parse_args()
+
+    index = get_corpus_index()
+    start = time.perf_counter()
+    pairs = index.similar_documents(threshold=args.threshold, min_similarity=args.min_similarity)
+    elapsed = time.perf_counter() - start
+
+    if args.json:
+        print(json.dumps(pairs, indent=2))
+        return
+    print(f"Compared {len(index.documents())} reports in {elapsed:.2f}s; {len(pairs)} similar pairs")
+    for pair in pairs:
+        print(f"{pair['similarity']:.3f}  {pair['shared_chunks']:>4} chunks  {pair['name_a']}  <->  {pair['name_b']}")
+
+if __name__ == "__main__":
+    main()
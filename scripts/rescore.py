@@ -0,0 +1,55 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+
+import argparse
+import json
+import time
+from datetime import datetime
+from dotenv import load_dotenv
+from src.rescore import SUMMARY_MODES, find_state_files, rescore_audits, rescore_store
+from src.results_store import get_results_store
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Re-apply the Chief Justice rules to stored audits without re-running detectives or judges.")
+    parser.add_argument("paths", nargs="*", help="Batch output directories and/or state.json files")
+    parser.add_argument("--from-store", action="store_true",
+                        help="Re-score audits in the results store instead of state.json files (needs --rubric)")
+    parser.add_argument("--since", default=None, help="With --from-store: only audits from this ISO date on, e.g. 2026-09-01")
+    parser.add_argument("--rubric", default=None, help="Rubric JSON whose dimensions replace the stored ones")
+    parser.add_argument("--summary", choices=SUMMARY_MODES, default="template",
+                        help="Executive summary: templated (fast), kept from the stored report, or regenerated by the LLM")
+    parser.add_argument("--output-dir", default=None, help="Write updated audits here instead of in place")
+    parser.add_argument("--update-store", action="store_true", help="Also update audits already in the results store")
+    parser.add_argument("--json", default=None, help="Also write the per-audit outcomes to this JSON file")
+    args = parser.parse_args()
+    if args.from_store and not args.rubric:
+        parser.error("--from-store needs --rubric: the results store does not keep the rubric")
+    if not args.from_store and not args.paths:
+        parser.error("give batch directories or state.json files, or --from-store")
+
+    start = time.perf_counter()
+    if args.from_store:
+        since = datetime.fromisoformat(args.since).timestamp() if args.since else None
+        outcomes = rescore_store(get_results_store(), args.rubric, summary=args.summary, since=since)
+    else:
+        outcomes = rescore_audits(find_state_files(args.paths), rubric_path=args.rubric, summary=args.summary,
+                                  output_dir=args.output_dir, store=get_results_store() if args.update_store else None)
+    elapsed = time.perf_counter() - start
+
+    failed = [o for o in outcomes if o.error]
+    changed = [o for o in outcomes if o.changed_dimensions]
+    print(f"Re-scored {len(outcomes) - len(failed)} audits in {elapsed:.2f}s "
+          f"({len(outcomes) / elapsed if elapsed else 0:.0f}/s); {len(changed)} changed, {len(failed)} failed")
+    for o in changed:
+        print(f"  {o.audit_id}: {o.old_overall_score} -> {o.new_overall_score:.2f} ({', '.join(o.changed_dimensions)})")
+    for o in failed:
+        print(f"  {o.audit_id}: {o.error}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump([o.model_dump() for o in outcomes], f, indent=2)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
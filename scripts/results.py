@@ -0,0 +1,69 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+
+import argparse
+import json
+from datetime import datetime
+from dotenv import load_dotenv
+from src.results_store import get_results_store
+
+def _since(value):
+    return datetime.fromisoformat(value).timestamp() if value else None
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Query the audit results store.")
+    parser.add_argument("--db", default=None, help="Results database (default: AUDITOR_RESULTS_DB or audit/results.db)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    show = sub.add_parser("show", help="Render one audit's Markdown report")
+    show.add_argument("audit_id")
+    show.add_argument("--out", default=None, help="Write the report here instead of stdout")
+
+    find = sub.add_parser("find", help="List audits matching score filters, lowest first")
+    find.add_argument("--dimension", default=None, help="Filter on this dimension's final score (default: overall score)")
+    find.add_argument("--min-score", type=float, default=None)
+    find.add_argument("--max-score", type=float, default=None)
+    find.add_argument("--repo", default=None, help="Only audits of this repository URL")
+    find.add_argument("--since", default=None, help="Only audits from this ISO date on, e.g. 2026-09-01")
+
+    stats = sub.add_parser("stats", help="Per-dimension audit count and mean/min/max score")
+    stats.add_argument("--since", default=None)
+
+    pct = sub.add_parser("percentiles", help="Cohort score percentiles, and optionally one audit's rank")
+    pct.add_argument("--dimension", default=None)
+    pct.add_argument("--since", default=None)
+    pct.add_argument("--audit", default=None, help="Also print the share of the cohort at or below this audit")
+    args = parser.parse_args()
+
+    store = get_results_store(args.db)
+    if args.command == "show":
+        markdown = store.render_markdown(args.audit_id)
+        if markdown is None:
+            print(f"No audit '{args.audit_id}' in {store.db_path}")
+            return 1
+        if args.out:
+            with open(args.out, "w", encoding="utf-8") as f:
+                f.write(markdown)
+            print(f"Wrote {args.out}")
+        else:
+            print(markdown)
+    elif args.command == "find":
+        rows = store.find_audits(dimension_id=args.dimension, min_score=args.min_score, max_score=args.max_score,
+                                 repo_url=args.repo, since=_since(args.since))
+        for row in rows:
+            print(f"{row['audit_id']}\t{row['score']:g}\t{row['repo_url']}\t{row['commit_sha'] or '-'}")
+        print(f"{len(rows)} audits")
+    elif args.command == "stats":
+        for row in store.dimension_summary(since=_since(args.since)):
+            print(f"{row['dimension_id']}\tn={row['audits']}\tmean={row['mean']:.2f}\tmin={row['min']}\tmax={row['max']}")
+    else:
+        print(json.dumps(store.percentiles(dimension_id=args.dimension, since=_since(args.since))))
+        if args.audit:
+            rank = store.percentile_rank(args.audit, dimension_id=args.dimension, since=_since(args.since))
+            print(f"{args.audit}: {'not found' if rank is None else f'{rank}th percentile'}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
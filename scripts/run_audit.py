@@ -2,13 +2,18 @@ import sys
 import os
 sys.path.append(os.getcwd())
 
+from datetime import datetime
+from dotenv import load_dotenv
 from src.graph import build_graph
 from src.state import AgentState
+from src.tools.docs_tools import wait_for_rag_upgrades
 
 def main():
+    load_dotenv()
     graph = build_graph()
 
     initial_state: AgentState = {
+        "audit_id": datetime.now().strftime("audit_%Y%m%d_%H%M%S"),
         "repo_url": "https://github.com/yosef-zewdu/Digital-Courtroom.git",
         "pdf_path": "reports/Architecture_Report.md.pdf",
         "rubric_dimensions": [],
@@ -19,6 +24,8 @@ def main():
 
     print("--- Running The Automaton Auditor (Synchronous) ---")
     final_state = graph.invoke(initial_state)
+    # Let a background layout conversion finish and reach the cache before exiting
+    wait_for_rag_upgrades()
 
     print("\n" + "="*50)
     print("      THE DIGITAL COURTROOM: TRIAL LOG")
@@ -66,6 +73,7 @@ def main():
         print("="*50)
         print(f"Overall Score: {final_state['final_report'].overall_score}")
         print(f"Summary: {final_state['final_report'].executive_summary[:500]}...")
+        print(f"Full report: python scripts/results.py show {initial_state['audit_id']}")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,48 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+
+import argparse
+from dotenv import load_dotenv
+from src.batch import load_manifest, new_run_id, run_batch
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Run The Automaton Auditor over a cohort manifest (CSV or JSONL).")
+    parser.add_argument("manifest", help="CSV/JSONL with repo_url, pdf_path and optional rubric_path, audit_id")
+    parser.add_argument("--output-dir", default=None, help="Where per-audit results and the summary are written")
+    parser.add_argument("--workers", type=int, default=4, help="Number of worker processes")
+    parser.add_argument("--llm-concurrency", type=int, default=8, help="Max concurrent LLM calls across all workers")
+    parser.add_argument("--retries", type=int, default=2, help="Retries per failed audit")
+    parser.add_argument("--cache-dir", default=None, help="Shared cache directory (defaults to AUDITOR_CACHE_DIR)")
+    parser.add_argument("--summary", choices=("llm", "template"), default=None,
+                        help="Executive summaries: LLM-written, or templated without any LLM call (fast bulk runs)")
+    args = parser.parse_args()
+
+    run_id = new_run_id()
+    output_dir = args.output_dir or f"audit/batch_{run_id}"
+    jobs = load_manifest(args.manifest, run_id=run_id)
+
+    print(f"--- Running batch of {len(jobs)} audits with {args.workers} workers ---")
+    summary = run_batch(
+        jobs,
+        output_dir,
+        workers=args.workers,
+        llm_concurrency=args.llm_concurrency,
+        max_retries=args.retries,
+        cache_dir=args.cache_dir,
+        summary_mode=args.summary
+    )
+
+    print("\n" + "="*50)
+    print("      BATCH SUMMARY")
+    print("="*50)
+    print(f"Succeeded: {summary['succeeded']}/{summary['total']} (retried: {summary['retried']})")
+    print(f"Wall time: {summary['wall_time_s']}s")
+    print(f"Throughput: {summary['throughput_audits_per_hour']} audits/hour")
+    if summary.get("similar_report_pairs"):
+        print(f"Similar reports: {summary['similar_report_pairs']} pairs (see similar_reports.json)")
+    print(f"Results written to {output_dir}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import threading
+import time
+from typing import Any, Dict
+from langchain_core.callbacks import BaseCallbackHandler
+
+
+class AgentMetrics(BaseCallbackHandler):
+    """
+    Callback that measures one forensic investigation (one rubric dimension):
+    LLM turns, tool calls, token usage and the latency spent in each.
+    Pass it in the run config: {"callbacks": [metrics]}.
+    """
+
+    def __init__(self, mode: str = "react"):
+        self.mode = mode
+        self.llm_calls = 0
+        self.tool_calls = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.llm_latency_s = 0.0
+        self.tool_latency_s = 0.0
+        # Estimated prompt tokens across all turns, before/after context compaction
+        self.prompt_tokens_before_compaction = 0
+        self.prompt_tokens_after_compaction = 0
+        self._started_at = time.perf_counter()
+        self._llm_starts: Dict[Any, float] = {}
+        self._tool_starts: Dict[Any, float] = {}
+        self._lock = threading.Lock()
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs) -> None:
+        with self._lock:
+            self._llm_starts[run_id] = time.perf_counter()
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs) -> None:
+        with self._lock:
+            self._llm_starts[run_id] = time.perf_counter()
+
+    def on_llm_end(self, response, *, run_id, **kwargs) -> None:
+        input_tokens = output_tokens = 0
+        for generations in response.generations:
+            for gen in generations:
+                usage = getattr(getattr(gen, "message", None), "usage_metadata", None) or {}
+                input_tokens += usage.get("input_tokens", 0)
+                output_tokens += usage.get("output_tokens", 0)
+        with self._lock:
+            self.llm_calls += 1
+            self.input_tokens += input_tokens
+            self.output_tokens += output_tokens
+            start = self._llm_starts.pop(run_id, None)
+            if start is not None:
+                self.llm_latency_s += time.perf_counter() - start
+
+    def on_llm_error(self, error, *, run_id, **kwargs) -> None:
+        with self._lock:
+            self._llm_starts.pop(run_id, None)
+
+    def on_tool_start(self, serialized, input_str, *, run_id, **kwargs) -> None:
+        with self._lock:
+            self.tool_calls += 1
+            self._tool_starts[run_id] = time.perf_counter()
+
+    def on_tool_end(self, output, *, run_id, **kwargs) -> None:
+        self._finish_tool(run_id)
+
+    def on_tool_error(self, error, *, run_id, **kwargs) -> None:
+        self._finish_tool(run_id)
+
+    def _finish_tool(self, run_id) -> None:
+        with self._lock:
+            start = self._tool_starts.pop(run_id, None)
+            if start is not None:
+                self.tool_latency_s += time.perf_counter() - start
+
+    def record_compaction(self, tokens_before: int, tokens_after: int) -> None:
+        with self._lock:
+            self.prompt_tokens_before_compaction += tokens_before
+            self.prompt_tokens_after_compaction += tokens_after
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "mode": self.mode,
+                "llm_calls": self.llm_calls,
+                "tool_calls": self.tool_calls,
+                "input_tokens": self.input_tokens,
+                "output_tokens": self.output_tokens,
+                "prompt_tokens_before_compaction": self.prompt_tokens_before_compaction,
+                "prompt_tokens_after_compaction": self.prompt_tokens_after_compaction,
+                "llm_latency_s": round(self.llm_latency_s, 3),
+                "tool_latency_s": round(self.tool_latency_s, 3),
+                "wall_time_s": round(time.perf_counter() - self._started_at, 3),
+            }
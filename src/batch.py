@@ -0,0 +1,305 @@
+import csv
+import json
+import multiprocessing
+import os
+import re
+import time
+import traceback
+import uuid
+from concurrent.futures import FIRST_COMPLETED, Executor, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel, Field
+
+# Graph is compiled once per worker process and reused for every job it runs
+_graph = None
+
+
+class AuditJob(BaseModel):
+    audit_id: str
+    repo_url: str
+    pdf_path: str
+    rubric_path: Optional[str] = None
+
+
+class AuditOutcome(BaseModel):
+    audit_id: str
+    repo_url: str
+    status: str = Field(description="'succeeded' or 'failed'")
+    attempts: int = 1
+    overall_score: Optional[float] = None
+    duration_s: float = 0.0
+    error: Optional[str] = None
+    output_dir: Optional[str] = None
+
+
+def _slugify(value: str) -> str:
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", value.rstrip("/").removesuffix(".git").split("/")[-1])
+    return slug.strip("_") or "audit"
+
+
+def new_run_id() -> str:
+    """Timestamp plus a random suffix, unique across batch runs and terms."""
+    return f"{time.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+
+
+def load_manifest(manifest_path: str, run_id: Optional[str] = None) -> List[AuditJob]:
+    """
+    Loads a batch manifest. Supports CSV (header row) and JSONL.
+    Required fields: repo_url, pdf_path. Optional: rubric_path, audit_id.
+    Rows without an audit_id get "<run_id>_<row>_<repo>", so ids stay unique
+    in the shared results store across runs.
+    """
+    run_id = run_id or new_run_id()
+    path = Path(manifest_path)
+    if path.suffix.lower() == ".csv":
+        with open(path, newline="", encoding="utf-8") as f:
+            rows = [row for row in csv.DictReader(f)]
+    else:
+        with open(path, encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+
+    jobs = []
+    for index, row in enumerate(rows):
+        row = {k: (v.strip() if isinstance(v, str) else v) for k, v in row.items() if v not in (None, "")}
+        if "repo_url" not in row or "pdf_path" not in row:
+            raise ValueError(f"Manifest row {index + 1} is missing repo_url or pdf_path")
+        row.setdefault("audit_id", f"{run_id}_{index + 1:04d}_{_slugify(row['repo_url'])}")
+        jobs.append(AuditJob(**row))
+    return jobs
+
+
+def _init_worker(llm_semaphore: Any, cache_dir: str, summary_mode: Optional[str] = None) -> None:
+    """Process-pool initializer: share caches and the global LLM limit."""
+    os.environ["AUDITOR_CACHE_DIR"] = cache_dir
+    os.environ["AUDITOR_CLONE_CACHE"] = "1"
+    if summary_mode:
+        os.environ["AUDITOR_SUMMARY_MODE"] = summary_mode
+    from src.llm_factory import set_llm_semaphore
+    set_llm_semaphore(llm_semaphore)
+
+
+def _serialize_state(state: Dict) -> Dict:
+    """Converts the final graph state into plain JSON (evidence, opinions, report)."""
+    report = state.get("final_report")
+    return {
+        "repo_url": state.get("repo_url"),
+        "pdf_path": state.get("pdf_path"),
+        "rubric_dimensions": state.get("rubric_dimensions", []),
+        "evidences": {
+            dim_id: [ev.model_dump() for ev in items]
+            for dim_id, items in state.get("evidences", {}).items()
+        },
+        "opinions": [op.model_dump() for op in state.get("opinions", [])],
+        "agent_metrics": state.get("agent_metrics", {}),
+        "repo_commits": state.get("repo_commits", {}),
+        "final_report": report.model_dump() if report else None,
+    }
+
+
+def get_graph():
+    """The compiled audit graph, built once per process."""
+    global _graph
+    if _graph is None:
+        from src.graph import build_graph
+        _graph = build_graph()
+    return _graph
+
+
+def run_audit_job(job: AuditJob, output_dir: str) -> AuditOutcome:
+    """Runs one audit end-to-end and writes its results under output_dir/<audit_id>/."""
+    from src.nodes.justice import generate_report_markdown
+    from src.tools.workspace import release_workspace
+
+    start = time.time()
+    job_dir = Path(output_dir) / job.audit_id
+    job_dir.mkdir(parents=True, exist_ok=True)
+    try:
+        final_state = get_graph().invoke({
+            "audit_id": job.audit_id,
+            "repo_url": job.repo_url,
+            "pdf_path": job.pdf_path,
+            "rubric_path": job.rubric_path,
+            "rubric_dimensions": [],
+            "evidences": {},
+            "opinions": [],
+            "final_report": None
+        })
+        report = final_state.get("final_report")
+        if report is None:
+            raise RuntimeError("Graph finished without a final report")
+
+        (job_dir / "state.json").write_text(json.dumps(_serialize_state(final_state), indent=2), encoding="utf-8")
+        (job_dir / "report.md").write_text(generate_report_markdown(report), encoding="utf-8")
+        # A failed earlier attempt must not make this directory look failed
+        (job_dir / "error.log").unlink(missing_ok=True)
+        return AuditOutcome(
+            audit_id=job.audit_id,
+            repo_url=job.repo_url,
+            status="succeeded",
+            overall_score=report.overall_score,
+            duration_s=time.time() - start,
+            output_dir=str(job_dir)
+        )
+    except Exception as e:
+        (job_dir / "error.log").write_text(traceback.format_exc(), encoding="utf-8")
+        return AuditOutcome(
+            audit_id=job.audit_id,
+            repo_url=job.repo_url,
+            status="failed",
+            duration_s=time.time() - start,
+            error=f"{type(e).__name__}: {e}",
+            output_dir=str(job_dir)
+        )
+    finally:
+        # Covers audits that failed before reaching the EvidenceAggregator
+        release_workspace(job.audit_id)
+
+
+def _drain(pool: Executor, jobs: List[AuditJob], output_dir: str, max_retries: int) -> List[AuditOutcome]:
+    """
+    Submits every job and collects outcomes as they finish.
+    A failed audit is resubmitted on its own (up to max_retries times);
+    the rest of the batch keeps running.
+    """
+    pending = {pool.submit(run_audit_job, job, output_dir): (job, 1) for job in jobs}
+    outcomes = []
+    while pending:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            job, attempt = pending.pop(future)
+            try:
+                outcome = future.result()
+            except Exception as e:
+                outcome = AuditOutcome(
+                    audit_id=job.audit_id,
+                    repo_url=job.repo_url,
+                    status="failed",
+                    error=f"Worker crashed: {type(e).__name__}: {e}"
+                )
+            outcome.attempts = attempt
+
+            if outcome.status == "failed" and attempt <= max_retries:
+                print(f"[batch] {job.audit_id} failed (attempt {attempt}): {outcome.error}. Retrying...")
+                pending[pool.submit(run_audit_job, job, output_dir)] = (job, attempt + 1)
+                continue
+
+            print(f"[batch] {job.audit_id} {outcome.status} in {outcome.duration_s:.1f}s "
+                  f"({len(outcomes) + 1}/{len(jobs)})")
+            outcomes.append(outcome)
+    return outcomes
+
+
+def summarize(outcomes: List[AuditOutcome], wall_time_s: float) -> Dict:
+    """Builds the combined batch summary, including throughput in audits/hour."""
+    succeeded = [o for o in outcomes if o.status == "succeeded"]
+    scores = [o.overall_score for o in succeeded if o.overall_score is not None]
+    return {
+        "total": len(outcomes),
+        "succeeded": len(succeeded),
+        "failed": len(outcomes) - len(succeeded),
+        "retried": sum(1 for o in outcomes if o.attempts > 1),
+        "wall_time_s": round(wall_time_s, 2),
+        "throughput_audits_per_hour": round(len(succeeded) / wall_time_s * 3600, 2) if wall_time_s > 0 else 0.0,
+        "mean_overall_score": round(sum(scores) / len(scores), 3) if scores else None,
+        "audits": [o.model_dump() for o in sorted(outcomes, key=lambda o: o.audit_id)],
+    }
+
+
+def find_similar_reports(jobs: List[AuditJob], cache_dir: Optional[str] = None) -> List[Dict]:
+    """
+    Near-duplicate report pairs within a cohort, from the shared corpus index
+    the workers filled while converting. Identical PDFs submitted under
+    several audits are reported with similarity 1.0.
+    """
+    from collections import defaultdict
+    from src.config import corpus_index_settings, get_cache_dir
+    from src.tools.corpus_index import get_corpus_index
+    from src.tools.docs_tools import embedding_index_key, pdf_digest
+
+    settings = corpus_index_settings()
+    audits_by_digest: Dict[str, List[str]] = defaultdict(list)
+    for job in jobs:
+        if Path(job.pdf_path).exists():
+            audits_by_digest[pdf_digest(job.pdf_path)].append(job.audit_id)
+
+    results = []
+    for digest, audit_ids in audits_by_digest.items():
+        for i, a in enumerate(audit_ids):
+            for b in audit_ids[i + 1:]:
+                results.append({"audit_a": a, "audit_b": b, "similarity": 1.0, "shared_chunks": None, "identical_pdf": True})
+
+    root = Path(cache_dir or get_cache_dir()) / "corpus" / embedding_index_key()
+    pairs = get_corpus_index(root).similar_documents(
+        threshold=settings["duplicate_threshold"],
+        min_similarity=settings["min_similarity"],
+        doc_ids=set(audits_by_digest),
+    )
+    for pair in pairs:
+        for a in audits_by_digest[pair["doc_a"]]:
+            for b in audits_by_digest[pair["doc_b"]]:
+                results.append({"audit_a": a, "audit_b": b, "similarity": pair["similarity"],
+                                "shared_chunks": pair["shared_chunks"], "identical_pdf": False})
+    return results
+
+
+def write_summary(summary: Dict, output_dir: str) -> None:
+    """Writes summary.json plus a flat summary.csv (one row per audit)."""
+    out = Path(output_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    (out / "summary.json").write_text(json.dumps(summary, indent=2), encoding="utf-8")
+
+    fields = list(AuditOutcome.model_fields.keys())
+    with open(out / "summary.csv", "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(summary["audits"])
+
+
+def run_batch(
+    jobs: List[AuditJob],
+    output_dir: str,
+    workers: int = 4,
+    llm_concurrency: int = 8,
+    max_retries: int = 2,
+    cache_dir: Optional[str] = None,
+    summary_mode: Optional[str] = None,
+) -> Dict:
+    """
+    Runs a cohort of audits across a process pool.
+
+    All workers share one cross-process semaphore for LLM calls and one cache
+    directory (git mirrors, converted PDFs), so a repository or report that
+    appears several times in a manifest is only fetched/converted once.
+    summary_mode='template' skips the executive-summary LLM call in every audit.
+    """
+    from src.config import get_cache_dir
+    cache_dir = str(Path(cache_dir).resolve()) if cache_dir else str(get_cache_dir().resolve())
+    output_dir = str(Path(output_dir).resolve())
+
+    # spawn: workers must not inherit the parent's HTTP clients or threads
+    ctx = multiprocessing.get_context("spawn")
+    start = time.time()
+    with ctx.Manager() as manager:
+        llm_semaphore = manager.BoundedSemaphore(llm_concurrency)
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=ctx,
+            initializer=_init_worker,
+            initargs=(llm_semaphore, cache_dir, summary_mode)
+        ) as pool:
+            outcomes = _drain(pool, jobs, output_dir, max_retries)
+
+    summary = summarize(outcomes, time.time() - start)
+    similar = None
+    from src.config import corpus_index_settings
+    if corpus_index_settings()["enabled"]:
+        try:
+            similar = find_similar_reports(jobs, cache_dir)
+            summary["similar_report_pairs"] = len(similar)
+        except Exception as e:
+            print(f"Warning: duplicate report detection failed: {e}")
+    write_summary(summary, output_dir)
+    if similar is not None:
+        (Path(output_dir) / "similar_reports.json").write_text(json.dumps(similar, indent=2), encoding="utf-8")
+    return summary
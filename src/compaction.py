@@ -0,0 +1,101 @@
+import re
+from typing import Dict, List, Optional
+from langchain_core.messages import BaseMessage, ToolMessage
+from src.config import compaction_settings
+
+# Facts worth keeping when a tool output is elided: file paths (optionally
+# with grep-style line numbers) and git commit hashes from `git log --oneline`.
+_PATH_RE = re.compile(r"(?<![\w/.-])((?:[\w.-]+/)*[\w.-]+\.[A-Za-z0-9]{1,8})(?::(\d+))?")
+_COMMIT_RE = re.compile(r"^([0-9a-f]{7,40})\s", re.MULTILINE)
+MAX_PINNED_FACTS = 40
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap, provider-agnostic token estimate (~4 characters per token)."""
+    return len(text) // 4 + 1
+
+
+def _message_text(message: BaseMessage) -> str:
+    content = message.content
+    if isinstance(content, str):
+        return content
+    return " ".join(part.get("text", "") if isinstance(part, dict) else str(part) for part in content)
+
+
+def count_message_tokens(messages: List[BaseMessage]) -> int:
+    return sum(estimate_tokens(_message_text(m)) for m in messages)
+
+
+def extract_pinned_facts(text: str) -> List[str]:
+    """File paths, path:line references and commit hashes mentioned in a tool output."""
+    facts = []
+    for match in _PATH_RE.finditer(text):
+        path, line = match.group(1), match.group(2)
+        if "/" not in path and not line and path.count(".") > 1:
+            continue  # version numbers and the like
+        facts.append(f"{path}:{line}" if line else path)
+    facts.extend(_COMMIT_RE.findall(text))
+    # Preserve first-seen order, drop duplicates
+    return list(dict.fromkeys(facts))[:MAX_PINNED_FACTS]
+
+
+def elide_tool_output(text: str, head_chars: int) -> str:
+    """Keeps the head of a tool output plus the pinned facts from the whole of it."""
+    if len(text) <= head_chars:
+        return text
+    pinned = extract_pinned_facts(text)
+    elided = f"{text[:head_chars]}\n... [ELIDED {len(text) - head_chars} chars of earlier tool output]"
+    if pinned:
+        elided += f"\nPinned facts: {', '.join(pinned)}"
+    return elided
+
+
+def compact_messages(messages: List[BaseMessage], settings: Optional[Dict] = None) -> List[BaseMessage]:
+    """
+    Returns the message list to send to the LLM for this turn.
+
+    Tool outputs older than the newest `keep_recent` are elided to their head
+    plus pinned facts. If the prompt is still over `max_tokens`, the recent
+    ones are elided too, newest last. The original state is never modified,
+    and every ToolMessage is kept so tool_call ids still pair up.
+    """
+    settings = settings or compaction_settings()
+    compacted = list(messages)
+    tool_indexes = [i for i, m in enumerate(compacted) if isinstance(m, ToolMessage)]
+
+    def _elide(i: int) -> None:
+        message = compacted[i]
+        text = _message_text(message)
+        shorter = elide_tool_output(text, settings["head_chars"])
+        if shorter != text:
+            compacted[i] = message.model_copy(update={"content": shorter})
+
+    keep = settings["keep_recent"]
+    older = tool_indexes[:-keep] if keep > 0 else tool_indexes
+    for i in older:
+        _elide(i)
+
+    for i in tool_indexes[len(older):]:
+        if count_message_tokens(compacted) <= settings["max_tokens"]:
+            break
+        _elide(i)
+    return compacted
+
+
+class ContextCompactor:
+    """
+    pre_model_hook for create_react_agent: compacts the history sent to the
+    LLM on every turn (via 'llm_input_messages', leaving the graph state
+    intact) and records token estimates before/after in AgentMetrics.
+    """
+
+    def __init__(self, metrics=None, settings: Optional[Dict] = None):
+        self.metrics = metrics
+        self.settings = settings or compaction_settings()
+
+    def __call__(self, state: Dict) -> Dict:
+        messages = state["messages"]
+        compacted = compact_messages(messages, self.settings)
+        if self.metrics is not None:
+            self.metrics.record_compaction(count_message_tokens(messages), count_message_tokens(compacted))
+        return {"llm_input_messages": compacted}
@@ -0,0 +1,223 @@
+import os
+from pathlib import Path
+
+
+def get_cache_dir() -> Path:
+    """
+    Returns the root directory for caches that are shared between audits
+    (and between batch worker processes). Override with AUDITOR_CACHE_DIR.
+    """
+    path = Path(os.getenv("AUDITOR_CACHE_DIR", ".cache/auditor"))
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def clone_cache_enabled() -> bool:
+    """Whether git clones should go through the shared local mirror cache."""
+    return os.getenv("AUDITOR_CLONE_CACHE", "0").lower() in ("1", "true", "yes")
+
+
+def clone_cache_ttl() -> int:
+    """Seconds before a cached mirror is refreshed with `git fetch`."""
+    return int(os.getenv("AUDITOR_CLONE_CACHE_TTL", "3600"))
+
+
+def audit_sla_seconds() -> float:
+    """Wall-clock SLA for a whole audit. 0 disables deadlines entirely."""
+    return float(os.getenv("AUDITOR_AUDIT_SLA_S", "1800"))
+
+
+# Default time budget of each pipeline stage, in seconds
+_STAGE_BUDGETS = {
+    "detectives": 900.0,
+    "judges": 600.0,
+    "justice": 60.0,
+}
+
+
+def stage_budget_seconds(stage: str) -> float:
+    """Per-node budget for a stage, overridable with AUDITOR_<STAGE>_BUDGET_S."""
+    return float(os.getenv(f"AUDITOR_{stage.upper()}_BUDGET_S", _STAGE_BUDGETS[stage]))
+
+
+def stage_order() -> list:
+    return list(_STAGE_BUDGETS.keys())
+
+
+def dimension_budget_seconds() -> float:
+    """Upper bound on the time spent on any single rubric dimension inside a node."""
+    return float(os.getenv("AUDITOR_DIMENSION_BUDGET_S", "240"))
+
+
+def react_recursion_limit() -> int:
+    """LangGraph recursion_limit for forensic ReAct agents (one tool turn = 2 steps)."""
+    return int(os.getenv("AUDITOR_REACT_RECURSION_LIMIT", "25"))
+
+
+def llm_timeout_seconds() -> float:
+    """HTTP timeout applied to every LLM / VLM client."""
+    return float(os.getenv("AUDITOR_LLM_TIMEOUT_S", "120"))
+
+
+def hedge_settings() -> dict:
+    """
+    Tuning for hedged LLM requests (see src/llm_hedging.py):
+    - percentile: latency percentile used as the hedge trigger
+    - min_samples: calls observed before the percentile is trusted
+    - default_delay_s: hedge trigger until enough samples exist
+    - min_delay_s: never hedge sooner than this
+    - failure_threshold / cooldown_s: consecutive errors that take a
+      provider out of rotation, and for how long
+    """
+    return {
+        "percentile": float(os.getenv("AUDITOR_HEDGE_PERCENTILE", "95")),
+        "min_samples": int(os.getenv("AUDITOR_HEDGE_MIN_SAMPLES", "5")),
+        "default_delay_s": float(os.getenv("AUDITOR_HEDGE_DEFAULT_DELAY_S", "20")),
+        "min_delay_s": float(os.getenv("AUDITOR_HEDGE_MIN_DELAY_S", "2")),
+        "failure_threshold": int(os.getenv("AUDITOR_FAILOVER_THRESHOLD", "3")),
+        "cooldown_s": float(os.getenv("AUDITOR_FAILOVER_COOLDOWN_S", "60")),
+    }
+
+
+def agent_mode() -> str:
+    """
+    Forensic agent strategy: 'react' (tool loop with parallel tool calls per
+    turn) or 'plan' (one planning call, parallel execution, one answer call;
+    calls can only share the cloned repo path, see _run_planned_agent).
+    """
+    return os.getenv("AUDITOR_AGENT_MODE", "react").lower()
+
+
+def compaction_settings() -> dict:
+    """
+    Context compaction for ReAct message histories (see src/compaction.py):
+    - enabled: AUDITOR_COMPACTION (1/0)
+    - max_tokens: approximate prompt budget per LLM turn
+    - keep_recent: newest tool outputs that are always sent verbatim
+    - head_chars: characters kept from each elided tool output
+    """
+    return {
+        "enabled": os.getenv("AUDITOR_COMPACTION", "1").lower() in ("1", "true", "yes"),
+        "max_tokens": int(os.getenv("AUDITOR_COMPACT_MAX_TOKENS", "6000")),
+        "keep_recent": int(os.getenv("AUDITOR_COMPACT_KEEP_RECENT", "2")),
+        "head_chars": int(os.getenv("AUDITOR_COMPACT_HEAD_CHARS", "400")),
+    }
+
+
+def daemon_socket_path() -> Path:
+    """Unix socket of the warm audit daemon (AUDITOR_DAEMON_SOCKET)."""
+    return Path(os.getenv("AUDITOR_DAEMON_SOCKET", str(get_cache_dir() / "auditd.sock")))
+
+
+def embedding_model_name() -> str:
+    """Sentence-transformers model used for document RAG embeddings."""
+    return os.getenv("AUDITOR_EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+
+
+def embedding_settings() -> dict:
+    """
+    Embedding backend for document RAG:
+    - backend: AUDITOR_EMBEDDING_BACKEND, 'torch' (default), 'onnx', 'onnx-int8' or 'openvino'
+    - onnx_file: quantized ONNX export loaded by 'onnx-int8' (path inside the model repo)
+    - batch_size: chunks per encode call
+    """
+    return {
+        "backend": os.getenv("AUDITOR_EMBEDDING_BACKEND", "torch").lower(),
+        "onnx_file": os.getenv("AUDITOR_EMBEDDING_ONNX_FILE", "onnx/model_quint8_avx2.onnx"),
+        "batch_size": int(os.getenv("AUDITOR_EMBEDDING_BATCH_SIZE", "32")),
+    }
+
+
+def rag_cache_max_bytes() -> int:
+    """In-process bound for cached DocumentRAG objects (AUDITOR_RAG_CACHE_MB)."""
+    return int(float(os.getenv("AUDITOR_RAG_CACHE_MB", "512")) * 2**20)
+
+
+def pdf_conversion_settings() -> dict:
+    """
+    How reports are converted with docling:
+    - workers: AUDITOR_PDF_WORKERS processes converting page ranges in parallel (1 = one serial call)
+    - pages_per_range: pages per parallel conversion task
+    - fast_text: AUDITOR_PDF_FAST_TEXT=1 answers from PyMuPDF text while docling runs in the background
+    """
+    return {
+        "workers": int(os.getenv("AUDITOR_PDF_WORKERS", "1")),
+        "pages_per_range": int(os.getenv("AUDITOR_PDF_PAGES_PER_RANGE", "8")),
+        "fast_text": os.getenv("AUDITOR_PDF_FAST_TEXT", "0").lower() in ("1", "true", "yes"),
+    }
+
+
+def corpus_index_settings() -> dict:
+    """
+    Shared cross-report index under <cache>/corpus/ (see src/tools/corpus_index.py):
+    - enabled: AUDITOR_CORPUS_INDEX=0 stops adding converted reports to it
+    - duplicate_threshold: cosine similarity at which two chunks count as near-duplicates
+    - min_similarity: share of shared chunks at which a report pair is flagged
+    """
+    return {
+        "enabled": os.getenv("AUDITOR_CORPUS_INDEX", "1").lower() in ("1", "true", "yes"),
+        "duplicate_threshold": float(os.getenv("AUDITOR_DUPLICATE_THRESHOLD", "0.9")),
+        "min_similarity": float(os.getenv("AUDITOR_DUPLICATE_MIN_SIMILARITY", "0.2")),
+    }
+
+
+def vision_image_settings() -> dict:
+    """
+    Which embedded PDF images are kept for visual analysis, and at what size:
+    - min_side: images narrower or shorter than this (px) are icons/bullets and dropped
+    - min_entropy: grayscale entropy (bits) below which an image is blank or a flat fill
+    - max_side: longer side images are downsampled to, roughly the VLM's useful resolution
+    """
+    return {
+        "min_side": int(os.getenv("AUDITOR_VISION_MIN_SIDE", "64")),
+        "min_entropy": float(os.getenv("AUDITOR_VISION_MIN_ENTROPY", "1.5")),
+        "max_side": int(os.getenv("AUDITOR_VISION_MAX_SIDE", "1280")),
+    }
+
+
+def vision_settings() -> dict:
+    """
+    Remote vision analysis (Hugging Face Inference API):
+    - model: AUDITOR_VISION_MODEL
+    - concurrency: images analyzed at once by the batch tool
+    - requests_per_minute: client-side rate limit across all threads (0 = none)
+    """
+    return {
+        "model": os.getenv("AUDITOR_VISION_MODEL", "Qwen/Qwen2.5-VL-7B-Instruct"),
+        "concurrency": int(os.getenv("AUDITOR_VISION_CONCURRENCY", "4")),
+        "requests_per_minute": float(os.getenv("AUDITOR_VISION_RPM", "30")),
+        "max_tokens": int(os.getenv("AUDITOR_VISION_MAX_TOKENS", "500")),
+    }
+
+
+def diagram_settings() -> dict:
+    """
+    Local diagram pre-pass run before any remote vision call:
+    - min_drawings: vector paths a region needs to count as a drawn diagram
+    - gap: points between drawings that still belong to the same figure
+    - min_side: smallest embedded image (px) considered at all
+    - min_score / max_candidates: which ranked regions are sent to the VLM
+    - dpi: resolution candidate regions are rendered at
+    """
+    return {
+        "min_drawings": int(os.getenv("AUDITOR_DIAGRAM_MIN_DRAWINGS", "12")),
+        "gap": float(os.getenv("AUDITOR_DIAGRAM_GAP_PT", "20")),
+        "min_side": int(os.getenv("AUDITOR_VISION_MIN_SIDE", "64")),
+        "min_score": float(os.getenv("AUDITOR_DIAGRAM_MIN_SCORE", "0.3")),
+        "max_candidates": int(os.getenv("AUDITOR_DIAGRAM_MAX_CANDIDATES", "4")),
+        "dpi": int(os.getenv("AUDITOR_DIAGRAM_DPI", "110")),
+    }
+
+
+def summary_mode() -> str:
+    """
+    How the executive summary is written (AUDITOR_SUMMARY_MODE):
+    'llm' (default) or 'template', a deterministic fast mode for bulk runs.
+    """
+    mode = os.getenv("AUDITOR_SUMMARY_MODE", "llm").lower()
+    return mode if mode in ("llm", "template") else "llm"
+
+
+def results_db_path() -> Path:
+    """SQLite results store every audit is saved to (see src/results_store.py). Override with AUDITOR_RESULTS_DB."""
+    return Path(os.getenv("AUDITOR_RESULTS_DB", "audit/results.db"))
@@ -0,0 +1,151 @@
+import json
+import os
+import socket
+import socketserver
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+from src.batch import AuditJob, get_graph, run_audit_job
+from src.config import daemon_socket_path
+
+
+class DaemonUnavailable(Exception):
+    """No warm daemon is listening on the socket."""
+
+
+def warm_up() -> Dict[str, float]:
+    """
+    Loads everything an audit needs up front: the compiled graph, the LLM
+    provider SDK, the embedding model and docling's layout models.
+    Returns the seconds spent on each. Failures are reported, not fatal:
+    whatever did not load is loaded on first use as usual.
+    """
+    from src.llm_factory import get_llm
+    from src.tools.docs_tools import get_document_converter, get_embeddings
+
+    def _load_converter():
+        from docling.datamodel.base_models import InputFormat
+        from src.config import pdf_conversion_settings
+        from src.tools.pdf_conversion import warm_conversion_pool
+
+        workers = pdf_conversion_settings()["workers"]
+        if workers > 1:
+            # Parallel conversions run in the shared pool's workers, which hold their own models
+            warm_conversion_pool(workers)
+        else:
+            get_document_converter().initialize_pipeline(InputFormat.PDF)
+
+    steps = [
+        ("graph", get_graph),
+        ("llm_client", get_llm),
+        ("embeddings", lambda: get_embeddings().embed_query("warm up")),
+        ("docling", _load_converter),
+    ]
+    timings = {}
+    for name, load in steps:
+        start = time.perf_counter()
+        try:
+            load()
+        except Exception as e:
+            print(f"[auditd] Could not preload {name}: {e}")
+            continue
+        timings[name] = round(time.perf_counter() - start, 3)
+        print(f"[auditd] {name} ready in {timings[name]}s")
+    return timings
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    """One newline-terminated JSON request per connection, one JSON response."""
+
+    def handle(self) -> None:
+        try:
+            request = json.loads(self.rfile.readline())
+            response = self.server.daemon.dispatch(request)
+        except Exception as e:
+            response = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+        self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class AuditDaemon:
+    """
+    Long-lived local worker that keeps models, parsers and the compiled graph
+    resident and runs audit jobs sent over a unix socket (see request()).
+    """
+
+    def __init__(self, socket_path: Optional[Path] = None, warm: bool = True):
+        self.socket_path = Path(socket_path or daemon_socket_path())
+        self.warm = warm
+        self.started_at = time.time()
+        self.warmup_s: Dict[str, float] = {}
+        self.audits_served = 0
+        self._lock = threading.Lock()
+        self._server: Optional[_Server] = None
+
+    def dispatch(self, request: Dict) -> Dict:
+        op = request.get("op")
+        if op == "ping":
+            return {
+                "ok": True,
+                "pid": os.getpid(),
+                "uptime_s": round(time.time() - self.started_at, 1),
+                "warmup_s": self.warmup_s,
+                "audits_served": self.audits_served,
+            }
+        if op == "audit":
+            start = time.perf_counter()
+            outcome = run_audit_job(AuditJob(**request["job"]), request["output_dir"])
+            with self._lock:
+                self.audits_served += 1
+            return {"ok": True, "outcome": outcome.model_dump(), "server_time_s": round(time.perf_counter() - start, 3)}
+        if op == "shutdown":
+            threading.Thread(target=self.shutdown, daemon=True).start()
+            return {"ok": True}
+        return {"ok": False, "error": f"Unknown op: {op}"}
+
+    def start(self) -> None:
+        """Warms up and binds the socket. Refuses to start if a daemon already answers on it."""
+        if self.socket_path.exists():
+            try:
+                request({"op": "ping"}, self.socket_path, timeout=2)
+                raise RuntimeError(f"A daemon is already running on {self.socket_path}")
+            except DaemonUnavailable:
+                self.socket_path.unlink()  # stale socket from a crashed daemon
+        if self.warm:
+            self.warmup_s = warm_up()
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+        self._server = _Server(str(self.socket_path), _Handler)
+        self._server.daemon = self
+
+    def serve_forever(self) -> None:
+        print(f"[auditd] Listening on {self.socket_path} (pid {os.getpid()})")
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+            self.socket_path.unlink(missing_ok=True)
+
+    def shutdown(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+
+
+def request(payload: Dict, socket_path: Optional[Path] = None, timeout: Optional[float] = None) -> Dict:
+    """Sends one request to the daemon and returns its response. Raises DaemonUnavailable if none is running."""
+    path = str(socket_path or daemon_socket_path())
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(path)
+            sock.sendall(json.dumps(payload).encode("utf-8") + b"\n")
+            with sock.makefile("rb") as reader:
+                line = reader.readline()
+    except (FileNotFoundError, ConnectionRefusedError) as e:
+        raise DaemonUnavailable(str(e)) from e
+    if not line:
+        raise DaemonUnavailable(f"Daemon on {path} closed the connection")
+    return json.loads(line)
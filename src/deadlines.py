@@ -0,0 +1,105 @@
+import asyncio
+import math
+import threading
+import time
+from typing import Any, Awaitable, Dict, Optional
+from src.config import (
+    audit_sla_seconds,
+    dimension_budget_seconds,
+    stage_budget_seconds,
+    stage_order,
+)
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a node or dimension runs out of its time budget."""
+
+
+def new_audit_deadline() -> Optional[float]:
+    """Absolute (epoch) deadline for an audit starting now, or None if the SLA is disabled."""
+    sla = audit_sla_seconds()
+    return time.time() + sla if sla > 0 else None
+
+
+def time_left(deadline: Optional[float]) -> float:
+    return math.inf if deadline is None else deadline - time.time()
+
+
+def node_deadline(state: Dict, stage: str) -> Optional[float]:
+    """
+    Deadline for a node of `stage` starting now: its own budget, but never so
+    late that the stages after it lose their budgets within the audit SLA.
+    """
+    audit_deadline = state.get("deadline")
+    if audit_deadline is None:
+        return None
+    stages = stage_order()
+    reserve = sum(stage_budget_seconds(s) for s in stages[stages.index(stage) + 1:])
+    return min(time.time() + stage_budget_seconds(stage), audit_deadline - reserve)
+
+
+def dimension_deadline(node_deadline: Optional[float], dims_left: int) -> Optional[float]:
+    """Deadline for the next dimension: capped, and a fair share of what the node has left."""
+    if node_deadline is None:
+        return None
+    share = time_left(node_deadline) / max(dims_left, 1)
+    return time.time() + max(0.0, min(dimension_budget_seconds(), share))
+
+
+# One event loop per process, on a background thread, for every async call made
+# from sync code. Async HTTP clients that providers cache across instances keep
+# pooled connections bound to the loop they were opened on, so that loop must
+# outlive any single call.
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+
+def background_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    with _loop_lock:
+        if _loop is None or _loop.is_closed():
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="async-runner", daemon=True).start()
+        return _loop
+
+
+def run_coroutine(coro: Awaitable) -> Any:
+    """
+    Runs a coroutine on the shared background loop and blocks until it is done.
+    The caller's context variables (e.g. the audit workspace) are carried over.
+    """
+    loop = background_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        coro.close()
+        raise RuntimeError("run_coroutine called from the background loop itself; await the coroutine instead")
+    return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+
+def run_before(awaitable: Awaitable, deadline: Optional[float]) -> Any:
+    """
+    Runs a coroutine on the shared background loop and cancels it at `deadline`.
+    Cancellation propagates into in-flight async LLM requests. Sync tools that
+    were offloaded to threads finish on their own timeouts without blocking us.
+    """
+    remaining = time_left(deadline)
+    if remaining <= 0:
+        if hasattr(awaitable, "close"):
+            awaitable.close()
+        raise DeadlineExceeded("Time budget already exhausted")
+
+    timeout = None if math.isinf(remaining) else remaining
+    try:
+        return run_coroutine(asyncio.wait_for(awaitable, timeout=timeout))
+    except asyncio.TimeoutError:
+        raise DeadlineExceeded(f"Time budget of {remaining:.0f}s exceeded") from None
+
+
+def invoke_before(runnable: Any, input: Any, deadline: Optional[float], config: Optional[Dict] = None) -> Any:
+    """runnable.invoke without a deadline; a cancellable ainvoke with one."""
+    if deadline is None:
+        return runnable.invoke(input, config) if config else runnable.invoke(input)
+    return run_before(runnable.ainvoke(input, config), deadline)
@@ -15,7 +15,12 @@ from src.nodes.detectives import (
 )
 from src.nodes.evidence_aggregator import aggregate_evidence
 from src.nodes.judges import judge_prosecutor, judge_defense, judge_techlead
-from src.nodes.justice import synthesize_verdicts, generate_report_markdown
+from src.nodes.justice import (
+    synthesize_verdicts,
+    generate_executive_summary,
+    write_report_skeleton,
+    publish_report,
+)
 
 def build_graph():
     builder = StateGraph(AgentState)
@@ -30,6 +35,9 @@ def build_graph():
     builder.add_node("Defense", judge_defense)
     builder.add_node("TechLead", judge_techlead)
     builder.add_node("ChiefJustice", synthesize_verdicts)
+    builder.add_node("ExecutiveSummary", generate_executive_summary)
+    builder.add_node("ReportWriter", write_report_skeleton)
+    builder.add_node("PublishReport", publish_report)
 
     # START -> ContextBuilder
     builder.add_edge(START, "ContextBuilder")
@@ -54,7 +62,15 @@ def build_graph():
     builder.add_edge("Defense", "ChiefJustice")
     builder.add_edge("TechLead", "ChiefJustice")
 
+    # ChiefJustice -> summary LLM call and report persistence (Parallel Fan-out)
+    builder.add_edge("ChiefJustice", "ExecutiveSummary")
+    builder.add_edge("ChiefJustice", "ReportWriter")
+
+    # -> PublishReport (Fan-in)
+    builder.add_edge("ExecutiveSummary", "PublishReport")
+    builder.add_edge("ReportWriter", "PublishReport")
+
     # Final result
-    builder.add_edge("ChiefJustice", END)
+    builder.add_edge("PublishReport", END)
 
     return builder.compile()
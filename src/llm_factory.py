@@ -1,32 +1,114 @@
 import os
-from typing import Optional
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_openai import ChatOpenAI
+import threading
+from typing import Any, Optional, Union
+from langchain_core.callbacks import BaseCallbackHandler
 from langchain_core.language_models.chat_models import BaseChatModel
-from dotenv import load_dotenv
+from src.config import llm_timeout_seconds
+from src.llm_hedging import HedgedChatModel
 
-load_dotenv()
+# Optional semaphore shared by every model built by get_llm.
+# The batch runner installs a multiprocessing.Manager semaphore here so the
+# limit holds across all worker processes, not just within one.
+_llm_semaphore = None
 
-def get_llm(provider: Optional[str] = None, model: Optional[str] = None, api_key: Optional[str] = None) -> BaseChatModel:
+
+class LLMConcurrencyLimiter(BaseCallbackHandler):
+    """Callback that holds a semaphore slot for the duration of each LLM call."""
+
+    def __init__(self, semaphore: Any):
+        self.semaphore = semaphore
+        self._held = set()
+        self._lock = threading.Lock()
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs) -> None:
+        self.semaphore.acquire()
+        with self._lock:
+            self._held.add(run_id)
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs) -> None:
+        self.semaphore.acquire()
+        with self._lock:
+            self._held.add(run_id)
+
+    def on_llm_end(self, response, *, run_id, **kwargs) -> None:
+        self._release(run_id)
+
+    def on_llm_error(self, error, *, run_id, **kwargs) -> None:
+        self._release(run_id)
+
+    def _release(self, run_id) -> None:
+        with self._lock:
+            if run_id not in self._held:
+                return
+            self._held.discard(run_id)
+        self.semaphore.release()
+
+
+def set_llm_semaphore(semaphore: Any) -> None:
+    """Installs a (possibly cross-process) semaphore limiting concurrent LLM calls."""
+    global _llm_semaphore
+    _llm_semaphore = semaphore
+
+
+def get_llm(provider: Optional[str] = None, model: Optional[str] = None, api_key: Optional[str] = None) -> Union[BaseChatModel, HedgedChatModel]:
     """
     Returns a LangChain ChatModel instance based on the provider.
     Supported providers: 'gemini', 'openrouter'.
+
+    When LLM_FALLBACK_PROVIDER (and optionally LLM_FALLBACK_MODEL) is set, the
+    model is wrapped in a HedgedChatModel that hedges slow calls and fails over
+    to the fallback provider/model on errors.
     """
     provider = provider or os.getenv("LLM_PROVIDER", "gemini").lower()
-    
+    model = model or _default_model(provider)
+    primary = _build_chat_model(provider, model, api_key)
+
+    fallback_provider = (os.getenv("LLM_FALLBACK_PROVIDER") or "").lower()
+    if not fallback_provider:
+        return primary
+    fallback_model = os.getenv("LLM_FALLBACK_MODEL") or _default_model(fallback_provider)
+    if (fallback_provider, fallback_model) == (provider, model):
+        return primary
+
+    # Only reuse the per-node key when the fallback talks to the same provider
+    fallback_key = api_key if fallback_provider == provider else None
+    secondary = _build_chat_model(fallback_provider, fallback_model, fallback_key)
+    return HedgedChatModel([
+        (f"{provider}:{model}", primary),
+        (f"{fallback_provider}:{fallback_model}", secondary),
+    ])
+
+def default_model_id() -> str:
+    """'provider:model' of the configured primary LLM, e.g. to key cached answers."""
+    provider = os.getenv("LLM_PROVIDER", "gemini").lower()
+    return f"{provider}:{_default_model(provider)}"
+
+def _default_model(provider: str) -> str:
     if provider == "gemini":
-        model = model or os.getenv("GEMINI_MODEL", "gemini-2.0-flash")
-        return ChatGoogleGenerativeAI(model=model, temperature=0)
-    
+        return os.getenv("GEMINI_MODEL", "gemini-2.0-flash")
     elif provider == "openrouter":
-        model = model or os.getenv("OPENROUTER_MODEL", "arcee-ai/trinity-large-preview:free")
+        return os.getenv("OPENROUTER_MODEL", "arcee-ai/trinity-large-preview:free")
+    raise ValueError(f"Unsupported LLM provider: {provider}")
+
+def _build_chat_model(provider: str, model: str, api_key: Optional[str] = None) -> BaseChatModel:
+    callbacks = [LLMConcurrencyLimiter(_llm_semaphore)] if _llm_semaphore is not None else None
+
+    # Provider SDKs are imported here so only the configured one is ever loaded
+    if provider == "gemini":
+        from langchain_google_genai import ChatGoogleGenerativeAI
+        return ChatGoogleGenerativeAI(model=model, temperature=0, timeout=llm_timeout_seconds(), callbacks=callbacks)
+
+    elif provider == "openrouter":
+        from langchain_openai import ChatOpenAI
         key = api_key or os.getenv("OPENROUTER_API_KEY")
         return ChatOpenAI(
             base_url="https://openrouter.ai/api/v1",
             openai_api_key=key,
             model=model,
-            temperature=0
+            temperature=0,
+            timeout=llm_timeout_seconds(),
+            callbacks=callbacks
         )
-    
+
     else:
         raise ValueError(f"Unsupported LLM provider: {provider}")
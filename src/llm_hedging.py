@@ -0,0 +1,187 @@
+import asyncio
+import math
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Any, Dict, List, Optional, Tuple
+from langchain_core.runnables import Runnable, RunnableConfig
+from src.config import hedge_settings
+from src.deadlines import run_coroutine
+
+
+class LatencyTracker:
+    """
+    Per-provider rolling latency window plus a simple circuit breaker.
+    Keys are "<provider>:<model>" so every node in the process shares stats.
+    """
+
+    def __init__(self, window: int = 200):
+        self._samples: Dict[str, deque] = defaultdict(lambda: deque(maxlen=window))
+        self._consecutive_failures: Dict[str, int] = defaultdict(int)
+        self._open_until: Dict[str, float] = {}
+        self._counts: Dict[str, Dict[str, int]] = defaultdict(lambda: {"calls": 0, "errors": 0, "hedges": 0, "wins": 0})
+        self._lock = threading.Lock()
+
+    def record_success(self, key: str, latency_s: float) -> None:
+        with self._lock:
+            self._samples[key].append(latency_s)
+            self._consecutive_failures[key] = 0
+            self._open_until.pop(key, None)
+            self._counts[key]["calls"] += 1
+
+    def record_failure(self, key: str) -> None:
+        settings = hedge_settings()
+        with self._lock:
+            self._counts[key]["calls"] += 1
+            self._counts[key]["errors"] += 1
+            self._consecutive_failures[key] += 1
+            if self._consecutive_failures[key] >= settings["failure_threshold"]:
+                self._open_until[key] = time.time() + settings["cooldown_s"]
+
+    def record_hedge(self, key: str) -> None:
+        with self._lock:
+            self._counts[key]["hedges"] += 1
+
+    def record_win(self, key: str) -> None:
+        with self._lock:
+            self._counts[key]["wins"] += 1
+
+    def percentile(self, key: str, q: float) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples[key])
+        if len(samples) < hedge_settings()["min_samples"]:
+            return None
+        index = min(len(samples) - 1, max(0, math.ceil(q / 100 * len(samples)) - 1))
+        return samples[index]
+
+    def is_healthy(self, key: str) -> bool:
+        with self._lock:
+            return self._open_until.get(key, 0.0) <= time.time()
+
+    def hedge_delay(self, key: str) -> float:
+        """How long to wait on `key` before firing a hedged duplicate."""
+        settings = hedge_settings()
+        p = self.percentile(key, settings["percentile"])
+        delay = settings["default_delay_s"] if p is None else p
+        return max(settings["min_delay_s"], delay)
+
+    def stats(self) -> Dict[str, Dict]:
+        with self._lock:
+            keys = list(self._counts.keys())
+        report = {}
+        for key in keys:
+            report[key] = dict(self._counts[key])
+            report[key]["p50_s"] = self.percentile(key, 50)
+            report[key]["p95_s"] = self.percentile(key, 95)
+            report[key]["healthy"] = self.is_healthy(key)
+        return report
+
+
+# Process-wide tracker shared by every hedged model
+_tracker = LatencyTracker()
+
+
+def get_latency_stats() -> Dict[str, Dict]:
+    """Per-provider call counts, error/hedge/win counts and latency percentiles."""
+    return _tracker.stats()
+
+
+class HedgedChatModel(Runnable):
+    """
+    Runs a call on the healthiest provider and, if it is still pending after
+    that provider's p95 latency, fires the same call at the next provider.
+    The first successful answer wins and the other request is cancelled.
+    Errors fail over to the next provider immediately, and providers with
+    repeated errors are moved to the back of the line for a cooldown period.
+
+    bind_tools / with_structured_output are applied to every candidate, so the
+    wrapper drops into create_react_agent and judge structured output as-is.
+    """
+
+    def __init__(self, candidates: List[Tuple[str, Runnable]], tracker: Optional[LatencyTracker] = None):
+        if not candidates:
+            raise ValueError("HedgedChatModel needs at least one candidate model")
+        self.candidates = candidates
+        self.tracker = tracker or _tracker
+
+    # --- Runnable-returning helpers mapped over every candidate ---
+    def bind_tools(self, *args, **kwargs) -> "HedgedChatModel":
+        return HedgedChatModel([(k, m.bind_tools(*args, **kwargs)) for k, m in self.candidates], self.tracker)
+
+    def with_structured_output(self, *args, **kwargs) -> "HedgedChatModel":
+        return HedgedChatModel([(k, m.with_structured_output(*args, **kwargs)) for k, m in self.candidates], self.tracker)
+
+    def _ordered(self) -> List[Tuple[str, Runnable]]:
+        healthy = [c for c in self.candidates if self.tracker.is_healthy(c[0])]
+        unhealthy = [c for c in self.candidates if not self.tracker.is_healthy(c[0])]
+        return healthy + unhealthy
+
+    async def _timed(self, key: str, model: Runnable, input: Any, config: Optional[RunnableConfig], **kwargs) -> Any:
+        start = time.perf_counter()
+        try:
+            result = await model.ainvoke(input, config, **kwargs)
+        except asyncio.CancelledError:
+            # Losing a hedge race is not a provider failure
+            raise
+        except Exception:
+            self.tracker.record_failure(key)
+            raise
+        self.tracker.record_success(key, time.perf_counter() - start)
+        return result
+
+    async def ainvoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Any:
+        queue = self._ordered()
+        pending: Dict[asyncio.Task, str] = {}
+        last_error: Optional[BaseException] = None
+
+        def _launch() -> None:
+            key, model = queue.pop(0)
+            pending[asyncio.ensure_future(self._timed(key, model, input, config, **kwargs))] = key
+
+        _launch()
+        primary_key = next(iter(pending.values()))
+        try:
+            done, _ = await asyncio.wait(set(pending), timeout=self.tracker.hedge_delay(primary_key))
+            if not done and queue:
+                self.tracker.record_hedge(queue[0][0])
+                _launch()
+
+            while pending:
+                done, _ = await asyncio.wait(set(pending), return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    key = pending.pop(task)
+                    if task.exception() is None:
+                        self.tracker.record_win(key)
+                        return task.result()
+                    last_error = task.exception()
+                # Fail over as soon as nothing is in flight anymore
+                if not pending and queue:
+                    _launch()
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+        raise last_error
+
+    def invoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Any:
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            # Normal case for sync nodes: race on the shared background loop so
+            # the loser is truly cancelled and cached async clients stay usable
+            return run_coroutine(self.ainvoke(input, config, **kwargs))
+
+        # Called synchronously from inside an event loop: sequential failover only
+        last_error = None
+        for key, model in self._ordered():
+            start = time.perf_counter()
+            try:
+                result = model.invoke(input, config, **kwargs)
+            except Exception as e:
+                self.tracker.record_failure(key)
+                last_error = e
+                continue
+            self.tracker.record_success(key, time.perf_counter() - start)
+            return result
+        raise last_error
@@ -1,15 +1,26 @@
 import json
+import uuid
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 from src.state import AgentState
+from src.deadlines import new_audit_deadline
 
 def build_context(state: AgentState) -> AgentState:
-    """Initialize the agent state with rubric dimensions and synthesis rules from rubric/rubric.json."""
-    rubric_path = Path("rubric/rubric.json")
+    """
+    Initialize the agent state with rubric dimensions and synthesis rules.
+    Reads state['rubric_path'] when set (batch runs), else rubric/rubric.json.
+    """
+    rubric_path = Path(state.get("rubric_path") or "rubric/rubric.json")
+    # Scopes temp directories (clones, extracted images) to this audit
+    audit_id = state.get("audit_id") or uuid.uuid4().hex[:12]
+    # The audit-level SLA clock starts here unless the caller already set one
+    deadline = state.get("deadline") or new_audit_deadline()
     
     if not rubric_path.exists():
         print(f"Warning: {rubric_path} not found. Initializing with empty rubric.")
         return {
+            "audit_id": audit_id,
+            "deadline": deadline,
             "rubric_metadata": {},
             "rubric_dimensions": [],
             "synthesis_rules": {},
@@ -23,6 +34,8 @@ def build_context(state: AgentState) -> AgentState:
             rubric_spec = json.load(f)
             
         return {
+            "audit_id": audit_id,
+            "deadline": deadline,
             "rubric_metadata": rubric_spec.get("rubric_metadata", {}),
             "rubric_dimensions": rubric_spec.get("dimensions", []),
             "synthesis_rules": rubric_spec.get("synthesis_rules", {}),
@@ -33,6 +46,8 @@ def build_context(state: AgentState) -> AgentState:
     except Exception as e:
         print(f"Error loading rubric: {e}")
         return {
+            "audit_id": audit_id,
+            "deadline": deadline,
             "rubric_metadata": {},
             "rubric_dimensions": [],
             "synthesis_rules": {},
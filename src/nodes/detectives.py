@@ -1,27 +1,68 @@
-from typing import Dict, List
+import json
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Dict, List, Optional
 from pathlib import Path
-from langchain_core.messages import SystemMessage, HumanMessage
+from pydantic import BaseModel, Field
+from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
 from langchain_core.prompts import ChatPromptTemplate
+from langgraph.errors import GraphRecursionError
+from langchain_core.runnables.config import ContextThreadPoolExecutor
 from langgraph.prebuilt import create_react_agent
 import time
 from src.state import AgentState, Evidence
 from src.llm_factory import get_llm
+from src.agent_metrics import AgentMetrics
+from src.compaction import ContextCompactor
+from src.config import agent_mode, compaction_settings, react_recursion_limit
+from src.deadlines import DeadlineExceeded, dimension_deadline, invoke_before, node_deadline, run_before, time_left
 from src.tools.repo_tools import (
     clone_repository, 
     list_files, 
     read_file, 
     run_git_log, 
     grep_search, 
-    cleanup_temp_dirs
+    cleanup_temp_dirs,
+    cloned_commit
 )
 from src.tools.ast_parser import analyze_graph_wiring
-from src.tools.docs_tools import query_pdf_report, extract_paths_from_pdf
-from src.tools.vision_tools import extract_images_from_pdf, analyze_image_with_vision, cleanup_vision_images
+from src.tools.docs_tools import query_pdf_report, query_pdf_report_batch, extract_paths_from_pdf
+from src.tools.vision_tools import (
+    analyze_image_with_vision, analyze_pdf_images, cleanup_vision_images, extract_images_from_pdf, find_diagrams,
+)
+from src.tools.workspace import audit_scope
 
+RETRY_DELAY_S = 5
+MAX_PLANNED_CALLS = 12
 
-def _run_forensic_agent(llm, tools, instruction: str, goal: str) -> Evidence:
-    """Runs a ReAct agent to collect evidence for a specific goal."""
-    agent = create_react_agent(llm, tools)
+ANSWER_FORMAT = """
+    Once you have enough evidence, provide a final answer starting with 'EVIDENCE_FOUND:' or 'EVIDENCE_MISSING:'.
+    Include:
+    - Rationale: Why you reached this conclusion.
+    - Location: Where you found it (file path, commit hash, etc).
+    - Confidence: A float 0.0-1.0.
+    """
+
+def _run_forensic_agent(llm, tools, instruction: str, goal: str, deadline: Optional[float] = None,
+                        metrics: Optional[AgentMetrics] = None) -> Evidence:
+    """
+    Runs a ReAct agent to collect evidence for a specific goal.
+    Independent tool calls issued in one turn run concurrently in the ToolNode.
+    With AUDITOR_AGENT_MODE=plan, delegates to the plan-then-execute strategy.
+    With a deadline, the agent is cancelled when it runs out of time and the
+    transcript so far becomes a low-confidence Evidence entry.
+    """
+    config = {"recursion_limit": react_recursion_limit()}
+    if metrics is not None:
+        config["callbacks"] = [metrics]
+    if agent_mode() == "plan":
+        return _run_planned_agent(llm, tools, instruction, goal, deadline, config)
+
+    # Compaction adds a pre-model step per turn; scale the step limit so the
+    # number of allowed tool turns stays the same
+    compactor = ContextCompactor(metrics) if compaction_settings()["enabled"] else None
+    if compactor is not None:
+        config["recursion_limit"] = config["recursion_limit"] * 3 // 2
+    agent = create_react_agent(llm, tools, pre_model_hook=compactor)
     
     prompt = f"""
     You are a forensic detective. Your goal is to collect evidence for: {goal}
@@ -29,21 +70,26 @@ def _run_forensic_agent(llm, tools, instruction: str, goal: str) -> Evidence:
     Instruction: {instruction}
     
     Use the provided tools to verify the claim. 
-    Once you have enough evidence, provide a final answer starting with 'EVIDENCE_FOUND:' or 'EVIDENCE_MISSING:'.
-    Include:
-    - Rationale: Why you reached this conclusion.
-    - Location: Where you found it (file path, commit hash, etc).
-    - Confidence: A float 0.0-1.0.
-    """
+    When you need several independent reads or searches, request all of them in the
+    same turn: they are executed in parallel.
+    {ANSWER_FORMAT}"""
+    inputs = {"messages": [HumanMessage(content=prompt)]}
     max_retries = 3
     result = None
     for attempt in range(max_retries):
+        partial = {"messages": []}
         try:
-            result = agent.invoke({"messages": [HumanMessage(content=prompt)]})
+            result = _drive_agent(agent, inputs, config, partial, deadline)
             break
+        except DeadlineExceeded as e:
+            print(f"Time budget exhausted while investigating {goal}: {e}")
+            return _partial_evidence(goal, partial["messages"], f"time budget exhausted ({e})")
+        except GraphRecursionError:
+            print(f"Step limit reached while investigating {goal}")
+            return _partial_evidence(goal, partial["messages"], f"ReAct step limit of {config['recursion_limit']} reached")
         except Exception as e:
-            if attempt == max_retries - 1:
-                print(f"Failed to investigate {goal} after {max_retries} attempts: {e}")
+            if attempt == max_retries - 1 or time_left(deadline) < RETRY_DELAY_S:
+                print(f"Failed to investigate {goal} after {attempt+1} attempts: {e}")
                 return Evidence(
                     goal=goal,
                     found=False,
@@ -52,11 +98,13 @@ def _run_forensic_agent(llm, tools, instruction: str, goal: str) -> Evidence:
                     rationale="API failed to process request.",
                     confidence=0.0
                 )
-            print(f"API Error during {goal} investigation (attempt {attempt+1}/{max_retries}): {e}. Retrying in 5 seconds...")
-            time.sleep(5)
+            print(f"API Error during {goal} investigation (attempt {attempt+1}/{max_retries}): {e}. Retrying in {RETRY_DELAY_S} seconds...")
+            time.sleep(RETRY_DELAY_S)
             
-    last_msg = result["messages"][-1].content
-    
+    return _evidence_from_answer(goal, result["messages"][-1].content)
+
+def _evidence_from_answer(goal: str, last_msg: str) -> Evidence:
+    """Parses an agent's final EVIDENCE_FOUND / EVIDENCE_MISSING answer."""
     # Robust parser for agent output
     upper_msg = last_msg.upper()
     found = "EVIDENCE_FOUND" in upper_msg and (
@@ -87,6 +135,154 @@ def _run_forensic_agent(llm, tools, instruction: str, goal: str) -> Evidence:
         confidence=0.9 # Default for agentic run
     )
 
+def _drive_agent(agent, inputs: Dict, config: Dict, partial: Dict, deadline: Optional[float]) -> Dict:
+    """Streams the agent's state into `partial` so it survives a timeout or step limit."""
+    if deadline is None:
+        for state in agent.stream(inputs, config, stream_mode="values"):
+            partial["messages"] = state["messages"]
+        return partial
+
+    async def _astream():
+        async for state in agent.astream(inputs, config, stream_mode="values"):
+            partial["messages"] = state["messages"]
+        return partial
+
+    return run_before(_astream(), deadline)
+
+def _partial_evidence(goal: str, messages: List, reason: str) -> Evidence:
+    """Turns an unfinished investigation into an explicit, low-confidence Evidence entry."""
+    tool_calls = [tc["name"] for m in messages if isinstance(m, AIMessage) for tc in (m.tool_calls or [])]
+    notes = [m.content for m in messages if isinstance(m, AIMessage) and isinstance(m.content, str) and m.content.strip()]
+    content = f"EVIDENCE_INCONCLUSIVE: Investigation stopped early: {reason}."
+    if tool_calls:
+        content += f"\nTools called before stopping: {', '.join(tool_calls)}"
+    if notes:
+        content += f"\nLast agent notes: {notes[-1][:1000]}"
+    return Evidence(
+        goal=goal,
+        found=False,
+        content=content,
+        location="Deadline Exceeded",
+        rationale=f"Partial investigation only ({reason}); treat as unverified.",
+        confidence=0.1
+    )
+
+class PlannedToolCall(BaseModel):
+    tool: str = Field(description="Name of the tool to call")
+    arguments: str = Field(description="JSON object with the tool arguments. Use \"{repo_path}\" where the cloned repository path is needed.")
+
+class InvestigationPlan(BaseModel):
+    calls: List[PlannedToolCall] = Field(description="Every read, search or query needed to reach a verdict")
+
+def _run_planned_agent(llm, tools, instruction: str, goal: str, deadline: Optional[float], config: Dict) -> Evidence:
+    """
+    Plan-then-execute: one planning call lists every tool call, they all run in
+    parallel (clones first, so their path can fill '{repo_path}'), and one
+    final reasoning call turns the outputs into an answer.
+
+    Limits: '{repo_path}' is the only output a call can take from another, so
+    plan mode can't follow up on what it finds (e.g. read files a listing
+    turned up); use react mode for open-ended investigations. Every phase,
+    clones included, is bounded by the deadline.
+    """
+    tools_by_name = {t.name: t for t in tools}
+    tool_docs = "\n".join(
+        f"- {t.name}({', '.join(t.args)}): {(t.description or '').strip().splitlines()[0]}" for t in tools
+    )
+    plan_prompt = f"""
+    You are a forensic detective planning an investigation for: {goal}
+    
+    Instruction: {instruction}
+    
+    Available tools:
+    {tool_docs}
+    
+    List, in one go, every tool call needed to verify the claim (at most {MAX_PLANNED_CALLS}).
+    All calls run in parallel, so do not depend on the output of another call,
+    except for the cloned repository path, which you reference as "{{repo_path}}".
+    """
+    executed: List[str] = []
+    try:
+        plan = invoke_before(llm.with_structured_output(InvestigationPlan), [HumanMessage(content=plan_prompt)], deadline, config)
+        calls = [c for c in plan.calls if c.tool in tools_by_name][:MAX_PLANNED_CALLS]
+
+        # Copies ContextVars (audit workspace) into the worker threads
+        pool = ContextThreadPoolExecutor(max_workers=min(8, max(1, len(calls))))
+        try:
+            # Phase 1: clones (their output is the repo_path the other calls need)
+            repo_path = ""
+            outputs = []
+            for call in [c for c in calls if c.tool == "clone_repository"]:
+                future = pool.submit(tools_by_name[call.tool].invoke, _planned_args(call, repo_path), config)
+                try:
+                    repo_path = str(future.result(timeout=_wait_s(deadline)))
+                except FutureTimeoutError:
+                    raise DeadlineExceeded("Time budget exhausted while cloning the repository") from None
+                outputs.append((call, repo_path))
+                executed.append(call.tool)
+
+            # Phase 2: everything else, concurrently
+            futures = [
+                (call, pool.submit(tools_by_name[call.tool].invoke, _planned_args(call, repo_path), config))
+                for call in calls if call.tool != "clone_repository"
+            ]
+            for call, future in futures:
+                try:
+                    outputs.append((call, str(future.result(timeout=_wait_s(deadline)))))
+                except FutureTimeoutError:
+                    outputs.append((call, "Error: tool did not finish within the time budget."))
+                except Exception as e:
+                    outputs.append((call, f"Error: {e}"))
+                executed.append(call.tool)
+        finally:
+            # Do not wait on stragglers past the deadline
+            pool.shutdown(wait=False, cancel_futures=True)
+
+        findings = "\n\n".join(f"### {c.tool} {c.arguments}\n{out}" for c, out in outputs) or "No tool output."
+        answer_prompt = f"""
+    You are a forensic detective. Your goal is to collect evidence for: {goal}
+    
+    Instruction: {instruction}
+    
+    Tool outputs gathered for this investigation:
+    {findings}
+    {ANSWER_FORMAT}"""
+        response = invoke_before(llm, [HumanMessage(content=answer_prompt)], deadline, config)
+        return _evidence_from_answer(goal, response.content)
+    except DeadlineExceeded as e:
+        print(f"Time budget exhausted while investigating {goal}: {e}")
+        messages = [AIMessage(content="", tool_calls=[{"name": name, "args": {}, "id": str(i)} for i, name in enumerate(executed)])]
+        return _partial_evidence(goal, messages, f"time budget exhausted ({e})")
+    except Exception as e:
+        print(f"Failed to investigate {goal} (plan mode): {e}")
+        return Evidence(
+            goal=goal,
+            found=False,
+            content=f"EVIDENCE_MISSING: Agent encountered API error: {e}",
+            location="API Failure",
+            rationale="API failed to process request.",
+            confidence=0.0
+        )
+
+def _wait_s(deadline: Optional[float]) -> Optional[float]:
+    return None if deadline is None else max(0.0, time_left(deadline))
+
+def _planned_args(call: PlannedToolCall, repo_path: str) -> Dict:
+    try:
+        args = json.loads(call.arguments or "{}")
+    except json.JSONDecodeError:
+        args = {}
+    return {k: (v.replace("{repo_path}", repo_path) if isinstance(v, str) else v) for k, v in args.items()}
+
+def _report_metrics(dim_id: str, metrics: AgentMetrics) -> Dict:
+    summary = metrics.summary()
+    print(f"  [{dim_id}] {summary['mode']}: {summary['llm_calls']} LLM turns, {summary['tool_calls']} tool calls, "
+          f"{summary['input_tokens']}+{summary['output_tokens']} tokens, {summary['wall_time_s']}s")
+    if summary["prompt_tokens_before_compaction"]:
+        print(f"  [{dim_id}] prompt tokens (est.) {summary['prompt_tokens_before_compaction']} -> "
+              f"{summary['prompt_tokens_after_compaction']} after compaction")
+    return summary
+
 def repo_investigator_node(state: AgentState) -> Dict:
     """Dynamic agent that audits the repository using tools."""
     import os
@@ -99,17 +295,26 @@ def repo_investigator_node(state: AgentState) -> Dict:
     dimensions = [d for d in state.get("rubric_dimensions", []) if d.get("target_artifact") == "github_repo"]
     
     evidences = {}
-    for dim in dimensions:
-        dim_id = dim["id"]
-        instruction = dim["forensic_instruction"]
-        # Include repo_url in the instruction so the LLM knows what to clone
-        full_instruction = f"Repository URL: {repo_url}\n{instruction}"
+    agent_metrics = {}
+    deadline = node_deadline(state, "detectives")
+    # Clones acquired by tools are released (refcounted) when this node is done
+    with audit_scope(state.get("audit_id"), holder="RepoInvestigator"):
+        for i, dim in enumerate(dimensions):
+            dim_id = dim["id"]
+            instruction = dim["forensic_instruction"]
+            # Include repo_url in the instruction so the LLM knows what to clone
+            full_instruction = f"Repository URL: {repo_url}\n{instruction}"
         
-        print(f"Agent investigating dimension: {dim_id}")
-        ev = _run_forensic_agent(llm, tools, full_instruction, dim["name"])
-        evidences[dim_id] = [ev]
+            print(f"Agent investigating dimension: {dim_id}")
+            metrics = AgentMetrics(mode=agent_mode())
+            ev = _run_forensic_agent(llm, tools, full_instruction, dim["name"],
+                                     deadline=dimension_deadline(deadline, len(dimensions) - i),
+                                     metrics=metrics)
+            evidences[dim_id] = [ev]
+            agent_metrics[dim_id] = _report_metrics(dim_id, metrics)
+        commit = cloned_commit(repo_url)
     
-    return {"evidences": evidences}
+    return {"evidences": evidences, "agent_metrics": agent_metrics, "repo_commits": {repo_url: commit} if commit else {}}
 
 def doc_analyst_node(state: AgentState) -> Dict:
     """Dynamic agent that audits the PDF report using RAG tools."""
@@ -118,23 +323,32 @@ def doc_analyst_node(state: AgentState) -> Dict:
     key = os.getenv("OPENROUTER_API_KEY_2")
     llm = get_llm(api_key=key)
     # Also provide repo tools so the doc analyst can cross-reference file paths!
-    tools = [query_pdf_report, extract_paths_from_pdf, clone_repository, list_files, read_file]
+    tools = [query_pdf_report, query_pdf_report_batch, extract_paths_from_pdf, clone_repository, list_files, read_file]
     
     pdf_path = state.get("pdf_path")
     repo_url = state.get("repo_url")
     dimensions = [d for d in state.get("rubric_dimensions", []) if d.get("target_artifact") == "pdf_report"]
     
     evidences = {}
-    for dim in dimensions:
-        dim_id = dim["id"]
-        instruction = dim["forensic_instruction"]
-        full_instruction = f"Repository URL: {repo_url}\nPDF Path: {pdf_path}\n{instruction}"
+    agent_metrics = {}
+    deadline = node_deadline(state, "detectives")
+    # Shares the repo clone with RepoInvestigator while both hold a reference
+    with audit_scope(state.get("audit_id"), holder="DocAnalyst"):
+        for i, dim in enumerate(dimensions):
+            dim_id = dim["id"]
+            instruction = dim["forensic_instruction"]
+            full_instruction = f"Repository URL: {repo_url}\nPDF Path: {pdf_path}\n{instruction}"
         
-        print(f"Agent investigating documentation: {dim_id}")
-        ev = _run_forensic_agent(llm, tools, full_instruction, dim["name"])
-        evidences[dim_id] = [ev]
+            print(f"Agent investigating documentation: {dim_id}")
+            metrics = AgentMetrics(mode=agent_mode())
+            ev = _run_forensic_agent(llm, tools, full_instruction, dim["name"],
+                                     deadline=dimension_deadline(deadline, len(dimensions) - i),
+                                     metrics=metrics)
+            evidences[dim_id] = [ev]
+            agent_metrics[dim_id] = _report_metrics(dim_id, metrics)
+        commit = cloned_commit(repo_url)
         
-    return {"evidences": evidences}
+    return {"evidences": evidences, "agent_metrics": agent_metrics, "repo_commits": {repo_url: commit} if commit else {}}
 
 def vision_inspector_node(state: AgentState) -> Dict:
     """Dynamic agent that audits visual diagrams using Qwen2.5-VL via Hugging Face."""
@@ -143,7 +357,7 @@ def vision_inspector_node(state: AgentState) -> Dict:
     key = os.getenv("OPENROUTER_API_KEY_3")
     llm = get_llm(api_key=key)
     # Note: tools are bound to the agent
-    tools = [extract_images_from_pdf, analyze_image_with_vision]
+    tools = [analyze_pdf_images, find_diagrams, extract_images_from_pdf, analyze_image_with_vision]
     
     pdf_path = state.get("pdf_path")
     
@@ -153,14 +367,25 @@ def vision_inspector_node(state: AgentState) -> Dict:
         dimensions = [d for d in state.get("rubric_dimensions", []) if "diagram" in d.get("name", "").lower() or d.get("id") == "swarm_visual"]
 
     evidences = {}
-    for dim in dimensions:
-        dim_id = dim["id"]
-        instruction = dim["forensic_instruction"]
-        # Explicitly tell the agent which model to use for vision tasks via tool description or instruction
-        full_instruction = f"PDF Path: {pdf_path}\nUSE Qwen2.5-VL for visual analysis.\n{instruction}"
+    agent_metrics = {}
+    deadline = node_deadline(state, "detectives")
+    # Extracted images are dropped when this node is done, even if it fails
+    with audit_scope(state.get("audit_id"), holder="VisionInspector"):
+        try:
+            for i, dim in enumerate(dimensions):
+                dim_id = dim["id"]
+                instruction = dim["forensic_instruction"]
+                # Explicitly tell the agent which model to use for vision tasks via tool description or instruction
+                full_instruction = f"PDF Path: {pdf_path}\nUSE Qwen2.5-VL for visual analysis; analyze_pdf_images covers the likely diagrams in one call.\n{instruction}"
         
-        print(f"Agent investigating visuals: {dim_id}")
-        ev = _run_forensic_agent(llm, tools, full_instruction, dim["name"])
-        evidences[dim_id] = [ev]
+                print(f"Agent investigating visuals: {dim_id}")
+                metrics = AgentMetrics(mode=agent_mode())
+                ev = _run_forensic_agent(llm, tools, full_instruction, dim["name"],
+                                         deadline=dimension_deadline(deadline, len(dimensions) - i),
+                                         metrics=metrics)
+                evidences[dim_id] = [ev]
+                agent_metrics[dim_id] = _report_metrics(dim_id, metrics)
+        finally:
+            cleanup_vision_images()
     
-    return {"evidences": evidences}
\ No newline at end of file
+    return {"evidences": evidences, "agent_metrics": agent_metrics}
\ No newline at end of file
@@ -1,8 +1,7 @@
 import logging
 from typing import Dict
 from src.state import AgentState
-from src.tools.repo_tools import cleanup_temp_dirs
-from src.tools.vision_tools import cleanup_vision_images
+from src.tools.workspace import release_workspace
 
 logger = logging.getLogger(__name__)
 
@@ -38,9 +37,9 @@ def aggregate_evidence(state: AgentState) -> Dict:
         found_count = sum(1 for item in items if item.found)
         print(f"  - [{dim_id}]: {count} items ({found_count} found)")
 
-    # Clean up all temp resources since all detective nodes have finished
-    cleanup_temp_dirs()
-    cleanup_vision_images()
+    # All detective nodes have finished: delete this audit's temp resources only,
+    # leaving workspaces of other audits running in the same process untouched
+    release_workspace(state.get("audit_id"))
 
     # Return the evidences (operator.ior will handle the merge in state)
     return {"evidences": evidences}
\ No newline at end of file
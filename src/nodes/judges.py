@@ -4,6 +4,9 @@ from langchain_core.messages import SystemMessage, HumanMessage
 from src.state import AgentState, Evidence, JudicialOpinion
 from src.llm_factory import get_llm
 from src.tools.prompt_loader import load_prompt
+from src.deadlines import DeadlineExceeded, dimension_deadline, invoke_before, node_deadline, time_left
+
+RETRY_DELAY_S = 5
 
 def _get_evidence_for_dimension(state: AgentState, dimension_id: str) -> List[Evidence]:
     """Get all evidence items for a specific dimension."""
@@ -24,8 +27,9 @@ def _run_judge_persona(
     rubric_dimensions = state.get("rubric_dimensions", [])
     all_opinions = []
     max_retries = 3
+    deadline = node_deadline(state, "judges")
     
-    for dimension in rubric_dimensions:
+    for dim_index, dimension in enumerate(rubric_dimensions):
         dim_id = dimension.get("id")
         dim_name = dimension.get("name", dim_id)
         evidence_items = _get_evidence_for_dimension(state, dim_id)
@@ -65,15 +69,29 @@ def _run_judge_persona(
         
         max_retries = 3
         opinion = None
+        dim_deadline = dimension_deadline(deadline, len(rubric_dimensions) - dim_index)
         for attempt in range(max_retries):
             try:
-                opinion = structured_llm.invoke([
+                opinion = invoke_before(structured_llm, [
                     SystemMessage(content=system_prompt_content),
                     HumanMessage(content=user_prompt)
-                ])
+                ], dim_deadline)
+                break
+            except DeadlineExceeded as e:
+                print(f"Judge {judge_role} ran out of time on {dim_id}: {e}")
+                # Reported in the opinions but excluded from synthesis, so a
+                # timed-out judge can neither move the score nor cause a dissent
+                opinion = JudicialOpinion(
+                    judge=judge_role,
+                    criterion_id=dim_id,
+                    score=3,
+                    argument=f"DEADLINE_EXCEEDED: Low-confidence placeholder, the judge could not deliberate within its time budget ({e}).",
+                    cited_evidence=[],
+                    placeholder=True
+                )
                 break
             except Exception as e:
-                if attempt == max_retries - 1:
+                if attempt == max_retries - 1 or time_left(dim_deadline) < RETRY_DELAY_S:
                     print(f"Error invoking judge {judge_role} for {dim_id} after {max_retries} retries: {e}")
                     # Fallback for malformed output: force a failure score or retry logic
                     opinion = JudicialOpinion(
@@ -84,8 +102,8 @@ def _run_judge_persona(
                         cited_evidence=[]
                     )
                 else:
-                    print(f"API Error during {judge_role} analysis for {dim_id} (attempt {attempt+1}/{max_retries}): {e}. Retrying in 5 seconds...")
-                    time.sleep(5)
+                    print(f"API Error during {judge_role} analysis for {dim_id} (attempt {attempt+1}/{max_retries}): {e}. Retrying in {RETRY_DELAY_S} seconds...")
+                    time.sleep(RETRY_DELAY_S)
 
         # Ensure the judge and criterion_id are explicitly set if not returned correctly
         opinion.judge = judge_role
@@ -1,11 +1,18 @@
+import hashlib
 import json
 import logging
+import os
+import threading
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional
 from langchain_core.messages import HumanMessage
-from src.state import AgentState, AuditReport, CriterionResult, JudicialOpinion
-from src.llm_factory import get_llm
+from src.state import AgentState, AuditReport, CriterionResult
+from src.config import get_cache_dir, summary_mode
+from src.llm_factory import default_model_id, get_llm
+from src.deadlines import invoke_before, node_deadline
+from src.synthesis import synthesize
+from src.results_store import get_results_store
 
 logger = logging.getLogger(__name__)
 
@@ -19,121 +26,96 @@ def synthesize_verdicts(state: AgentState) -> Dict:
     - Rule of Evidence: Overrule hallucination if evidence is missing.
     - Rule of Functionality: Tech Lead weight for architecture.
     
-    Synchronous version.
+    Only the rules run here: the executive summary (ExecutiveSummary) and the
+    persisted report skeleton (ReportWriter) are produced in parallel after it.
     """
-    rubric_dimensions = state.get("rubric_dimensions", [])
-    opinions = state.get("opinions", [])
-    evidences = state.get("evidences", {})
-    
-    criterion_results: List[CriterionResult] = []
-    
-    # 1. Process each criterion
-    for dimension in rubric_dimensions:
-        dim_id = dimension.get("id")
-        dim_name = dimension.get("name", dim_id)
-        
-        # Get opinions for this dimension
-        dim_opinions = [op for op in opinions if op.criterion_id == dim_id]
-        if not dim_opinions:
-            continue
-
-        prosecutor_op = next((op for op in dim_opinions if op.judge == "Prosecutor"), None)
-        defense_op = next((op for op in dim_opinions if op.judge == "Defense"), None)
-        techlead_op = next((op for op in dim_opinions if op.judge == "TechLead"), None)
-        
-        # Base score (average)
-        scores = [op.score for op in dim_opinions]
-        final_score = sum(scores) / len(scores)
-        applied_rules = []
-
-        is_sec_flaw = False
-        if prosecutor_op and prosecutor_op.score <= 2:
-            is_sec_flaw = any(word in prosecutor_op.argument.lower() for word in ["security", "flaw", "vulnerability", "injection", "unsanitized"])
-
-        # --- RULE 2: Rule of Evidence (Hallucination Check) ---
-        # If Defense claims success but evidence specifically says FOUND: False
-        if defense_op and defense_op.score >= 4:
-            dim_evidence = evidences.get(dim_id, [])
-            missing_critical = any(ev.found is False for ev in dim_evidence if ev.confidence > 0.8)
-            if missing_critical:
-                final_score = max(1.0, final_score - 1.5) # Penalty for hallucination
-                applied_rules.append("Rule of Evidence: Defense overruled for evidence hallucination.")
-
-        # --- RULE 3: Rule of Functionality (Tech Lead Weight) ---
-        if dimension.get("target_artifact") == "github_repo" and techlead_op:
-            # If Tech Lead says it's modular (Score >= 4), pull the score up
-            if techlead_op.score >= 4:
-                final_score = (final_score + techlead_op.score) / 2
-                applied_rules.append("Rule of Functionality: Tech Lead confirms modular architecture.")
-
-        # --- RULE 1: Rule of Security (Hard Cap) ---
-        # Applied last to ensure it cannot be overridden by other rules
-        if is_sec_flaw:
-            final_score = min(final_score, 3.0)
-            applied_rules.append("Rule of Security: Flaw detected, score capped at 3.")
-
-        # Dissent check
-        score_variance = max(scores) - min(scores)
-        dissent_summary = None
-        if score_variance >= 2:
-            dissent_summary = f"DISSENT DETECTED: Variance of {score_variance} between {prosecutor_op.judge if prosecutor_op else 'Judges'} and {defense_op.judge if defense_op else 'Judges'}."
-            if applied_rules:
-                dissent_summary += " Resolved by: " + "; ".join(applied_rules)
-
-        # Final Formatting
-        final_score_rounded = int(round(final_score))
-        remediation = f"Fix findings in {dim_id}."
-        if prosecutor_op and prosecutor_op.score < 3:
-            remediation = f"Address Critical Lens findings: {prosecutor_op.argument[:200]}..."
-
-        criterion_results.append(CriterionResult(
-            dimension_id=dim_id,
-            dimension_name=dim_name,
-            final_score=final_score_rounded,
-            judge_opinions=dim_opinions,
-            dissent_summary=dissent_summary,
-            remediation=remediation
-        ))
-
-    # 2. Calculate Overall Score
-    overall_score = sum(c.final_score for c in criterion_results) / len(criterion_results) if criterion_results else 0.0
-
-    # 3. Generate LLM Executive Summary (Synchronous call)
-    summary = _generate_llm_summary(overall_score, criterion_results)
-    
-    # 3. Build AuditReport
-    report = AuditReport(
-        repo_url=state.get("repo_url", "N/A"),
-        executive_summary=summary,
-        overall_score=overall_score,
-        criteria=criterion_results,
-        remediation_plan="\n".join([f"### {c.dimension_name}\n- {c.remediation}" for c in criterion_results if c.final_score < 4])
+    # Rules applied over a dimension x judge score matrix, see src/synthesis.py
+    criterion_results = synthesize(
+        state.get("rubric_dimensions", []),
+        state.get("opinions", []),
+        state.get("evidences", {}),
     )
+    audit_id = state.get("audit_id") or datetime.now().strftime("audit_%Y%m%d_%H%M%S")
+    return {"audit_id": audit_id, "criterion_results": criterion_results}
 
-    # 3. Save Markdown Report
-    output_dir = Path("audit")
-        
-    output_dir.mkdir(parents=True, exist_ok=True)
-    report_md = generate_report_markdown(report)
-    
-    # Generate timestamped filename
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"audit_report_{timestamp}.md"
-    
-    # Save both timestamped and general version
-    with open(output_dir/filename, "w") as f:
-        f.write(report_md)
-    with open(output_dir/"audit_report.md", "w") as f:
-        f.write(report_md)
-    
-    print(f"--- Chief Justice: Final Audit Report Generated at {output_dir}/{filename} ---")
+def generate_executive_summary(state: AgentState) -> Dict:
+    """
+    ExecutiveSummary node: LLM summary of the criterion results (bounded by the
+    audit SLA), or a templated one with AUDITOR_SUMMARY_MODE=template.
+    """
+    results = state.get("criterion_results") or []
+    overall_score = overall_score_of(results)
+    if summary_mode() == "template":
+        return {"executive_summary": template_summary(overall_score, results)}
+    return {"executive_summary": _generate_llm_summary(overall_score, results, deadline=node_deadline(state, "justice"))}
+
+def write_report_skeleton(state: AgentState) -> Dict:
+    """
+    ReportWriter node: builds the AuditReport with a templated summary and
+    saves it to the results store while the ExecutiveSummary node runs.
+    """
+    results = state.get("criterion_results") or []
+    report = build_report(state.get("repo_url", "N/A"), results, template_summary(overall_score_of(results), results))
+    get_results_store().save_audit(
+        state["audit_id"],
+        report,
+        state.get("evidences", {}),
+        commit_sha=state.get("repo_commits", {}).get(report.repo_url),
+        pdf_path=state.get("pdf_path"),
+    )
+    return {"final_report": report}
+
+def publish_report(state: AgentState) -> Dict:
+    """PublishReport node: puts the executive summary into the stored report."""
+    report = state["final_report"]
+    summary = state.get("executive_summary")
+    store = get_results_store()
+    if summary and summary != report.executive_summary:
+        report = report.model_copy(update={"executive_summary": summary})
+        store.set_executive_summary(state["audit_id"], summary)
+
+    print(f"--- Chief Justice: Audit {state['audit_id']} saved to {store.db_path} ---")
 
     return {"final_report": report}
 
-def _generate_llm_summary(overall_score: float, results: List[CriterionResult]) -> str:
-    """Synthesizes all findings into a professional Executive Summary using an LLM. Synchronous."""
-    llm = get_llm()
-    
+def overall_score_of(criterion_results: List[CriterionResult]) -> float:
+    """Mean final score over the judged dimensions (0.0 if none were judged)."""
+    return sum(c.final_score for c in criterion_results) / len(criterion_results) if criterion_results else 0.0
+
+def build_report(repo_url: str, criterion_results: List[CriterionResult], executive_summary: str) -> AuditReport:
+    """Assembles the AuditReport, with a remediation plan for every dimension scoring below 4."""
+    return AuditReport(
+        repo_url=repo_url,
+        executive_summary=executive_summary,
+        overall_score=overall_score_of(criterion_results),
+        criteria=criterion_results,
+        remediation_plan="\n".join([f"### {c.dimension_name}\n- {c.remediation}" for c in criterion_results if c.final_score < 4])
+    )
+
+def template_summary(overall_score: float, results: List[CriterionResult]) -> str:
+    """Deterministic executive summary built from the scores alone (no LLM call)."""
+    strong = [c.dimension_name for c in results if c.final_score >= 4]
+    risks = [c.dimension_name for c in results if c.final_score <= 2]
+    disputed = [c.dimension_name for c in results if c.dissent_summary]
+    lines = [f"Overall Score: {overall_score:.2f}/5.0 across {len(results)} dimensions."]
+    if strong:
+        lines.append(f"Strongest areas: {', '.join(strong)}.")
+    if risks:
+        lines.append(f"Critical risk areas: {', '.join(risks)}.")
+    if disputed:
+        lines.append(f"Judges disagreed on: {', '.join(disputed)}.")
+    return " ".join(lines)
+
+def _summary_cache_path(prompt: str) -> Path:
+    key = hashlib.sha256(f"{default_model_id()}\0{prompt}".encode("utf-8")).hexdigest()
+    return get_cache_dir() / "summaries" / f"{key}.json"
+
+def _generate_llm_summary(overall_score: float, results: List[CriterionResult], deadline: Optional[float] = None) -> str:
+    """
+    Synthesizes all findings into a professional Executive Summary using an LLM. Synchronous.
+    The prompt depends only on the findings, so answers are cached under <cache>/summaries/
+    by (model, prompt). Falls back to a templated summary if the call fails or the deadline passes.
+    """
     findings_context = ""
     for c in results:
         findings_context += f"- {c.dimension_name}: {c.final_score}/5. "
@@ -142,12 +124,10 @@ def _generate_llm_summary(overall_score: float, results: List[CriterionResult])
             args = " ".join([op.argument[:150] for op in c.judge_opinions])
             findings_context += f"Judicial Consensus/Conflict: {args}\n"
             
-    now_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     prompt = f"""
     You are the Chief Justice of the Digital Courtroom. 
     Synthesize the following forensic audit results into a cohesive, high-level Executive Summary.
     
-    Audit Completion Time: {now_str}
     Overall Consolidated Stakeholder Score: {overall_score:.2f} / 5.0
     
     Individual Dimension Findings:
@@ -160,12 +140,26 @@ def _generate_llm_summary(overall_score: float, results: List[CriterionResult])
     4. Be professional, objective, and written for senior stakeholders.
     5. Avoid repeating the list - instead, synthesize the overall quality.
     """
-    
+
+    cache_path = _summary_cache_path(prompt)
+    try:
+        return json.loads(cache_path.read_text(encoding="utf-8"))["summary"]
+    except (OSError, ValueError, KeyError):
+        pass
+
     try:
-        response = llm.invoke([HumanMessage(content=prompt)])
-        return response.content.strip()
-    except Exception as e:
-        return f"Audit completed at {now_str}. Overall Score: {overall_score:.2f}/5.0. (Manual fallback: System evaluated {len(results)} dimensions with satisfactory results across the board.)"
+        response = invoke_before(get_llm(), [HumanMessage(content=prompt)], deadline)
+        summary = response.content.strip()
+    except Exception:
+        # Same text as the stored skeleton, so PublishReport has nothing misleading to write over it
+        return template_summary(overall_score, results)
+
+    # Only real answers are cached; the tmp file keeps concurrent audits from reading half a write
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = cache_path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_text(json.dumps({"model": default_model_id(), "summary": summary}), encoding="utf-8")
+    tmp.replace(cache_path)
+    return summary
 
 def generate_report_markdown(report: AuditReport) -> str:
     """Professional rendering of the AuditReport as Markdown."""
@@ -0,0 +1,160 @@
+import json
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional
+from pydantic import BaseModel, Field
+from src.state import AuditReport, Evidence, JudicialOpinion
+from src.synthesis import synthesize_many
+
+if TYPE_CHECKING:
+    from src.results_store import ResultsStore
+
+SUMMARY_MODES = ("template", "keep", "llm")
+
+
+class RescoreOutcome(BaseModel):
+    audit_id: str
+    state_path: Optional[str] = None
+    old_overall_score: Optional[float] = None
+    new_overall_score: Optional[float] = None
+    changed_dimensions: List[str] = Field(default_factory=list, description="Dimension ids whose final score changed")
+    error: Optional[str] = None
+
+
+def find_state_files(paths: Iterable[str]) -> List[Path]:
+    """state.json files given directly or found under batch output directories."""
+    found: List[Path] = []
+    for path in map(Path, paths):
+        found.extend(sorted(path.rglob("state.json")) if path.is_dir() else [path])
+    return found
+
+
+def load_rubric_dimensions(rubric_path: str) -> List[Dict]:
+    with open(rubric_path, "r", encoding="utf-8") as f:
+        return json.load(f).get("dimensions", [])
+
+
+def _load_state(path: Path, dimensions: Optional[List[Dict]]):
+    data = json.loads(path.read_text(encoding="utf-8"))
+    opinions = [JudicialOpinion.model_validate(op) for op in data.get("opinions", [])]
+    evidences = {dim_id: [Evidence.model_validate(ev) for ev in items]
+                 for dim_id, items in data.get("evidences", {}).items()}
+    return data, (dimensions if dimensions is not None else data.get("rubric_dimensions", []), opinions, evidences)
+
+
+def _rescored_report(repo_url: Optional[str], old_report: Optional[AuditReport], results, summary: str) -> AuditReport:
+    from src.nodes.justice import _generate_llm_summary, build_report, overall_score_of, template_summary
+
+    overall = overall_score_of(results)
+    if summary == "keep" and old_report is not None:
+        executive_summary = old_report.executive_summary
+    elif summary == "llm":
+        executive_summary = _generate_llm_summary(overall, results)
+    else:
+        executive_summary = template_summary(overall, results)
+    return build_report(repo_url or "N/A", results, executive_summary)
+
+
+def _outcome(audit_id: str, state_path: Optional[str], old_report: Optional[AuditReport], report: AuditReport,
+             results) -> RescoreOutcome:
+    old_scores = {c.dimension_id: c.final_score for c in old_report.criteria} if old_report else {}
+    return RescoreOutcome(
+        audit_id=audit_id,
+        state_path=state_path,
+        old_overall_score=old_report.overall_score if old_report else None,
+        new_overall_score=report.overall_score,
+        changed_dimensions=[c.dimension_id for c in results if old_scores.get(c.dimension_id) != c.final_score],
+    )
+
+
+def _error(e: Exception) -> str:
+    return f"{type(e).__name__}: {e}"
+
+
+def _check_summary_mode(summary: str) -> None:
+    if summary not in SUMMARY_MODES:
+        raise ValueError(f"Unknown summary mode '{summary}'; expected one of {', '.join(SUMMARY_MODES)}")
+
+
+def rescore_audits(state_paths: List[Path], rubric_path: Optional[str] = None, summary: str = "template",
+                   output_dir: Optional[str] = None, store: Optional["ResultsStore"] = None) -> List[RescoreOutcome]:
+    """
+    Re-applies only the Chief Justice stage to stored audits (batch state.json
+    files), using the current synthesis rules and optionally a new rubric.
+    No detective or judge runs again; the executive summary is templated,
+    kept from the stored report, or regenerated by the LLM (`summary`).
+    Each audit's state.json and report.md are rewritten in place, or under
+    output_dir/<audit_id>/ when given. With `store`, audits already in the
+    results store are updated there too. An audit that can't be re-scored
+    gets an error in its outcome; the others still go through.
+    """
+    from src.nodes.justice import generate_report_markdown
+
+    _check_summary_mode(summary)
+    dimensions = load_rubric_dimensions(rubric_path) if rubric_path else None
+
+    outcomes: Dict[Path, RescoreOutcome] = {}
+    loaded = []
+    for path in state_paths:
+        try:
+            loaded.append((path, *_load_state(path, dimensions)))
+        except Exception as e:
+            outcomes[path] = RescoreOutcome(audit_id=path.parent.name, state_path=str(path), error=_error(e))
+
+    all_results = synthesize_many([inputs for _, _, inputs in loaded])
+
+    for (path, data, inputs), results in zip(loaded, all_results):
+        audit_id = path.parent.name
+        try:
+            old_report = AuditReport.model_validate(data["final_report"]) if data.get("final_report") else None
+            report = _rescored_report(data.get("repo_url"), old_report, results, summary)
+            job_dir = Path(output_dir) / audit_id if output_dir else path.parent
+            job_dir.mkdir(parents=True, exist_ok=True)
+            if dimensions is not None:
+                data["rubric_dimensions"] = dimensions
+            data["final_report"] = report.model_dump()
+            (job_dir / "state.json").write_text(json.dumps(data, indent=2), encoding="utf-8")
+            (job_dir / "report.md").write_text(generate_report_markdown(report), encoding="utf-8")
+            info = store.audit_info(audit_id) if store is not None else None
+            if info is not None:
+                store.save_audit(audit_id, report, inputs[2], commit_sha=info["commit_sha"],
+                                 pdf_path=data.get("pdf_path"), created_at=info["created_at"])
+            outcomes[path] = _outcome(audit_id, str(path), old_report, report, results)
+        except Exception as e:
+            outcomes[path] = RescoreOutcome(audit_id=audit_id, state_path=str(path), error=_error(e))
+    return [outcomes[path] for path in state_paths]
+
+
+def rescore_store(store: "ResultsStore", rubric_path: str, summary: str = "template",
+                  since: Optional[float] = None) -> List[RescoreOutcome]:
+    """
+    Re-scores audits straight from the results store (every audit, or those
+    created at or after `since`, epoch seconds), in place. The store keeps
+    no rubric, so the dimensions come from rubric_path; opinions and evidence
+    are the stored ones. Each audit keeps its commit, PDF path and date.
+    """
+    _check_summary_mode(summary)
+    dimensions = load_rubric_dimensions(rubric_path)
+
+    outcomes: Dict[str, RescoreOutcome] = {}
+    loaded = []
+    audit_ids = sorted(row["audit_id"] for row in store.find_audits(since=since))
+    for audit_id in audit_ids:
+        try:
+            old_report = store.load_report(audit_id)
+            opinions = [op for c in old_report.criteria for op in c.judge_opinions]
+            loaded.append((audit_id, old_report, (dimensions, opinions, store.load_evidences(audit_id))))
+        except Exception as e:
+            outcomes[audit_id] = RescoreOutcome(audit_id=audit_id, error=_error(e))
+
+    all_results = synthesize_many([inputs for _, _, inputs in loaded])
+
+    for (audit_id, old_report, inputs), results in zip(loaded, all_results):
+        try:
+            report = _rescored_report(old_report.repo_url, old_report, results, summary)
+            info = store.audit_info(audit_id)
+            store.save_audit(audit_id, report, inputs[2], commit_sha=info["commit_sha"], pdf_path=info["pdf_path"],
+                             created_at=info["created_at"])
+            outcomes[audit_id] = _outcome(audit_id, None, old_report, report, results)
+        except Exception as e:
+            outcomes[audit_id] = RescoreOutcome(audit_id=audit_id, error=_error(e))
+    return [outcomes[audit_id] for audit_id in audit_ids]
@@ -0,0 +1,249 @@
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+from src.state import AuditReport, CriterionResult, Evidence, JudicialOpinion
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS audits (
+    audit_id TEXT PRIMARY KEY,
+    repo_url TEXT,
+    commit_sha TEXT,
+    pdf_path TEXT,
+    overall_score REAL NOT NULL,
+    executive_summary TEXT NOT NULL,
+    remediation_plan TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS audits_repo ON audits (repo_url, commit_sha);
+CREATE INDEX IF NOT EXISTS audits_created ON audits (created_at);
+
+CREATE TABLE IF NOT EXISTS criteria (
+    audit_id TEXT NOT NULL REFERENCES audits (audit_id) ON DELETE CASCADE,
+    seq INTEGER NOT NULL,
+    dimension_id TEXT NOT NULL,
+    dimension_name TEXT NOT NULL,
+    final_score INTEGER NOT NULL,
+    dissent_summary TEXT,
+    remediation TEXT NOT NULL,
+    PRIMARY KEY (audit_id, seq)
+);
+CREATE INDEX IF NOT EXISTS criteria_dimension_score ON criteria (dimension_id, final_score);
+
+CREATE TABLE IF NOT EXISTS opinions (
+    audit_id TEXT NOT NULL REFERENCES audits (audit_id) ON DELETE CASCADE,
+    criterion_seq INTEGER NOT NULL,
+    seq INTEGER NOT NULL,
+    judge TEXT NOT NULL,
+    criterion_id TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    argument TEXT NOT NULL,
+    cited_evidence TEXT NOT NULL,
+    placeholder INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (audit_id, criterion_seq, seq)
+);
+CREATE INDEX IF NOT EXISTS opinions_judge ON opinions (criterion_id, judge, score);
+
+CREATE TABLE IF NOT EXISTS evidence (
+    audit_id TEXT NOT NULL REFERENCES audits (audit_id) ON DELETE CASCADE,
+    dimension_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    goal TEXT NOT NULL,
+    found INTEGER NOT NULL,
+    content TEXT,
+    location TEXT NOT NULL,
+    rationale TEXT NOT NULL,
+    confidence REAL NOT NULL,
+    PRIMARY KEY (audit_id, dimension_id, seq)
+);
+"""
+
+
+class ResultsStore:
+    """
+    SQLite store of every audit's report, criterion results, judicial opinions
+    and evidence, keyed by audit id (and indexed by repo URL/commit and by
+    dimension score). Safe to share between threads and batch processes:
+    each thread gets its own connection and the database runs in WAL mode.
+    Markdown is rendered from it on demand (render_markdown).
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+        return conn
+
+    # --- Writes ---
+    def save_audit(self, audit_id: str, report: AuditReport, evidences: Optional[Dict[str, List[Evidence]]] = None,
+                   commit_sha: Optional[str] = None, pdf_path: Optional[str] = None,
+                   created_at: Optional[float] = None) -> None:
+        """
+        Stores (or replaces) one audit in a single transaction, dated now
+        unless created_at is given (re-scoring passes the original date so
+        the audit stays in its cohort).
+        """
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM audits WHERE audit_id = ?", (audit_id,))
+            conn.execute(
+                "INSERT INTO audits VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (audit_id, report.repo_url, commit_sha, pdf_path, report.overall_score,
+                 report.executive_summary, report.remediation_plan,
+                 time.time() if created_at is None else created_at),
+            )
+            conn.executemany(
+                "INSERT INTO criteria VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(audit_id, i, c.dimension_id, c.dimension_name, c.final_score, c.dissent_summary, c.remediation)
+                 for i, c in enumerate(report.criteria)],
+            )
+            conn.executemany(
+                "INSERT INTO opinions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(audit_id, i, j, op.judge, op.criterion_id, op.score, op.argument, json.dumps(op.cited_evidence),
+                  int(op.placeholder))
+                 for i, c in enumerate(report.criteria) for j, op in enumerate(c.judge_opinions)],
+            )
+            conn.executemany(
+                "INSERT INTO evidence VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(audit_id, dim_id, j, ev.goal, int(ev.found), ev.content, ev.location, ev.rationale, ev.confidence)
+                 for dim_id, items in (evidences or {}).items() for j, ev in enumerate(items)],
+            )
+
+    def set_executive_summary(self, audit_id: str, summary: str) -> None:
+        conn = self._connect()
+        with conn:
+            conn.execute("UPDATE audits SET executive_summary = ? WHERE audit_id = ?", (summary, audit_id))
+
+    # --- Reads ---
+    def load_report(self, audit_id: str) -> Optional[AuditReport]:
+        conn = self._connect()
+        audit = conn.execute("SELECT * FROM audits WHERE audit_id = ?", (audit_id,)).fetchone()
+        if audit is None:
+            return None
+        opinions: Dict[int, List[JudicialOpinion]] = {}
+        for row in conn.execute("SELECT * FROM opinions WHERE audit_id = ? ORDER BY criterion_seq, seq", (audit_id,)):
+            opinions.setdefault(row["criterion_seq"], []).append(JudicialOpinion(
+                judge=row["judge"], criterion_id=row["criterion_id"], score=row["score"],
+                argument=row["argument"], cited_evidence=json.loads(row["cited_evidence"]),
+                placeholder=bool(row["placeholder"]),
+            ))
+        criteria = [
+            CriterionResult(
+                dimension_id=row["dimension_id"], dimension_name=row["dimension_name"], final_score=row["final_score"],
+                judge_opinions=opinions.get(row["seq"], []), dissent_summary=row["dissent_summary"],
+                remediation=row["remediation"],
+            )
+            for row in conn.execute("SELECT * FROM criteria WHERE audit_id = ? ORDER BY seq", (audit_id,))
+        ]
+        return AuditReport(
+            repo_url=audit["repo_url"], executive_summary=audit["executive_summary"],
+            overall_score=audit["overall_score"], criteria=criteria, remediation_plan=audit["remediation_plan"],
+        )
+
+    def commit_of(self, audit_id: str) -> Optional[str]:
+        row = self._connect().execute("SELECT commit_sha FROM audits WHERE audit_id = ?", (audit_id,)).fetchone()
+        return row["commit_sha"] if row else None
+
+    def audit_info(self, audit_id: str) -> Optional[Dict]:
+        """repo_url, commit_sha, pdf_path and created_at of a stored audit."""
+        row = self._connect().execute(
+            "SELECT repo_url, commit_sha, pdf_path, created_at FROM audits WHERE audit_id = ?", (audit_id,)).fetchone()
+        return dict(row) if row else None
+
+    def load_evidences(self, audit_id: str) -> Dict[str, List[Evidence]]:
+        evidences: Dict[str, List[Evidence]] = {}
+        rows = self._connect().execute(
+            "SELECT * FROM evidence WHERE audit_id = ? ORDER BY dimension_id, seq", (audit_id,))
+        for row in rows:
+            evidences.setdefault(row["dimension_id"], []).append(Evidence(
+                goal=row["goal"], found=bool(row["found"]), content=row["content"], location=row["location"],
+                rationale=row["rationale"], confidence=row["confidence"],
+            ))
+        return evidences
+
+    def render_markdown(self, audit_id: str) -> Optional[str]:
+        """The audit's Markdown report, rendered from the stored results."""
+        from src.nodes.justice import generate_report_markdown
+        report = self.load_report(audit_id)
+        return generate_report_markdown(report) if report is not None else None
+
+    def find_audits(self, dimension_id: Optional[str] = None, min_score: Optional[float] = None,
+                    max_score: Optional[float] = None, repo_url: Optional[str] = None,
+                    since: Optional[float] = None) -> List[Dict]:
+        """
+        Audits matching every given filter, lowest score first. With
+        dimension_id, scores are that dimension's final score; otherwise the
+        overall score. `since` is epoch seconds (e.g. the start of a term).
+        """
+        score = "c.final_score" if dimension_id else "a.overall_score"
+        sql = [f"SELECT a.audit_id, a.repo_url, a.commit_sha, a.overall_score, a.created_at, {score} AS score FROM audits a"]
+        where, params = [], []
+        if dimension_id:
+            sql.append("JOIN criteria c ON c.audit_id = a.audit_id")
+            where.append("c.dimension_id = ?")
+            params.append(dimension_id)
+        for clause, value in ((f"{score} >= ?", min_score), (f"{score} <= ?", max_score),
+                              ("a.repo_url = ?", repo_url), ("a.created_at >= ?", since)):
+            if value is not None:
+                where.append(clause)
+                params.append(value)
+        if where:
+            sql.append("WHERE " + " AND ".join(where))
+        sql.append("ORDER BY score, a.audit_id")
+        return [dict(row) for row in self._connect().execute(" ".join(sql), params)]
+
+    def dimension_summary(self, since: Optional[float] = None) -> List[Dict]:
+        """Per dimension: number of audits and mean/min/max final score."""
+        sql = ("SELECT c.dimension_id, COUNT(*) AS audits, AVG(c.final_score) AS mean, "
+               "MIN(c.final_score) AS min, MAX(c.final_score) AS max "
+               "FROM criteria c JOIN audits a ON a.audit_id = c.audit_id "
+               "WHERE a.created_at >= ? GROUP BY c.dimension_id ORDER BY c.dimension_id")
+        return [dict(row) for row in self._connect().execute(sql, (since or 0,))]
+
+    def _scores(self, dimension_id: Optional[str], since: Optional[float]) -> np.ndarray:
+        return np.array([row["score"] for row in self.find_audits(dimension_id=dimension_id, since=since)], dtype=float)
+
+    def percentiles(self, dimension_id: Optional[str] = None, since: Optional[float] = None,
+                    q: Sequence[float] = (10, 25, 50, 75, 90)) -> Dict[str, float]:
+        """Cohort percentiles of the overall score, or of one dimension's final score."""
+        scores = self._scores(dimension_id, since)
+        if len(scores) == 0:
+            return {}
+        return {f"p{p:g}": round(float(v), 3) for p, v in zip(q, np.percentile(scores, q))}
+
+    def percentile_rank(self, audit_id: str, dimension_id: Optional[str] = None,
+                        since: Optional[float] = None) -> Optional[float]:
+        """Share (0-100) of the cohort scoring at or below this audit."""
+        rows = self.find_audits(dimension_id=dimension_id, since=since)
+        mine = next((row["score"] for row in rows if row["audit_id"] == audit_id), None)
+        if mine is None:
+            return None
+        return round(100.0 * sum(1 for row in rows if row["score"] <= mine) / len(rows), 1)
+
+
+_stores: Dict[Path, ResultsStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_results_store(db_path: Optional[Path] = None) -> ResultsStore:
+    """Process-wide ResultsStore for AUDITOR_RESULTS_DB (or db_path)."""
+    from src.config import results_db_path
+    path = Path(db_path or results_db_path()).resolve()
+    with _stores_lock:
+        if path not in _stores:
+            _stores[path] = ResultsStore(path)
+        return _stores[path]
@@ -1,6 +1,7 @@
 from typing import Annotated, Dict, List, Literal, Optional
 from typing_extensions import TypedDict
 from pydantic import BaseModel, Field
+from pydantic.json_schema import SkipJsonSchema
 import operator
 
 # --- Detective Output ---
@@ -19,6 +20,9 @@ class JudicialOpinion(BaseModel):
     score: int = Field(ge=1, le=5)
     argument: str
     cited_evidence: List[str]
+    # Set only by the judge node when it ran out of time; hidden from the LLM's output schema.
+    # Placeholders are reported but never counted as votes by the Chief Justice.
+    placeholder: SkipJsonSchema[bool] = False
 
 # --- Chief Justice Output ---
 class CriterionResult(BaseModel):
@@ -41,10 +45,21 @@ class AuditReport(BaseModel):
 
 # --- Graph State ---
 class AgentState(TypedDict):
+    audit_id: str
     repo_url: str
     pdf_path: str
+    rubric_path: Optional[str]
+    # Epoch seconds by which the audit must finish (None: no SLA)
+    deadline: Optional[float]
     rubric_dimensions: List[Dict]
     # Use reducers to prevent parallel agents from overwriting data
     evidences: Annotated[Dict[str, List[Evidence]], operator.ior]
     opinions: Annotated[List[JudicialOpinion], operator.add]
+    # Per-dimension cost of the forensic agents (turns, tool calls, tokens, latency)
+    agent_metrics: Annotated[Dict[str, Dict], operator.ior]
+    # Commit each repository clone checked out, by repo URL (recorded at clone time)
+    repo_commits: Annotated[Dict[str, str], operator.ior]
+    # Chief Justice outputs, consumed by the parallel ExecutiveSummary / ReportWriter steps
+    criterion_results: Optional[List[CriterionResult]]
+    executive_summary: Optional[str]
     final_report: Optional[AuditReport]
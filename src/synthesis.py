@@ -0,0 +1,188 @@
+from typing import Dict, List, Sequence, Tuple
+import numpy as np
+from src.state import CriterionResult, Evidence, JudicialOpinion
+
+JUDGES = ("Prosecutor", "Defense", "TechLead")
+PROSECUTOR, DEFENSE, TECHLEAD = range(len(JUDGES))
+SECURITY_WORDS = ("security", "flaw", "vulnerability", "injection", "unsanitized")
+
+RULE_OF_EVIDENCE = "Rule of Evidence: Defense overruled for evidence hallucination."
+RULE_OF_FUNCTIONALITY = "Rule of Functionality: Tech Lead confirms modular architecture."
+RULE_OF_SECURITY = "Rule of Security: Flaw detected, score capped at 3."
+
+# One audit's synthesis inputs: (rubric dimensions, opinions, evidences by dimension id)
+AuditInputs = Tuple[List[Dict], List[JudicialOpinion], Dict[str, List[Evidence]]]
+
+
+class ScoreMatrix:
+    """
+    Synthesis inputs for A audits x D dimension slots, built in one pass over
+    each audit's opinions. Slot d of audit a is that audit's d-th rubric
+    dimension; audits with fewer dimensions leave trailing slots empty.
+
+    - total/count/high/low: sum, number, max and min of all opinion scores
+    - placeholders: opinions of judges that timed out; listed with the others but never votes
+    - first: (A, D, 3) score of each judge's first real opinion, NaN if it gave none
+    - security_flaw: the Prosecutor's first opinion scores <= 2 and names a security issue
+    - missing_evidence: a detective reported the artifact missing with confidence > 0.8
+    - repo_target: the dimension targets the GitHub repository
+    """
+
+    def __init__(self, audits: Sequence[AuditInputs]):
+        n_audits = len(audits)
+        n_dims = max((len(dims) for dims, _, _ in audits), default=0)
+        shape = (n_audits, n_dims)
+        self.dimensions = [dims for dims, _, _ in audits]
+        self.total = np.zeros(shape)
+        self.count = np.zeros(shape, dtype=np.int64)
+        self.placeholders = np.zeros(shape, dtype=np.int64)
+        self.high = np.full(shape, np.iinfo(np.int64).min, dtype=np.int64)
+        self.low = np.full(shape, np.iinfo(np.int64).max, dtype=np.int64)
+        self.first = np.full(shape + (len(JUDGES),), np.nan)
+        self.security_flaw = np.zeros(shape, dtype=bool)
+        self.missing_evidence = np.zeros(shape, dtype=bool)
+        self.repo_target = np.zeros(shape, dtype=bool)
+        # Objects the results are materialized from: opinions per slot, first opinion per judge
+        self.opinions: List[List[List[JudicialOpinion]]] = []
+        self.first_opinions: List[Dict[Tuple[int, int], JudicialOpinion]] = []
+        judge_index = {judge: j for j, judge in enumerate(JUDGES)}
+        # Flat (audit, slot, score) rows, scattered into the arrays in one go below
+        rows_a: List[int] = []
+        rows_d: List[int] = []
+        rows_score: List[int] = []
+
+        for a, (dims, opinions, evidences) in enumerate(audits):
+            slots: Dict[str, List[int]] = {}
+            for d, dimension in enumerate(dims):
+                slots.setdefault(dimension.get("id"), []).append(d)
+                self.repo_target[a, d] = dimension.get("target_artifact") == "github_repo"
+                self.missing_evidence[a, d] = any(
+                    ev.found is False for ev in evidences.get(dimension.get("id"), []) if ev.confidence > 0.8
+                )
+            by_slot: List[List[JudicialOpinion]] = [[] for _ in dims]
+            firsts: Dict[Tuple[int, int], JudicialOpinion] = {}
+            for op in opinions:
+                j = judge_index[op.judge]
+                for d in slots.get(op.criterion_id, ()):
+                    by_slot[d].append(op)
+                    if op.placeholder:
+                        self.placeholders[a, d] += 1
+                        continue
+                    rows_a.append(a)
+                    rows_d.append(d)
+                    rows_score.append(op.score)
+                    firsts.setdefault((d, j), op)
+            for (d, j), op in firsts.items():
+                self.first[a, d, j] = op.score
+                if j == PROSECUTOR and op.score <= 2:
+                    self.security_flaw[a, d] = any(word in op.argument.lower() for word in SECURITY_WORDS)
+            self.opinions.append(by_slot)
+            self.first_opinions.append(firsts)
+
+        index = (np.array(rows_a, dtype=np.int64), np.array(rows_d, dtype=np.int64))
+        scores = np.array(rows_score, dtype=np.int64)
+        np.add.at(self.total, index, scores)
+        np.add.at(self.count, index, 1)
+        np.maximum.at(self.high, index, scores)
+        np.minimum.at(self.low, index, scores)
+
+
+class Verdicts:
+    """Rule outcomes for every (audit, dimension) slot of a ScoreMatrix."""
+
+    def __init__(self, final: np.ndarray, evidence_rule: np.ndarray, functionality_rule: np.ndarray,
+                 security_rule: np.ndarray, variance: np.ndarray, present: np.ndarray):
+        self.final = final
+        self.evidence_rule = evidence_rule
+        self.functionality_rule = functionality_rule
+        self.security_rule = security_rule
+        self.variance = variance
+        self.present = present
+        # Rounded half to even, like round(); meaningful where `present`
+        self.final_scores = np.round(final).astype(np.int64)
+
+    def overall_scores(self) -> np.ndarray:
+        """Mean rounded score per audit over its judged dimensions (0.0 if none)."""
+        judged = self.present.sum(axis=1)
+        totals = np.where(self.present, self.final_scores, 0).sum(axis=1)
+        return np.divide(totals, judged, out=np.zeros(len(judged)), where=judged > 0)
+
+
+def apply_rules(matrix: ScoreMatrix) -> Verdicts:
+    """
+    The Chief Justice's deterministic rules, as array operations over every slot:
+    mean of all opinions, then Rule of Evidence, Rule of Functionality, and
+    Rule of Security last so nothing can lift a capped score.
+    A dimension only placeholder opinions were given for stays at a neutral 3.
+    """
+    judged = matrix.count > 0
+    present = judged | (matrix.placeholders > 0)
+    final = np.divide(matrix.total, matrix.count, out=np.full_like(matrix.total, 3.0), where=judged)
+    defense, techlead = matrix.first[..., DEFENSE], matrix.first[..., TECHLEAD]
+
+    with np.errstate(invalid="ignore"):  # NaN comparisons are False: judge absent
+        evidence_rule = present & (defense >= 4) & matrix.missing_evidence
+        final = np.where(evidence_rule, np.maximum(1.0, final - 1.5), final)
+
+        functionality_rule = present & matrix.repo_target & (techlead >= 4)
+        final = np.where(functionality_rule, (final + techlead) / 2, final)
+
+    security_rule = present & matrix.security_flaw
+    final = np.where(security_rule, np.minimum(final, 3.0), final)
+
+    variance = np.where(judged, matrix.high - matrix.low, 0)
+    return Verdicts(final, evidence_rule, functionality_rule, security_rule, variance, present)
+
+
+def criterion_results(matrix: ScoreMatrix, verdicts: Verdicts, audit: int) -> List[CriterionResult]:
+    """Materializes one audit's CriterionResult list from the rule outcomes."""
+    results = []
+    final_scores = verdicts.final_scores
+    firsts = matrix.first_opinions[audit]
+    for d, dimension in enumerate(matrix.dimensions[audit]):
+        if not verdicts.present[audit, d]:
+            continue
+        dim_id = dimension.get("id")
+        prosecutor_op, defense_op = firsts.get((d, PROSECUTOR)), firsts.get((d, DEFENSE))
+
+        applied_rules = [rule for rule, fired in (
+            (RULE_OF_EVIDENCE, verdicts.evidence_rule[audit, d]),
+            (RULE_OF_FUNCTIONALITY, verdicts.functionality_rule[audit, d]),
+            (RULE_OF_SECURITY, verdicts.security_rule[audit, d]),
+        ) if fired]
+
+        dissent_summary = None
+        variance = int(verdicts.variance[audit, d])
+        if variance >= 2:
+            dissent_summary = (f"DISSENT DETECTED: Variance of {variance} between "
+                               f"{prosecutor_op.judge if prosecutor_op else 'Judges'} and "
+                               f"{defense_op.judge if defense_op else 'Judges'}.")
+            if applied_rules:
+                dissent_summary += " Resolved by: " + "; ".join(applied_rules)
+
+        remediation = f"Fix findings in {dim_id}."
+        if prosecutor_op and prosecutor_op.score < 3:
+            remediation = f"Address Critical Lens findings: {prosecutor_op.argument[:200]}..."
+
+        results.append(CriterionResult(
+            dimension_id=dim_id,
+            dimension_name=dimension.get("name", dim_id),
+            final_score=int(final_scores[audit, d]),
+            judge_opinions=matrix.opinions[audit][d],
+            dissent_summary=dissent_summary,
+            remediation=remediation
+        ))
+    return results
+
+
+def synthesize_many(audits: Sequence[AuditInputs]) -> List[List[CriterionResult]]:
+    """Applies the synthesis rules to many audits at once."""
+    matrix = ScoreMatrix(audits)
+    verdicts = apply_rules(matrix)
+    return [criterion_results(matrix, verdicts, a) for a in range(len(audits))]
+
+
+def synthesize(dimensions: List[Dict], opinions: List[JudicialOpinion],
+               evidences: Dict[str, List[Evidence]]) -> List[CriterionResult]:
+    """CriterionResults for one audit."""
+    return synthesize_many([(dimensions, opinions, evidences)])[0]
@@ -0,0 +1,111 @@
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+from pydantic import BaseModel
+
+# Bump when chunk boundaries change, so persisted embedding indexes are rebuilt
+CHUNKER_VERSION = "structure-v1"
+DEFAULT_MAX_CHARS = 1500
+
+_HEADING_RE = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+
+
+class Chunk(BaseModel):
+    """One retrievable unit of a report: text plus the heading path it sits under."""
+    text: str
+    section: str = ""
+
+    def render(self) -> str:
+        """Text used for embedding, keyword search and the LLM context."""
+        return f"[{self.section}]\n{self.text}" if self.section else self.text
+
+
+def _split_long(text: str, max_chars: int) -> List[str]:
+    """Splits an oversized block (e.g. a long table) on line boundaries, without overlap."""
+    if len(text) <= max_chars:
+        return [text]
+    pieces, current = [], ""
+    for line in text.splitlines(keepends=True):
+        if current and len(current) + len(line) > max_chars:
+            pieces.append(current)
+            current = ""
+        while len(line) > max_chars:
+            pieces.append(line[:max_chars])
+            line = line[max_chars:]
+        current += line
+    if current.strip():
+        pieces.append(current)
+    return [p.strip() for p in pieces if p.strip()]
+
+
+def _pack(blocks: Iterable[Tuple[str, str]], max_chars: int) -> List[Chunk]:
+    """
+    Merges consecutive blocks of the same section until max_chars, so a small
+    section becomes exactly one chunk and chunks never straddle two sections.
+    """
+    chunks: List[Chunk] = []
+    section, parts, size = None, [], 0
+
+    def _flush():
+        if parts:
+            chunks.append(Chunk(text="\n\n".join(parts), section=section or ""))
+
+    for block_section, text in blocks:
+        for piece in _split_long(text.strip(), max_chars):
+            if block_section != section or size + len(piece) > max_chars:
+                _flush()
+                section, parts, size = block_section, [], 0
+            parts.append(piece)
+            size += len(piece) + 2
+    _flush()
+    return chunks
+
+
+def chunk_docling(document: Dict, max_chars: int = DEFAULT_MAX_CHARS) -> List[Chunk]:
+    """Chunks a docling document (as exported to dict) along its headings, paragraphs, tables and captions."""
+    from docling_core.transforms.chunker.hierarchical_chunker import HierarchicalChunker
+    from docling_core.types.doc import DoclingDocument
+
+    doc = DoclingDocument.model_validate(document)
+    blocks = (
+        (" > ".join(item.meta.headings or []), item.text)
+        for item in HierarchicalChunker().chunk(doc)
+        if item.text.strip()
+    )
+    return _pack(blocks, max_chars)
+
+
+def chunk_markdown(markdown: str, max_chars: int = DEFAULT_MAX_CHARS) -> List[Chunk]:
+    """Fallback when no docling structure is available: splits on Markdown headings and blank lines."""
+    headings: List[str] = []
+    blocks: List[Tuple[str, str]] = []
+    paragraph: List[str] = []
+
+    def _end_paragraph():
+        if paragraph:
+            blocks.append((" > ".join(headings), "\n".join(paragraph)))
+            paragraph.clear()
+
+    for line in markdown.splitlines():
+        match = _HEADING_RE.match(line)
+        if match:
+            _end_paragraph()
+            level = len(match.group(1))
+            headings[:] = headings[:level - 1] + [match.group(2)]
+        elif not line.strip():
+            _end_paragraph()
+        else:
+            paragraph.append(line)
+    _end_paragraph()
+    return _pack(blocks, max_chars)
+
+
+def chunk_document(markdown: str, document: Optional[Dict] = None, max_chars: int = DEFAULT_MAX_CHARS) -> List[Chunk]:
+    """Structure-aware chunks from the docling document when available, else from the Markdown."""
+    if document:
+        try:
+            chunks = chunk_docling(document, max_chars)
+            if chunks:
+                return chunks
+        except Exception as e:
+            print(f"Warning: docling chunking failed, falling back to Markdown: {e}")
+    return chunk_markdown(markdown, max_chars)
@@ -0,0 +1,271 @@
+import json
+import threading
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import numpy as np
+from src.tools.chunking import Chunk
+from src.tools.file_lock import file_lock
+from src.tools.retrieval import top_k
+
+# Below this many vectors, exact search is as fast as probing an IVF
+EXACT_SEARCH_ROWS = 4096
+
+
+def _normalize(x: np.ndarray) -> np.ndarray:
+    x = np.asarray(x, dtype=np.float32)
+    norms = np.linalg.norm(x, axis=-1, keepdims=True)
+    return x / np.where(norms == 0, 1.0, norms)
+
+
+def train_ivf(vectors: np.ndarray, n_lists: int, iterations: int = 8, seed: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Spherical k-means over L2-normalized rows.
+    Returns (centroids, list assignment of every row).
+    """
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), size=n_lists, replace=False)].copy()
+    for _ in range(iterations):
+        assign = np.argmax(vectors @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, vectors)
+        filled = np.bincount(assign, minlength=n_lists) > 0
+        centroids[filled] = _normalize(sums[filled])
+    return centroids, np.argmax(vectors @ centroids.T, axis=1)
+
+
+class CorpusIndex:
+    """
+    On-disk index over every report ingested on this machine (or shared cache),
+    for cross-submission retrieval and near-duplicate detection.
+
+    Layout under `root`:
+    - vectors.f16: L2-normalized float16 rows, appended per document, memory-mapped for reads
+    - chunks.jsonl: one {"doc", "section", "text"} line per row
+    - docs.json: {"dim", "docs": {digest: {"name", "start", "end"}}} row ranges per document
+    - ivf.npz: IVF centroids and inverted lists, rebuilt when the corpus has grown
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._vectors_path = self.root / "vectors.f16"
+        self._chunks_path = self.root / "chunks.jsonl"
+        self._docs_path = self.root / "docs.json"
+        self._ivf_path = self.root / "ivf.npz"
+        self._lock_path = self.root / ".lock"
+        self._chunks: Optional[List[Dict]] = None
+        self._ivf_cache: Optional[Tuple[int, Dict[str, np.ndarray]]] = None
+        self._mutex = threading.Lock()
+
+    # --- Ingest ---
+    def _read_docs(self) -> Dict:
+        if not self._docs_path.exists():
+            return {"dim": None, "docs": {}}
+        return json.loads(self._docs_path.read_text(encoding="utf-8"))
+
+    def add_document(self, doc_id: str, chunks: List[Chunk], vectors: np.ndarray, name: str = "") -> bool:
+        """Appends a document's chunks and vectors. Returns False if it was already indexed."""
+        vectors = _normalize(vectors).astype(np.float16)
+        with file_lock(self._lock_path):
+            meta = self._read_docs()
+            if doc_id in meta["docs"]:
+                return False
+            if meta["dim"] is not None and vectors.shape[1] != meta["dim"]:
+                raise ValueError(f"Vector dimension {vectors.shape[1]} does not match corpus dimension {meta['dim']}")
+            start = self._row_count(meta)
+            self._truncate_to(start, meta["dim"])
+            with open(self._vectors_path, "ab") as f:
+                f.write(vectors.tobytes())
+            with open(self._chunks_path, "a", encoding="utf-8") as f:
+                for chunk in chunks:
+                    f.write(json.dumps({"doc": doc_id, "section": chunk.section, "text": chunk.text}) + "\n")
+            meta["dim"] = int(vectors.shape[1])
+            meta["docs"][doc_id] = {"name": name, "start": start, "end": start + len(vectors)}
+            tmp = self._docs_path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(meta), encoding="utf-8")
+            tmp.replace(self._docs_path)
+        with self._mutex:
+            self._chunks = None
+        return True
+
+    def _truncate_to(self, rows: int, dim: Optional[int]) -> None:
+        """
+        Drops rows appended by a writer that died before committing docs.json,
+        so new documents start right after the last committed one. Vectors are
+        written first, so a clean vectors file means chunks.jsonl is clean too.
+        """
+        expected = rows * (dim or 0) * np.dtype(np.float16).itemsize
+        if not self._vectors_path.exists() or self._vectors_path.stat().st_size == expected:
+            return
+        print(f"Warning: dropping uncommitted rows from the corpus index at {self.root}")
+        with open(self._vectors_path, "r+b") as f:
+            f.truncate(expected)
+        if self._chunks_path.exists():
+            with open(self._chunks_path, "r+b") as f:
+                for _ in range(rows):
+                    f.readline()
+                f.truncate(f.tell())
+
+    # --- Read side ---
+    def _row_count(self, meta: Dict) -> int:
+        return max((d["end"] for d in meta["docs"].values()), default=0)
+
+    def _vectors(self, meta: Dict) -> np.ndarray:
+        rows = self._row_count(meta)
+        if rows == 0:
+            return np.zeros((0, meta["dim"] or 0), dtype=np.float16)
+        return np.memmap(self._vectors_path, dtype=np.float16, mode="r", shape=(rows, meta["dim"]))
+
+    def documents(self) -> Dict[str, Dict]:
+        return self._read_docs()["docs"]
+
+    def chunk(self, row: int) -> Dict:
+        with self._mutex:
+            if self._chunks is None:
+                with open(self._chunks_path, encoding="utf-8") as f:
+                    self._chunks = [json.loads(line) for line in f]
+            return self._chunks[row]
+
+    def _ivf(self, meta: Dict, vectors: np.ndarray) -> Dict[str, np.ndarray]:
+        """Loads the IVF, retraining it if documents were added since it was built."""
+        rows = len(vectors)
+        with self._mutex:
+            if self._ivf_cache and self._ivf_cache[0] == rows:
+                return self._ivf_cache[1]
+        with file_lock(self._lock_path):
+            ivf = None
+            if self._ivf_path.exists():
+                loaded = dict(np.load(self._ivf_path))
+                if int(loaded["rows"]) == rows:
+                    ivf = loaded
+            if ivf is None:
+                n_lists = max(1, int(np.sqrt(rows)))
+                centroids, assign = train_ivf(np.asarray(vectors, dtype=np.float32), n_lists)
+                order = np.argsort(assign, kind="stable")
+                offsets = np.concatenate([[0], np.cumsum(np.bincount(assign, minlength=n_lists))])
+                ivf = {"rows": np.array(rows), "centroids": centroids, "order": order, "offsets": offsets}
+                with open(self._ivf_path.with_suffix(".tmp"), "wb") as f:
+                    np.savez(f, **ivf)
+                self._ivf_path.with_suffix(".tmp").replace(self._ivf_path)
+        with self._mutex:
+            self._ivf_cache = (rows, ivf)
+        return ivf
+
+    def _list_rows(self, ivf: Dict[str, np.ndarray], lists: Iterable[int]) -> np.ndarray:
+        order, offsets = ivf["order"], ivf["offsets"]
+        parts = [order[offsets[c]:offsets[c + 1]] for c in lists]
+        return np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+
+    def search(self, query_vector: np.ndarray, k: int = 5, doc_ids: Optional[Set[str]] = None,
+               nprobe: int = 8) -> List[Tuple[str, int, float]]:
+        """
+        Nearest chunks to the query as (doc_id, row, cosine score), best first.
+        With doc_ids, only those documents are searched (exactly, via their row ranges);
+        otherwise large corpora are searched approximately by probing `nprobe` IVF lists.
+        """
+        meta = self._read_docs()
+        vectors = self._vectors(meta)
+        if len(vectors) == 0:
+            return []
+        query = _normalize(query_vector)
+
+        if doc_ids is not None:
+            ranges = [meta["docs"][d] for d in doc_ids if d in meta["docs"]]
+            rows = np.concatenate([np.arange(r["start"], r["end"]) for r in ranges]) if ranges else np.empty(0, dtype=np.int64)
+        elif len(vectors) <= EXACT_SEARCH_ROWS:
+            rows = np.arange(len(vectors))
+        else:
+            ivf = self._ivf(meta, vectors)
+            probe = top_k(ivf["centroids"] @ query, nprobe)
+            rows = self._list_rows(ivf, probe)
+        if len(rows) == 0:
+            return []
+
+        scores = np.asarray(vectors[rows], dtype=np.float32) @ query
+        doc_of_row = self._doc_lookup(meta)
+        return [(doc_of_row(int(rows[i])), int(rows[i]), float(scores[i])) for i in top_k(scores, k)]
+
+    def _doc_lookup(self, meta: Dict):
+        starts = sorted((d["start"], doc_id) for doc_id, d in meta["docs"].items())
+        bounds = np.array([s for s, _ in starts])
+        ids = [doc_id for _, doc_id in starts]
+        return lambda row: ids[int(np.searchsorted(bounds, row, side="right")) - 1]
+
+    def similar_documents(self, threshold: float = 0.9, min_similarity: float = 0.2,
+                          doc_ids: Optional[Set[str]] = None, nprobe: int = 2) -> List[Dict]:
+        """
+        Near-duplicate report pairs across the corpus.
+
+        Each chunk is compared only with chunks in its own and neighbouring IVF
+        lists (instead of every other report), and two chunks count as shared
+        when their cosine similarity is at least `threshold`. Pair similarity is
+        the share of both reports' chunks that have a near-duplicate in the other.
+        With doc_ids, only pairs within that set (e.g. one cohort) are compared.
+        """
+        meta = self._read_docs()
+        vectors = self._vectors(meta)
+        all_ids = list(meta["docs"])
+        if sum(1 for d in all_ids if doc_ids is None or d in doc_ids) < 2:
+            return []
+        doc_index = np.empty(len(vectors), dtype=np.int64)
+        sizes = np.zeros(len(all_ids), dtype=np.int64)
+        for i, doc_id in enumerate(all_ids):
+            r = meta["docs"][doc_id]
+            doc_index[r["start"]:r["end"]] = i
+            sizes[i] = r["end"] - r["start"]
+        in_scope = np.array([doc_ids is None or d in doc_ids for d in all_ids])
+
+        ivf = self._ivf(meta, vectors)
+        centroids = ivf["centroids"]
+        neighbours = np.argsort(-(centroids @ centroids.T), axis=1)[:, :max(1, nprobe)]
+        shared: Dict[Tuple[int, int], int] = defaultdict(int)
+        for c in range(len(centroids)):
+            a_rows = self._list_rows(ivf, [c])
+            a_rows = a_rows[in_scope[doc_index[a_rows]]]
+            if len(a_rows) == 0:
+                continue
+            b_rows = self._list_rows(ivf, neighbours[c])
+            b_rows = b_rows[in_scope[doc_index[b_rows]]]
+            hits = (np.asarray(vectors[a_rows], dtype=np.float32) @ np.asarray(vectors[b_rows], dtype=np.float32).T) >= threshold
+            hits &= doc_index[a_rows][:, None] != doc_index[b_rows][None, :]
+            a_idx, b_idx = np.nonzero(hits)
+            if len(a_idx) == 0:
+                continue
+            # One vote per (chunk of A, other document B), however many B chunks match
+            votes = np.unique(np.stack([a_rows[a_idx], doc_index[b_rows[b_idx]]], axis=1), axis=0)
+            doc_pairs, counts = np.unique(np.stack([doc_index[votes[:, 0]], votes[:, 1]], axis=1), axis=0, return_counts=True)
+            for (doc_a, doc_b), count in zip(doc_pairs, counts):
+                shared[(int(doc_a), int(doc_b))] += int(count)
+
+        pairs = {}
+        for (a, b), count in shared.items():
+            key = (min(a, b), max(a, b))
+            pairs[key] = pairs.get(key, 0) + count
+        results = []
+        for (a, b), count in pairs.items():
+            similarity = count / (sizes[a] + sizes[b])
+            if similarity >= min_similarity:
+                results.append({
+                    "doc_a": all_ids[a], "name_a": meta["docs"][all_ids[a]]["name"],
+                    "doc_b": all_ids[b], "name_b": meta["docs"][all_ids[b]]["name"],
+                    "shared_chunks": count, "similarity": round(float(similarity), 3),
+                })
+        return sorted(results, key=lambda r: -r["similarity"])
+
+
+_corpus_indexes: Dict[Path, CorpusIndex] = {}
+_corpus_lock = threading.Lock()
+
+
+def get_corpus_index(root: Optional[Path] = None) -> CorpusIndex:
+    """Process-wide CorpusIndex for the configured cache and embedding model."""
+    if root is None:
+        from src.config import get_cache_dir
+        from src.tools.docs_tools import embedding_index_key
+        root = get_cache_dir() / "corpus" / embedding_index_key()
+    root = Path(root)
+    with _corpus_lock:
+        if root not in _corpus_indexes:
+            _corpus_indexes[root] = CorpusIndex(root)
+        return _corpus_indexes[root]
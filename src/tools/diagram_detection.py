@@ -0,0 +1,172 @@
+import re
+from typing import Dict, List, Optional, Tuple
+from pydantic import BaseModel, Field
+
+Box = Tuple[float, float, float, float]
+
+CAPTION_RE = re.compile(r"^\s*(fig(ure)?\.?|diagram|chart)\s*\d*", re.IGNORECASE)
+DIAGRAM_WORDS = re.compile(r"\b(architecture|graph|flow|pipeline|diagram|workflow|topology|nodes?|edges?|"
+                           r"fan[- ]?(in|out)|state ?graph|sequence|components?)\b", re.IGNORECASE)
+NON_DIAGRAM_WORDS = re.compile(r"\b(screenshot|photo|logo|terminal|output|console|table)\b", re.IGNORECASE)
+
+
+class DiagramCandidate(BaseModel):
+    page: int = Field(description="1-based page number")
+    bbox: Box = Field(description="Region on the page in PDF points (x0, y0, x1, y1)")
+    kind: str = Field(description="'vector' (drawn paths) or 'raster' (embedded image)")
+    score: float
+    drawings: int = 0
+    caption: str = ""
+
+
+def _union(a: Box, b: Box) -> Box:
+    return (min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3]))
+
+
+def _near(a: Box, b: Box, gap: float) -> bool:
+    return a[0] - gap <= b[2] and b[0] - gap <= a[2] and a[1] - gap <= b[3] and b[1] - gap <= a[3]
+
+
+def _inside(inner: Box, outer: Box) -> bool:
+    cx, cy = (inner[0] + inner[2]) / 2, (inner[1] + inner[3]) / 2
+    return outer[0] <= cx <= outer[2] and outer[1] <= cy <= outer[3]
+
+
+def cluster_boxes(boxes: List[Box], gap: float) -> List[Tuple[Box, List[int]]]:
+    """Groups boxes that touch or lie within `gap` points of each other. Returns (bounds, member indexes)."""
+    clusters: List[Tuple[Box, List[int]]] = []
+    for i, box in enumerate(boxes):
+        bounds, members = box, [i]
+        # Absorb every existing cluster this box (or the growing union) reaches
+        merged = True
+        while merged:
+            merged = False
+            for j, (other, other_members) in enumerate(clusters):
+                if _near(bounds, other, gap):
+                    bounds, members = _union(bounds, other), members + other_members
+                    clusters.pop(j)
+                    merged = True
+                    break
+        clusters.append((bounds, members))
+    return clusters
+
+
+def _is_shape(item: tuple) -> bool:
+    """Curves, diagonal lines and boxes are diagram strokes; axis-aligned rules mostly belong to tables."""
+    kind = item[0]
+    if kind == "c":
+        return True
+    if kind == "l":
+        p1, p2 = item[1], item[2]
+        return abs(p1.x - p2.x) > 1 and abs(p1.y - p2.y) > 1
+    if kind in ("re", "qu"):
+        rect = item[1].rect if kind == "qu" else item[1]
+        return rect.width > 8 and rect.height > 8
+    return False
+
+
+def _caption_for(region: Box, blocks: List[Tuple[Box, str]], max_distance: float = 60) -> str:
+    for box, text in blocks:
+        overlaps = box[0] < region[2] and region[0] < box[2]
+        below = 0 <= box[1] - region[3] <= max_distance
+        above = 0 <= region[1] - box[3] <= max_distance
+        if overlaps and (below or above) and CAPTION_RE.match(text):
+            return " ".join(text.split())
+    return ""
+
+
+def _caption_score(caption: str) -> float:
+    """1 for an architecture/flow caption, 0.5 for any other figure caption, negative for screenshots and photos."""
+    if not caption:
+        return 0.0
+    if NON_DIAGRAM_WORDS.search(caption):
+        return -0.5
+    return 1.0 if DIAGRAM_WORDS.search(caption) else 0.5
+
+
+def score_vector_region(n_drawings: int, shape_ratio: float, label_blocks: int, paragraph_blocks: int,
+                        caption: str, min_drawings: int) -> float:
+    """
+    0..1 diagram likelihood of a cluster of vector drawings: dense strokes
+    that are shapes rather than table rules, short text labels rather than
+    paragraphs, and a figure caption about architecture or flow.
+    """
+    density = min(1.0, n_drawings / (3 * min_drawings))
+    labels = min(1.0, label_blocks / 4) * (1.0 if label_blocks >= paragraph_blocks else 0.3)
+    return round(0.35 * density + 0.25 * shape_ratio + 0.15 * labels + 0.25 * _caption_score(caption), 3)
+
+
+def score_raster_region(caption: str, has_overlay: bool, width_fraction: float) -> float:
+    """0..1 diagram likelihood of an embedded image, from its caption, vector annotations and size."""
+    return round(max(0.0, 0.15 + 0.45 * _caption_score(caption) + (0.2 if has_overlay else 0.0)
+                     + 0.2 * min(1.0, width_fraction / 0.6)), 3)
+
+
+def page_candidates(page, settings: Dict, seen_xrefs: Optional[set] = None) -> List[DiagramCandidate]:
+    """
+    Diagram-like regions on one PyMuPDF page, from vector drawings and placed
+    images. Images already in `seen_xrefs` (placed on an earlier page) are
+    skipped; inline images have no xref (0), so they are keyed by content digest.
+    """
+    page_box = tuple(page.rect)
+    blocks = [(tuple(b[:4]), b[4]) for b in page.get_text("blocks") if b[6] == 0 and b[4].strip()]
+    drawings = [d for d in page.get_drawings() if d["rect"].width < page.rect.width * 0.98
+                or d["rect"].height < page.rect.height * 0.98]  # skip page frames/backgrounds
+    candidates: List[DiagramCandidate] = []
+
+    for bounds, members in cluster_boxes([tuple(d["rect"]) for d in drawings], settings["gap"]):
+        if len(members) < settings["min_drawings"]:
+            continue
+        items = [item for i in members for item in drawings[i]["items"]]
+        shape_ratio = sum(1 for item in items if _is_shape(item)) / max(1, len(items))
+        inside = [text for box, text in blocks if _inside(box, bounds)]
+        labels = sum(1 for text in inside if len(text.strip()) <= 40)
+        caption = _caption_for(bounds, blocks)
+        score = score_vector_region(len(members), shape_ratio, labels, len(inside) - labels,
+                                    caption, settings["min_drawings"])
+        candidates.append(DiagramCandidate(page=page.number + 1, bbox=bounds, kind="vector", score=score,
+                                           drawings=len(members), caption=caption))
+
+    seen_xrefs = set() if seen_xrefs is None else seen_xrefs
+    for info in page.get_image_info(hashes=True, xrefs=True):
+        bbox = tuple(info["bbox"])
+        key = info["xref"] if info.get("xref", 0) > 0 else info["digest"]
+        if key in seen_xrefs or min(info["width"], info["height"]) < settings["min_side"]:
+            continue
+        seen_xrefs.add(key)
+        if any(c.kind == "vector" and _inside(bbox, c.bbox) for c in candidates):
+            continue  # already part of a drawn diagram
+        overlay = any(_near(tuple(d["rect"]), bbox, 0) for d in drawings)
+        caption = _caption_for(bbox, blocks)
+        score = score_raster_region(caption, overlay, (bbox[2] - bbox[0]) / (page_box[2] - page_box[0]))
+        candidates.append(DiagramCandidate(page=page.number + 1, bbox=bbox, kind="raster", score=score,
+                                           caption=caption))
+    return candidates
+
+
+def find_diagram_candidates(pdf_path: str, settings: Optional[Dict] = None) -> List[DiagramCandidate]:
+    """
+    Ranks likely architecture diagrams across a PDF, best first, on the CPU
+    only. Images reused on several pages (logos) count once.
+    """
+    import fitz  # PyMuPDF, imported on first use to keep startup fast
+    from src.config import diagram_settings
+
+    settings = settings or diagram_settings()
+    candidates: List[DiagramCandidate] = []
+    seen_xrefs: set = set()
+    with fitz.open(pdf_path) as doc:
+        for page in doc:
+            candidates.extend(page_candidates(page, settings, seen_xrefs))
+    return sorted(candidates, key=lambda c: -c.score)
+
+
+def render_region(pdf_path: str, candidate: DiagramCandidate, dpi: int, margin: float = 8) -> bytes:
+    """PNG of a candidate's region (plus a small margin) rendered at `dpi`."""
+    import fitz
+
+    with fitz.open(pdf_path) as doc:
+        page = doc[candidate.page - 1]
+        x0, y0, x1, y1 = candidate.bbox
+        clip = fitz.Rect(x0 - margin, y0 - margin, x1 + margin, y1 + margin) & page.rect
+        return page.get_pixmap(clip=clip, dpi=dpi).tobytes("png")
@@ -1,38 +1,272 @@
 import os
-import re
-import ast
+import json
+import hashlib
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from importlib.metadata import PackageNotFoundError, version
 from pathlib import Path
-from typing import List, Dict, Optional
-from docling.document_converter import DocumentConverter
-from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_core.vectorstores import InMemoryVectorStore
+from collections import OrderedDict
+from typing import Callable, List, Dict, Optional, Tuple
+import numpy as np
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.messages import HumanMessage
 from langchain_core.tools import tool
+from pydantic import BaseModel, Field
 from src.llm_factory import get_llm
+from src.config import (
+    corpus_index_settings, embedding_model_name, embedding_settings, get_cache_dir, pdf_conversion_settings,
+    rag_cache_max_bytes,
+)
+from src.tools.file_lock import file_lock
+from src.tools.chunking import CHUNKER_VERSION, Chunk, chunk_document
+from src.tools.corpus_index import get_corpus_index
+from src.tools.path_extraction import cross_check, extract_path_mentions
+from src.tools.repo_tools import repo_manifest
+from src.tools.pdf_conversion import RangeCallback, convert_pages_parallel, fast_text
+from src.tools.retrieval import HybridIndex
 
-# Cache for RAG objects to avoid redundant processing
-_rag_cache = {}
+class RAGCache:
+    """
+    Thread-safe LRU of DocumentRAG objects, bounded by approximate bytes.
+    Loads are single-flight: concurrent callers for the same PDF hash wait on
+    a per-key lock while one of them converts and embeds it.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[DocumentRAG, int]]" = OrderedDict()
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self._counts = {"hits": 0, "loads": 0, "evictions": 0}
+
+    def _lookup(self, key: str) -> Optional['DocumentRAG']:
+        # Caller holds self._lock
+        if key not in self._entries:
+            return None
+        self._entries.move_to_end(key)
+        self._counts["hits"] += 1
+        return self._entries[key][0]
+
+    def get_or_load(self, key: str, loader: Callable[[], Optional['DocumentRAG']]) -> Optional['DocumentRAG']:
+        with self._lock:
+            rag = self._lookup(key)
+            if rag is not None:
+                return rag
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            with self._lock:
+                rag = self._lookup(key)
+            if rag is not None:
+                return rag
+            try:
+                rag = loader()
+                if rag is not None:
+                    self._insert(key, rag)
+            finally:
+                with self._lock:
+                    self._key_locks.pop(key, None)
+        return rag
+
+    def put(self, key: str, rag: 'DocumentRAG') -> None:
+        """Inserts or replaces an entry (e.g. upgrading a text-only RAG)."""
+        self._insert(key, rag)
+
+    def _insert(self, key: str, rag: 'DocumentRAG') -> None:
+        size = rag.approx_bytes()
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (rag, size)
+            self._bytes += size
+            self._counts["loads"] += 1
+            # Always keep the newest entry, even if it alone exceeds the bound
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+                self._counts["evictions"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return dict(self._counts, entries=len(self._entries), bytes=self._bytes, max_bytes=self.max_bytes)
+
+
+# RAG objects keyed by PDF content hash, shared by every thread in the process
+_rag_cache = RAGCache(rag_cache_max_bytes())
+# PDFs actually run through docling (cache misses on disk) in this process
+_conversions = 0
+_conversions_lock = threading.Lock()
+
+def _count_conversion() -> None:
+    global _conversions
+    with _conversions_lock:
+        _conversions += 1
+
+def get_rag_cache_stats() -> Dict:
+    """Hits, loads, evictions, entries and bytes in use of the RAG cache, plus docling conversions."""
+    return dict(_rag_cache.stats(), conversions=_conversions)
 
 def get_rag(pdf_path: str) -> Optional['DocumentRAG']:
-    """Helper to get or create a RAG object for a PDF. Synchronous."""
-    if pdf_path in _rag_cache:
-        return _rag_cache[pdf_path]
-        
+    """Helper to get or create a RAG object for a PDF. Synchronous and thread-safe."""
     if not Path(pdf_path).exists():
         return None
-        
+    digest = pdf_digest(pdf_path)
+    return _rag_cache.get_or_load(digest, lambda: _load_rag(pdf_path, digest))
+
+def _load_rag(pdf_path: str, digest: str) -> Optional['DocumentRAG']:
     print(f"Initializing RAG for {pdf_path}...")
-    converter = DocumentConverter()
+    md_path, _ = conversion_cache_paths(digest)
+    if pdf_conversion_settings()["fast_text"] and not md_path.exists():
+        try:
+            # Serve early questions from PyMuPDF text; swap in the layout-aware
+            # RAG once docling finishes in the background
+            rag = DocumentRAG(fast_text(pdf_path), f"{digest}-text")
+        except Exception as e:
+            print(f"Fast text extraction failed, converting in the foreground: {e}")
+        else:
+            with _upgrades_lock:
+                _upgrades.append(_upgrade_executor.submit(_upgrade_rag, pdf_path, digest))
+            print(f"Layout conversion of {pdf_path} continues in the background")
+            return rag
+    return _build_full_rag(pdf_path, digest)
+
+# Background docling upgrades of fast-text RAGs. The executor's threads are not
+# daemons: interpreter shutdown waits for them, so the conversion (and its cache
+# and corpus entries) is written even when the CLI or batch worker is exiting.
+_upgrade_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="rag-upgrade")
+_upgrades: List[Future] = []
+_upgrades_lock = threading.Lock()
+
+def wait_for_rag_upgrades(timeout: Optional[float] = None) -> bool:
+    """Blocks until background layout conversions finish. Returns False if some are still running after `timeout`."""
+    with _upgrades_lock:
+        pending = [f for f in _upgrades if not f.done()]
+        _upgrades[:] = pending
+    if pending:
+        print(f"Waiting for {len(pending)} background layout conversion(s)...")
+    _, not_done = wait(pending, timeout=timeout)
+    if not_done:
+        print(f"Warning: {len(not_done)} background layout conversion(s) still running after {timeout}s")
+    return not not_done
+
+def _upgrade_rag(pdf_path: str, digest: str) -> None:
+    rag = _build_full_rag(pdf_path, digest)
+    if rag is not None:
+        _rag_cache.put(digest, rag)
+        print(f"Layout conversion of {pdf_path} finished; RAG upgraded")
+
+def _build_full_rag(pdf_path: str, digest: str) -> Optional['DocumentRAG']:
+    streaming = _StreamingIndexer() if pdf_conversion_settings()["workers"] > 1 else None
     try:
-        result = converter.convert(pdf_path)
-        markdown = result.document.export_to_markdown()
-        _rag_cache[pdf_path] = DocumentRAG(markdown)
+        markdown = _convert_to_markdown(pdf_path, digest, on_range=streaming.add if streaming else None)
+        prebuilt = streaming.result() if streaming else None
+        rag = DocumentRAG(markdown, digest, load_docling_json(digest), prebuilt=prebuilt)
     except Exception as e:
         print(f"Error converting PDF: {e}")
         return None
-    return _rag_cache[pdf_path]
+    if corpus_index_settings()["enabled"]:
+        _add_to_corpus(pdf_path, digest, rag)
+    stats = get_rag_cache_stats()
+    print(f"RAG cache: {stats['entries'] + 1} documents, ~{(stats['bytes'] + rag.approx_bytes()) / 2**20:.1f} MB, "
+          f"{stats['conversions']} conversions")
+    return rag
+
+def _add_to_corpus(pdf_path: str, digest: str, rag: 'DocumentRAG') -> None:
+    """Registers a converted report in the shared cross-report index (no-op if already there)."""
+    try:
+        if get_corpus_index().add_document(digest, rag.chunks, rag.vectors, name=Path(pdf_path).name):
+            print(f"Added {Path(pdf_path).name} to the corpus index")
+    except Exception as e:
+        print(f"Warning: could not add {pdf_path} to the corpus index: {e}")
+
+def pdf_digest(pdf_path: str) -> str:
+    """SHA-256 of the PDF bytes, so the same report under any path shares cache entries."""
+    sha = hashlib.sha256()
+    with open(pdf_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            sha.update(block)
+    return sha.hexdigest()
+
+def converter_version() -> str:
+    """Installed docling version; part of the cache key so upgrades reconvert."""
+    try:
+        return version("docling")
+    except PackageNotFoundError:
+        return "unknown"
+
+def conversion_cache_paths(digest: str) -> Tuple[Path, Path]:
+    """(markdown, docling JSON) cache files for a PDF hash under the current converter."""
+    base = get_cache_dir() / "docs" / f"docling-{converter_version()}" / digest
+    return base.with_suffix(".md"), base.with_suffix(".json")
+
+def load_docling_json(digest: str) -> Optional[Dict]:
+    """The cached docling document for a PDF hash, if the conversion produced one."""
+    _, json_path = conversion_cache_paths(digest)
+    if not json_path.exists():
+        return None
+    try:
+        return json.loads(json_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as e:
+        print(f"Warning: unreadable docling JSON cache {json_path}: {e}")
+        return None
+
+# docling converter (and its layout models) shared by every conversion in the process
+_converter = None
+_converter_lock = threading.Lock()
+
+def get_document_converter() -> "DocumentConverter":
+    """Builds the docling converter once per process, on first use."""
+    global _converter
+    with _converter_lock:
+        if _converter is None:
+            from docling.document_converter import DocumentConverter
+            _converter = DocumentConverter()
+    return _converter
+
+def _write_atomic(path: Path, text: str) -> None:
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(text, encoding="utf-8")
+    tmp.replace(path)
+
+def _convert_to_markdown(pdf_path: str, digest: Optional[str] = None,
+                         on_range: Optional[RangeCallback] = None) -> str:
+    """
+    Converts a PDF to Markdown with docling, going through the shared on-disk
+    cache so that parallel audits of the same report only convert it once.
+    The docling document JSON is cached alongside for structure-aware consumers.
+    With AUDITOR_PDF_WORKERS > 1, page ranges are converted in parallel and
+    passed to `on_range` as they complete.
+    """
+    digest = digest or pdf_digest(pdf_path)
+    md_path, json_path = conversion_cache_paths(digest)
+    settings = pdf_conversion_settings()
+
+    with file_lock(md_path.with_suffix(".lock")):
+        if md_path.exists():
+            print(f"Using cached conversion for {pdf_path} ({digest[:12]})")
+            return md_path.read_text(encoding="utf-8")
+        _count_conversion()
+        if settings["workers"] > 1:
+            markdown, document = convert_pages_parallel(
+                pdf_path, settings["workers"], settings["pages_per_range"], on_range
+            )
+        else:
+            result = get_document_converter().convert(pdf_path)
+            markdown, document = result.document.export_to_markdown(), result.document.export_to_dict()
+        try:
+            if document is not None:
+                _write_atomic(json_path, json.dumps(document))
+        except Exception as e:
+            print(f"Warning: could not cache docling JSON: {e}")
+        # Markdown is written last: its presence marks a complete entry
+        _write_atomic(md_path, markdown)
+    return markdown
 
 @tool
 def query_pdf_report(pdf_path: str, question: str) -> str:
@@ -46,51 +280,219 @@ def query_pdf_report(pdf_path: str, question: str) -> str:
     return rag.query(question)
 
 @tool
-def extract_paths_from_pdf(pdf_path: str) -> str:
+def query_pdf_report_batch(pdf_path: str, questions: List[str]) -> str:
     """
-    Extracts all mentioned file paths from a PDF report. 
-    Returns them as a comma-separated list.
+    Asks several questions about a PDF report at once (one retrieval pass and
+    one LLM call). Prefer this over repeated query_pdf_report calls when you
+    have more than one question. Answers cite the report chunks they rely on.
     """
+    if not questions:
+        return "Error: No questions given"
     rag = get_rag(pdf_path)
     if not rag:
         return f"Error: Could not process PDF at {pdf_path}"
-    
-    # We'll use the existing extract_file_paths logic but adapted for a tool
-    text = rag.document_text[:8000] # Use a larger chunk for path extraction
-    llm = get_llm()
-    prompt = f"""
-    You are a forensic document analyst. Extract all unique file paths mentioned in the following text.
-    Return ONLY a valid Python list of strings. No explanation.
-    
-    Text: {text}
-    """
     try:
-        response = llm.invoke([HumanMessage(content=prompt)])
-        content = response.content.strip()
-        if "```" in content:
-            content = re.sub(r"```(python)?", "", content).strip("`").strip()
-        paths = ast.literal_eval(content)
-        result = ", ".join(paths) if isinstance(paths, list) else "None found."
-        if len(result) > 4000:
-            return result[:4000] + "\n... [TRUNCATED FOR CONTEXT SAFETY] ..."
-        return result
+        batch = rag.query_many(questions)
     except Exception as e:
-        return f"Error extracting paths: {str(e)}"
+        return f"Error answering questions: {str(e)}"
+
+    by_number = {a.question_number: a for a in batch.answers}
+    lines = []
+    for n, question in enumerate(questions, start=1):
+        answer = by_number.get(n)
+        lines.append(f"Q{n}: {question}")
+        if answer is None:
+            lines.append("A: [No answer returned]")
+            continue
+        lines.append(f"A: {answer.answer}")
+        if answer.source_chunks:
+            lines.append(f"Sources: {', '.join(f'chunk {i}' for i in answer.source_chunks)}")
+    return "\n".join(lines)
+
+@tool
+def extract_paths_from_pdf(pdf_path: str, repo_path: str = "") -> str:
+    """
+    Extracts all file paths mentioned anywhere in a PDF report.
+    Pass the cloned repo_path to cross-check them against the repository:
+    the result then lists verified, missing, ambiguous and unverified paths
+    (bare *.js/*.ts names matching no file, e.g. library names like Node.js).
+    Without repo_path, returns them as a comma-separated list.
+    """
+    rag = get_rag(pdf_path)
+    if not rag:
+        return f"Error: Could not process PDF at {pdf_path}"
+
+    mentions = extract_path_mentions(rag.document_text)
+    if not mentions:
+        return "None found."
+    if not repo_path:
+        result = ", ".join(mentions)
+    elif not Path(repo_path).exists():
+        return f"Error: Repository path {repo_path} does not exist"
+    else:
+        checked = cross_check(mentions, repo_manifest(repo_path))
+        result = "\n".join(
+            f"{label.capitalize()} ({len(paths)}): {', '.join(paths) or '-'}"
+            for label, paths in checked.items()
+        )
+    if len(result) > 4000:
+        return result[:4000] + "\n... [TRUNCATED FOR CONTEXT SAFETY] ..."
+    return result
+
+# Embedding model shared by every DocumentRAG in the process
+_embeddings = None
+_embeddings_lock = threading.Lock()
+
+def embedding_backend_kwargs(backend: str, onnx_file: str) -> Dict:
+    """SentenceTransformer constructor arguments for a backend name."""
+    if backend == "torch":
+        return {}
+    if backend in ("onnx", "openvino"):
+        return {"backend": backend}
+    if backend == "onnx-int8":
+        # Pre-quantized export shipped in the sentence-transformers model repos
+        return {"backend": "onnx", "model_kwargs": {"file_name": onnx_file}}
+    raise ValueError(f"Unsupported embedding backend: {backend}")
+
+def build_embeddings(backend: Optional[str] = None, batch_size: Optional[int] = None) -> "HuggingFaceEmbeddings":
+    """A new embedding model for the configured (or given) backend and batch size."""
+    from langchain_huggingface import HuggingFaceEmbeddings
+
+    settings = embedding_settings()
+    return HuggingFaceEmbeddings(
+        model_name=embedding_model_name(),
+        model_kwargs=embedding_backend_kwargs(backend or settings["backend"], settings["onnx_file"]),
+        encode_kwargs={"batch_size": batch_size or settings["batch_size"]},
+    )
+
+def get_embeddings() -> "HuggingFaceEmbeddings":
+    """Loads the embedding model once per process, on first use."""
+    global _embeddings
+    with _embeddings_lock:
+        if _embeddings is None:
+            _embeddings = build_embeddings()
+    return _embeddings
+
+def embedding_index_key() -> str:
+    """Directory name for persisted vectors: backends (and quantized exports) produce slightly different vectors."""
+    settings = embedding_settings()
+    backend = settings["backend"]
+    key = embedding_model_name().replace("/", "__")
+    if backend == "onnx-int8":
+        return f"{key}@{backend}-{Path(settings['onnx_file']).stem}"
+    return key if backend == "torch" else f"{key}@{backend}"
+
+def _embed_chunks(chunks: List[Chunk]) -> np.ndarray:
+    """L2-normalized float16 embeddings of the rendered chunks."""
+    if not chunks:
+        # e.g. a scanned report without a text layer: no rows, but the model's width
+        return np.empty((0, len(get_embeddings().embed_query(""))), dtype=np.float16)
+    texts = [chunk.render() for chunk in chunks]
+    vectors = np.asarray(get_embeddings().embed_documents(texts), dtype=np.float32).reshape(len(chunks), -1)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return (vectors / np.where(norms == 0, 1.0, norms)).astype(np.float16)
+
+class _StreamingIndexer:
+    """
+    Chunks and embeds each page range as soon as its conversion completes, so
+    embedding overlaps with the conversion of later ranges.
+    """
+
+    def __init__(self):
+        self._ranges: Dict[int, Tuple[List[Chunk], np.ndarray]] = {}
+
+    def add(self, first_page: int, markdown: str, document: Optional[Dict]) -> None:
+        chunks = chunk_document(markdown, document)
+        if chunks:  # image-only ranges have no text to index
+            self._ranges[first_page] = (chunks, _embed_chunks(chunks))
+
+    def result(self) -> Optional[Tuple[List[Chunk], np.ndarray]]:
+        """All ranges in page order, or None if nothing was streamed (cached conversion)."""
+        if not self._ranges:
+            return None
+        ordered = [self._ranges[first] for first in sorted(self._ranges)]
+        return [c for chunks, _ in ordered for c in chunks], np.concatenate([v for _, v in ordered])
+
+def _index_dir(digest: str, streamed: bool = False) -> Path:
+    chunker = CHUNKER_VERSION
+    if streamed:
+        # Chunking page range by range splits differently from chunking the whole document
+        chunker += f"-ranges{pdf_conversion_settings()['pages_per_range']}"
+    return get_cache_dir() / "embeddings" / embedding_index_key() / chunker / digest
+
+def _load_or_build_index(document_text: str, digest: str, structure: Optional[Dict] = None,
+                         prebuilt: Optional[Tuple[List[Chunk], np.ndarray]] = None) -> Tuple[List[Chunk], np.ndarray]:
+    """
+    Returns (chunks, vectors) for a document. Vectors are L2-normalized float16
+    rows persisted as .npy under <cache>/embeddings/<model>/<chunker>/<digest>/
+    and memory-mapped on load, so a known document is never re-embedded.
+    `prebuilt` chunks/vectors (from streamed page ranges) are persisted as-is
+    under their own chunker key, which later loads reuse when the document
+    has no whole-document index.
+    """
+    index_dir = _index_dir(digest, streamed=prebuilt is not None)
+    if prebuilt is None and not (index_dir / "vectors.npy").exists():
+        streamed_dir = _index_dir(digest, streamed=True)
+        if (streamed_dir / "vectors.npy").exists():
+            index_dir = streamed_dir
+    chunks_path, vectors_path = index_dir / "chunks.json", index_dir / "vectors.npy"
+
+    with file_lock(index_dir / ".lock"):
+        if not vectors_path.exists():
+            if prebuilt is not None:
+                chunks, vectors = prebuilt
+            else:
+                start = time.perf_counter()
+                chunks = chunk_document(document_text, structure)
+                vectors = _embed_chunks(chunks)
+                print(f"Embedded {len(chunks)} chunks ({sum(len(c.text) for c in chunks)} chars) "
+                      f"in {time.perf_counter() - start:.1f}s")
+            _write_atomic(chunks_path, json.dumps([chunk.model_dump() for chunk in chunks]))
+            # vectors.npy is written last: its presence marks a complete index
+            tmp = vectors_path.with_suffix(".tmp")
+            with open(tmp, "wb") as f:
+                np.save(f, vectors)
+            tmp.replace(vectors_path)
+
+    chunks = [Chunk(**c) for c in json.loads(chunks_path.read_text(encoding="utf-8"))]
+    return chunks, np.load(vectors_path, mmap_mode="r")
+
+class QuestionAnswer(BaseModel):
+    question_number: int = Field(description="1-based number of the question being answered")
+    answer: str
+    source_chunks: List[int] = Field(default_factory=list, description="Ids of the context chunks used")
+
+class BatchAnswers(BaseModel):
+    answers: List[QuestionAnswer]
 
 class DocumentRAG:
     """RAG system for a single document with flexible LLM and local embeddings."""
-    def __init__(self, document_text: str):
+    def __init__(self, document_text: str, digest: Optional[str] = None, structure: Optional[Dict] = None,
+                 prebuilt: Optional[Tuple[List[Chunk], np.ndarray]] = None):
         self.document_text = document_text
-        text_splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
-        docs = text_splitter.create_documents([document_text])
-        embeddings = HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2")
-        self.vectorstore = InMemoryVectorStore.from_documents(docs, embeddings)
+        digest = digest or hashlib.sha256(document_text.encode("utf-8")).hexdigest()
+        self.chunks, self.vectors = _load_or_build_index(document_text, digest, structure, prebuilt)
+        self.index = HybridIndex([chunk.render() for chunk in self.chunks], self.vectors)
         self.llm = get_llm()
 
+    def approx_bytes(self) -> int:
+        """Rough memory held by this object: texts plus the index arrays."""
+        text_bytes = len(self.document_text) + sum(len(chunk.text) + len(chunk.section) for chunk in self.chunks)
+        return text_bytes + self.index.nbytes
+
+    def similarity_search(self, question: str, k: int = 5) -> List[str]:
+        """
+        Top-k chunks for the question by fused dense + keyword (BM25) ranking,
+        each prefixed with its section path. Small sections come back whole.
+        """
+        if not self.chunks:
+            return []
+        query_vector = get_embeddings().embed_query(question)
+        return [self.chunks[i].render() for i in self.index.search(question, query_vector, k=k)]
+
     def query(self, question: str) -> str:
         """Queries the document using RAG."""
-        relevant_docs = self.vectorstore.similarity_search(question, k=5)
-        context = "\n\n".join([doc.page_content for doc in relevant_docs])
+        context = "\n\n".join(self.similarity_search(question, k=5))
         prompt = ChatPromptTemplate.from_template("""
         You are a forensic document analyst. Answer the question based ONLY on the provided context.
         Context: {context}
@@ -99,3 +501,37 @@ class DocumentRAG:
         chain = prompt | self.llm
         response = chain.invoke({"context": context, "question": question})
         return response.content
+
+    def query_many(self, questions: List[str], k: int = 4, max_chunks: int = 16) -> "BatchAnswers":
+        """
+        Answers several questions with one retrieval pass and one structured
+        LLM call. Retrieved chunks are merged and deduplicated across questions
+        (round-robin by rank, up to max_chunks) and cited by chunk id.
+        """
+        if not self.chunks:
+            hits = [[] for _ in questions]
+        else:
+            # Query path, as in similarity_search: some models embed queries and passages differently
+            embeddings = get_embeddings()
+            query_vectors = [embeddings.embed_query(question) for question in questions]
+            hits = self.index.search_many(questions, np.asarray(query_vectors), k=k)
+
+        chunk_ids: List[int] = []
+        for rank in range(k):
+            for question_hits in hits:
+                if rank < len(question_hits) and question_hits[rank] not in chunk_ids:
+                    chunk_ids.append(question_hits[rank])
+        chunk_ids = sorted(chunk_ids[:max_chunks])
+
+        context = "\n\n".join(f"[chunk {i}] {self.chunks[i].render()}" for i in chunk_ids)
+        numbered = "\n".join(f"{n}. {q}" for n, q in enumerate(questions, start=1))
+        prompt = ChatPromptTemplate.from_template("""
+        You are a forensic document analyst. Answer EACH question based ONLY on the provided context.
+        Give one answer per question, using its number, and cite the chunk ids you relied on.
+        If the context does not answer a question, say so.
+        Context: {context}
+        Questions:
+        {questions}
+        """)
+        chain = prompt | self.llm.with_structured_output(BatchAnswers)
+        return chain.invoke({"context": context, "questions": numbered})
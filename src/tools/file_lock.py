@@ -0,0 +1,19 @@
+import fcntl
+from contextlib import contextmanager
+from pathlib import Path
+
+
+@contextmanager
+def file_lock(lock_path: Path):
+    """
+    Exclusive inter-process lock backed by flock(2).
+    Used to stop batch workers from filling the same cache entry twice.
+    """
+    lock_path = Path(lock_path)
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(lock_path, "a") as handle:
+        fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
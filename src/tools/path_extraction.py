@@ -0,0 +1,80 @@
+import re
+from collections import defaultdict
+from typing import Dict, Iterable, List, Set
+
+_EXTENSIONS = (
+    "py|pyi|ipynb|json|jsonl|toml|yaml|yml|ini|cfg|env|lock|txt|md|rst|csv|sql|sh|bat|"
+    "js|jsx|ts|tsx|html|css|go|rs|java|kt|c|h|cpp|hpp|rb|php|dockerfile"
+)
+# Paths with a known file extension (src/graph.py, rubric.json), or directories
+# written with a trailing slash (src/nodes/). Word boundaries keep URLs' hosts
+# and sentence punctuation out.
+_PATH_RE = re.compile(
+    rf"(?<![\w@:/.-])((?:\.{{0,2}}/)?(?:[\w.-]+/)*[\w-][\w.-]*\.(?:{_EXTENSIONS}))(?![\w/-])"
+    rf"|(?<![\w@:/.-])((?:\.{{0,2}}/)?(?:[\w.-]+/)+)(?=[\s`'\")\],;:.]|$)",
+    re.IGNORECASE,
+)
+_URL_RE = re.compile(r"\b[a-z][a-z0-9+.-]*://\S+", re.IGNORECASE)
+# Bare script names ("Node.js", "app.js") may be library names rather than files
+_BARE_SCRIPT_RE = re.compile(r"[\w.-]+\.(?:js|ts)", re.IGNORECASE)
+
+
+def normalize_path(path: str) -> str:
+    """Repository-relative POSIX form: no ./ or leading /, no Markdown escapes."""
+    path = path.replace("\\_", "_").replace("\\", "/").strip("`'\" ")
+    while path.startswith("./"):
+        path = path[2:]
+    return path.lstrip("/")
+
+
+def extract_path_mentions(text: str) -> List[str]:
+    """Every file or directory path mentioned in the text, normalized, in first-seen order."""
+    text = _URL_RE.sub(" ", text.replace("\\_", "_"))
+    mentions = []
+    for match in _PATH_RE.finditer(text):
+        path = normalize_path(match.group(1) or match.group(2))
+        if path and not path.startswith("../"):
+            mentions.append(path)
+    return list(dict.fromkeys(mentions))
+
+
+def _suffix_index(manifest: Iterable[str]) -> Dict[str, Set[str]]:
+    """Maps every trailing sub-path ('judges.py', 'nodes/judges.py', ...) and directory to full paths."""
+    index: Dict[str, Set[str]] = defaultdict(set)
+    for path in manifest:
+        parts = path.split("/")
+        for i in range(len(parts)):
+            index["/".join(parts[i:])].add(path)
+            # Directories: every prefix of the path, with a trailing slash
+            if i:
+                directory = "/".join(parts[:i]) + "/"
+                for j in range(i):
+                    index["/".join(parts[j:i]) + "/"].add(directory)
+    return index
+
+
+def cross_check(mentions: List[str], manifest: Set[str]) -> Dict[str, List[str]]:
+    """
+    Classifies each mention against the repo's file list:
+    - verified: an exact path, or a partial path that resolves to exactly one file
+    - missing: no file matches
+    - ambiguous: a partial path matching several files ("mention -> a | b")
+    - unverified: a bare *.js/*.ts name matching no file, which may just be a
+      library ("Node.js") rather than a missing file
+    """
+    exact = set(mentions) & manifest
+    index = _suffix_index(manifest)
+    result = {"verified": [], "missing": [], "ambiguous": [], "unverified": []}
+    for mention in mentions:
+        if mention in exact:
+            result["verified"].append(mention)
+            continue
+        matches = sorted(index.get(mention, ()))
+        if not matches:
+            bare_script = "/" not in mention and _BARE_SCRIPT_RE.fullmatch(mention)
+            result["unverified" if bare_script else "missing"].append(mention)
+        elif len(matches) == 1:
+            result["verified"].append(mention if matches[0] == mention else f"{mention} -> {matches[0]}")
+        else:
+            result["ambiguous"].append(f"{mention} -> {' | '.join(matches)}")
+    return result
@@ -0,0 +1,132 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Called as each page range finishes: (first_page, markdown, docling dict)
+RangeCallback = Callable[[int, str, Optional[Dict]], None]
+
+
+def page_count(pdf_path: str) -> int:
+    import fitz
+    with fitz.open(pdf_path) as doc:
+        return doc.page_count
+
+
+def page_ranges(n_pages: int, pages_per_range: int) -> List[Tuple[int, int]]:
+    """1-based inclusive (first, last) page ranges covering the document, as docling expects."""
+    pages_per_range = max(1, pages_per_range)
+    return [(first, min(first + pages_per_range - 1, n_pages)) for first in range(1, n_pages + 1, pages_per_range)]
+
+
+def fast_text(pdf_path: str) -> str:
+    """
+    Plain text of every page via PyMuPDF, in well under a second for most
+    reports. No tables or layout, but good enough to answer early questions.
+    """
+    import fitz
+
+    pages = []
+    with fitz.open(pdf_path) as doc:
+        for page in doc:
+            text = page.get_text("text").strip()
+            if text:
+                pages.append(f"## Page {page.number + 1}\n\n{text}")
+    return "\n\n".join(pages)
+
+
+# Per worker process: docling's layout/table models are loaded once and reused for every range
+_worker_converter = None
+
+
+def _init_converter() -> None:
+    """Process-pool initializer: builds the worker's converter and loads its PDF pipeline."""
+    global _worker_converter
+    from docling.datamodel.base_models import InputFormat
+    from docling.document_converter import DocumentConverter
+
+    _worker_converter = DocumentConverter()
+    try:
+        _worker_converter.initialize_pipeline(InputFormat.PDF)
+    except Exception as e:
+        print(f"Warning: could not preload docling models in worker: {e}")
+
+
+def _convert_range(pdf_path: str, first: int, last: int) -> Tuple[int, str, Dict]:
+    """Worker: layout conversion of one page range. Returns picklable results only."""
+    if _worker_converter is None:
+        _init_converter()
+    result = _worker_converter.convert(pdf_path, page_range=(first, last))
+    return first, result.document.export_to_markdown(), result.document.export_to_dict()
+
+
+def _worker_ready() -> bool:
+    return _worker_converter is not None
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def get_conversion_pool(workers: int) -> ProcessPoolExecutor:
+    """
+    Process pool shared by every conversion in this process, so its workers
+    (and their loaded models) survive from one report to the next.
+    """
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            # spawn: workers must not inherit the parent's HTTP clients or threads
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                        initializer=_init_converter)
+            _pool_workers = workers
+        return _pool
+
+
+def warm_conversion_pool(workers: int) -> None:
+    """Starts every worker of the shared pool and waits until their models are loaded."""
+    pool = get_conversion_pool(workers)
+    for future in [pool.submit(_worker_ready) for _ in range(workers)]:
+        future.result()
+
+
+def _merge_documents(parts: List[Dict]) -> Optional[Dict]:
+    from docling_core.types.doc import DoclingDocument
+
+    if not hasattr(DoclingDocument, "concatenate"):
+        return None  # older docling-core: Markdown only
+    docs = [DoclingDocument.model_validate(part) for part in parts]
+    return DoclingDocument.concatenate(docs).export_to_dict()
+
+
+def convert_pages_parallel(pdf_path: str, workers: int, pages_per_range: int,
+                           on_range: Optional[RangeCallback] = None) -> Tuple[str, Optional[Dict]]:
+    """
+    Converts a PDF with docling in page ranges across a process pool.
+    `on_range` sees every range as soon as it completes (in completion order),
+    so callers can index text while later pages are still converting. The
+    returned Markdown and docling dict are merged in page order.
+    """
+    ranges = page_ranges(page_count(pdf_path), pages_per_range)
+    results: Dict[int, Tuple[str, Dict]] = {}
+
+    pool = get_conversion_pool(workers)
+    futures = [pool.submit(_convert_range, pdf_path, first, last) for first, last in ranges]
+    for future in as_completed(futures):
+        first, markdown, document = future.result()
+        results[first] = (markdown, document)
+        print(f"Converted pages {first}-{dict(ranges)[first]} of {pdf_path}")
+        if on_range is not None:
+            on_range(first, markdown, document)
+
+    ordered = [results[first] for first, _ in ranges]
+    markdown = "\n\n".join(md for md, _ in ordered)
+    try:
+        document = _merge_documents([doc for _, doc in ordered])
+    except Exception as e:
+        print(f"Warning: could not merge docling page ranges: {e}")
+        document = None
+    return markdown, document
@@ -1,13 +1,14 @@
 import subprocess
-import tempfile
+import hashlib
+import shutil
 import os
+import time
 from pathlib import Path
-from typing import List, Optional
+from typing import List, Optional, Set
 from langchain_core.tools import tool
-
-# Global list to keep track of temporary directories during a run
-# In a production system, this would be managed more strictly (e.g. per-session)
-_active_temp_dirs = []
+from src.config import get_cache_dir, clone_cache_enabled, clone_cache_ttl
+from src.tools.file_lock import file_lock
+from src.tools.workspace import get_workspace
 
 @tool
 def clone_repository(repo_url: str) -> str:
@@ -15,21 +16,97 @@ def clone_repository(repo_url: str) -> str:
     Clones a GitHub repository into a sandboxed temporary directory.
     Returns the absolute path to the cloned repository.
     """
-    temp_dir = tempfile.TemporaryDirectory()
-    _active_temp_dirs.append(temp_dir)
-    path = Path(temp_dir.name)
-
     try:
-        subprocess.run(
-            ["git", "clone", repo_url, str(path)],
-            check=True,
-            capture_output=True,
-            timeout=120
+        # Repeated clones of the same URL within one audit share a single checkout
+        path = get_workspace().acquire_dir(
+            kind="repo",
+            key=repo_url,
+            prefix="repo_",
+            populate=lambda p: _clone_into(repo_url, p)
         )
         return str(path)
     except Exception as e:
         return f"Error cloning repository: {str(e)}"
 
+def _clone_into(repo_url: str, path: Path) -> None:
+    source = _sync_mirror(repo_url) if clone_cache_enabled() else repo_url
+    subprocess.run(
+        ["git", "clone", str(source), str(path)],
+        check=True,
+        capture_output=True,
+        timeout=120
+    )
+    # Read now: the mirror's HEAD can move under a later fetch
+    commit = repo_head_commit(str(path))
+    if commit:
+        get_workspace().remember(f"commit:{repo_url}", commit)
+
+def cloned_commit(repo_url: str) -> Optional[str]:
+    """Commit checked out when the current audit cloned repo_url, or None if it wasn't cloned."""
+    return get_workspace().recall(f"commit:{repo_url}")
+
+def _mirror_path(repo_url: str) -> Path:
+    key = hashlib.sha256(repo_url.encode("utf-8")).hexdigest()[:16]
+    return get_cache_dir() / "repos" / f"{key}.git"
+
+def repo_head_commit(repo_path: str) -> Optional[str]:
+    """HEAD commit of the git checkout at repo_path, or None if it can't be read."""
+    try:
+        result = subprocess.run(
+            ["git", "-C", repo_path, "rev-parse", "HEAD"],
+            check=True,
+            capture_output=True,
+            text=True,
+            timeout=10
+        )
+        return result.stdout.strip() or None
+    except Exception:
+        return None
+
+def _sync_mirror(repo_url: str) -> Path:
+    """
+    Maintains a bare mirror of repo_url in the shared cache so that concurrent
+    audits (and batch workers) hit the network once per repository.
+    Working copies are then cloned locally from the mirror.
+    """
+    mirror = _mirror_path(repo_url)
+
+    with file_lock(mirror.with_suffix(".lock")):
+        if not mirror.exists():
+            try:
+                subprocess.run(
+                    ["git", "clone", "--mirror", repo_url, str(mirror)],
+                    check=True,
+                    capture_output=True,
+                    timeout=120
+                )
+            except Exception:
+                # Never leave a half-written mirror behind for the next worker
+                shutil.rmtree(mirror, ignore_errors=True)
+                raise
+        elif time.time() - mirror.stat().st_mtime > clone_cache_ttl():
+            subprocess.run(
+                ["git", "-C", str(mirror), "fetch", "--prune", "origin"],
+                check=True,
+                capture_output=True,
+                timeout=120
+            )
+            mirror.touch()
+    return mirror
+
+# Directories that never count as part of the audited project
+IGNORED_DIRS = {".git", ".venv", "__pycache__", ".pytest_cache", "node_modules", ".gemini", "audit", ".specify"}
+
+def repo_manifest(repo_path: str) -> Set[str]:
+    """Relative POSIX paths of every file in the repository, skipping IGNORED_DIRS."""
+    root = Path(repo_path)
+    files = set()
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d not in IGNORED_DIRS]
+        rel = Path(dirpath).relative_to(root)
+        files.update((rel / name).as_posix() for name in filenames)
+    return files
+
 @tool
 def list_files(repo_path: str, recursive: bool = True) -> str:
     """
@@ -40,16 +117,10 @@ def list_files(repo_path: str, recursive: bool = True) -> str:
         return "Error: Path does not exist."
     
     try:
-        ignored = [".git", ".venv", "__pycache__", ".pytest_cache", "node_modules", ".gemini", "audit", ".specify"]
         if recursive:
-            files = []
-            for f in path.rglob("*"):
-                if f.is_file():
-                    # Check if any part of the path is in ignored list
-                    if not any(ig in f.parts for ig in ignored):
-                        files.append(str(f.relative_to(path)))
+            files = sorted(repo_manifest(repo_path))
         else:
-            files = [f.name for f in path.iterdir() if f.is_file() and f.name not in ignored]
+            files = [f.name for f in path.iterdir() if f.is_file() and f.name not in IGNORED_DIRS]
             
         output = "\n".join(files)
         if len(output) > 8000:
@@ -108,11 +179,5 @@ def grep_search(repo_path: str, pattern: str) -> str:
         return f"Error running grep: {str(e)}"
 
 def cleanup_temp_dirs():
-    """Cleans up all temporary directories created during the run."""
-    global _active_temp_dirs
-    for td in _active_temp_dirs:
-        try:
-            td.cleanup()
-        except:
-            pass
-    _active_temp_dirs = []
\ No newline at end of file
+    """Cleans up the cloned repositories of the current audit only."""
+    get_workspace().cleanup(kind="repo")
@@ -0,0 +1,158 @@
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+# Whole identifiers/paths (src/nodes/judges.py, StateGraph) plus their parts
+# (judges, py) so both exact and partial mentions match.
+_TOKEN_RE = re.compile(r"[A-Za-z0-9_][A-Za-z0-9_./-]*")
+_PART_RE = re.compile(r"[/._-]+")
+
+
+def tokenize(text: str) -> List[str]:
+    tokens = []
+    for token in _TOKEN_RE.findall(text.lower()):
+        token = token.strip("./-")
+        if not token:
+            continue
+        tokens.append(token)
+        parts = [p for p in _PART_RE.split(token) if p]
+        if len(parts) > 1:
+            tokens.extend(parts)
+    return tokens
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indexes of the k highest scores, best first, via argpartition (O(n) + O(k log k))."""
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    if k < len(scores):
+        candidates = np.argpartition(-scores, k - 1)[:k]
+    else:
+        candidates = np.arange(len(scores))
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+class BM25Index:
+    """Okapi BM25 over a fixed list of chunks, stored as per-term postings arrays."""
+
+    def __init__(self, chunks: List[str], k1: float = 1.5, b: float = 0.75):
+        self.k1, self.b = k1, b
+        postings: Dict[str, Tuple[List[int], List[int]]] = defaultdict(lambda: ([], []))
+        lengths = np.zeros(len(chunks), dtype=np.float32)
+        for doc_id, chunk in enumerate(chunks):
+            counts = Counter(tokenize(chunk))
+            lengths[doc_id] = sum(counts.values())
+            for term, tf in counts.items():
+                postings[term][0].append(doc_id)
+                postings[term][1].append(tf)
+
+        self.size = len(chunks)
+        avg_len = float(lengths.mean()) if self.size else 0.0
+        # Per-document length normalization, precomputed once
+        self._norm = k1 * (1 - b + b * lengths / (avg_len or 1.0))
+        self._postings = {
+            term: (np.asarray(ids, dtype=np.int64), np.asarray(tfs, dtype=np.float32))
+            for term, (ids, tfs) in postings.items()
+        }
+        self._idf = {
+            term: math.log(1 + (self.size - len(ids) + 0.5) / (len(ids) + 0.5))
+            for term, (ids, _) in self._postings.items()
+        }
+
+    @property
+    def nbytes(self) -> int:
+        return self._norm.nbytes + sum(ids.nbytes + tfs.nbytes for ids, tfs in self._postings.values())
+
+    def scores(self, query: str) -> np.ndarray:
+        scores = np.zeros(self.size, dtype=np.float32)
+        for term in set(tokenize(query)):
+            if term not in self._postings:
+                continue
+            ids, tfs = self._postings[term]
+            scores[ids] += self._idf[term] * tfs * (self.k1 + 1) / (tfs + self._norm[ids])
+        return scores
+
+
+class HybridIndex:
+    """
+    Dense + BM25 retrieval over one document's chunks.
+
+    Dense scores are a single matrix-vector product against L2-normalized rows.
+    Vectors may arrive as a float16 memory map; they are upcast once here since
+    float16 matmuls are ~10x slower in NumPy. Each ranking contributes its top
+    `fetch_k` candidates to reciprocal rank fusion, and MMR then picks the final
+    k so near-duplicate chunks do not crowd out the context.
+    """
+
+    def __init__(self, chunks: List[str], vectors: np.ndarray, rrf_k: int = 60):
+        self.chunks = chunks
+        self.vectors = np.asarray(vectors, dtype=np.float32)
+        self.bm25 = BM25Index(chunks)
+        self.rrf_k = rrf_k
+
+    @property
+    def nbytes(self) -> int:
+        return self.vectors.nbytes + self.bm25.nbytes
+
+    def dense_scores(self, query_vector: np.ndarray) -> np.ndarray:
+        query = np.asarray(query_vector, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1.0)
+        return self.vectors @ query
+
+    def search(self, query: str, query_vector: Optional[np.ndarray] = None, k: int = 5,
+               fetch_k: int = 20, mmr_lambda: float = 0.7) -> List[int]:
+        """Chunk indexes for the query, best first."""
+        if not self.chunks:
+            return []
+        dense = self.dense_scores(query_vector) if query_vector is not None else None
+        return self._fuse(query, dense, k, fetch_k, mmr_lambda)
+
+    def search_many(self, queries: List[str], query_vectors: Optional[np.ndarray] = None, k: int = 5,
+                    fetch_k: int = 20, mmr_lambda: float = 0.7) -> List[List[int]]:
+        """search() for several queries, with all dense scores from one matrix product."""
+        if not self.chunks:
+            return [[] for _ in queries]
+        dense = None
+        if query_vectors is not None:
+            matrix = np.asarray(query_vectors, dtype=np.float32).reshape(len(queries), -1)
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            dense = (matrix / np.where(norms == 0, 1.0, norms)) @ self.vectors.T
+        return [
+            self._fuse(query, None if dense is None else dense[i], k, fetch_k, mmr_lambda)
+            for i, query in enumerate(queries)
+        ]
+
+    def _fuse(self, query: str, dense: Optional[np.ndarray], k: int, fetch_k: int, mmr_lambda: float) -> List[int]:
+        fused = np.zeros(len(self.chunks), dtype=np.float32)
+        keyword = self.bm25.scores(query)
+        ranked = top_k(keyword, fetch_k)
+        # Chunks with no keyword overlap get no BM25 vote
+        self._add_rrf(fused, ranked[keyword[ranked] > 0])
+        if dense is not None:
+            self._add_rrf(fused, top_k(dense, fetch_k))
+
+        candidates = top_k(fused, fetch_k)
+        candidates = candidates[fused[candidates] > 0]
+        return self._mmr(candidates, fused[candidates], k, mmr_lambda)
+
+    def _add_rrf(self, fused: np.ndarray, ranked: np.ndarray) -> None:
+        fused[ranked] += 1.0 / (self.rrf_k + np.arange(1, len(ranked) + 1))
+
+    def _mmr(self, candidates: np.ndarray, relevance: np.ndarray, k: int, mmr_lambda: float) -> List[int]:
+        if len(candidates) <= 1:
+            return candidates.tolist()
+        relevance = relevance / relevance.max()
+        vectors = self.vectors[candidates]
+        similarity = vectors @ vectors.T
+        selected = [0]
+        max_sim = similarity[0].copy()
+        while len(selected) < min(k, len(candidates)):
+            mmr = mmr_lambda * relevance - (1 - mmr_lambda) * max_sim
+            mmr[selected] = -np.inf
+            best = int(np.argmax(mmr))
+            selected.append(best)
+            max_sim = np.maximum(max_sim, similarity[best])
+        return candidates[selected].tolist()
@@ -1,113 +1,363 @@
 import os
-import fitz  # PyMuPDF
+import json
+import time
 import base64
-import tempfile
-import shutil
+import hashlib
+import mimetypes
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Optional
-from huggingface_hub import InferenceClient
+from typing import List, Dict, Optional, Tuple
+import numpy as np
 from langchain_core.tools import tool
-from dotenv import load_dotenv
+from pydantic import BaseModel
+from src.tools.workspace import current_audit_id
+from src.config import diagram_settings, get_cache_dir, llm_timeout_seconds, vision_image_settings, vision_settings
+from src.tools.diagram_detection import DiagramCandidate, find_diagram_candidates, render_region
 
-load_dotenv()
+# Formats vision endpoints accept as-is; anything else (JPX, JBIG2, CMYK...) is re-encoded as PNG
+_PASSTHROUGH_MIME = {"png": "image/png", "jpeg": "image/jpeg", "jpg": "image/jpeg"}
+
+
+class ExtractedImage(BaseModel):
+    image_id: str
+    page: int
+    width: int
+    height: int
+    mime_type: str
+    data: bytes
+
+
+# Extracted images of each audit, by image_id, held in memory until cleanup_vision_images()
+_images: Dict[str, Dict[str, ExtractedImage]] = {}
+_images_lock = threading.Lock()
+
+
+def image_entropy(samples: bytes, width: int, height: int, channels: int) -> float:
+    """Shannon entropy (bits) of the grayscale histogram, on a subsample of at most ~256x256 pixels."""
+    pixels = np.frombuffer(samples, dtype=np.uint8)[:width * height * channels].reshape(height, width, channels)
+    step = max(1, max(width, height) // 256)
+    gray = pixels[::step, ::step, :min(channels, 3)].mean(axis=2).astype(np.uint8)
+    p = np.bincount(gray.ravel(), minlength=256) / gray.size
+    p = p[p > 0]
+    return float(-(p * np.log2(p)).sum())
+
+
+def extract_pdf_images(pdf_path: str, settings: Optional[Dict] = None) -> List[ExtractedImage]:
+    """
+    Embedded images of a PDF, in memory. Each image is extracted once however
+    many pages reuse it (by xref, then by content hash), icons and flat fills
+    are dropped by size and entropy, and images larger than max_side are
+    downsampled. Bytes keep their original format where the VLM accepts it.
+    """
+    import fitz  # PyMuPDF, imported on first use to keep startup fast
+
+    settings = settings or vision_image_settings()
+    images: List[ExtractedImage] = []
+    seen_xrefs, seen_hashes = set(), set()
+    with fitz.open(pdf_path) as doc:
+        for page_index in range(len(doc)):
+            for img in doc[page_index].get_images(full=True):
+                xref, width, height = img[0], img[2], img[3]
+                if xref in seen_xrefs:
+                    continue
+                seen_xrefs.add(xref)
+                if min(width, height) < settings["min_side"]:
+                    continue
+
+                base_image = doc.extract_image(xref)
+                digest = hashlib.sha256(base_image["image"]).hexdigest()
+                if digest in seen_hashes:
+                    continue
+                seen_hashes.add(digest)
+
+                pix = fitz.Pixmap(doc, xref)
+                cmyk = pix.n - pix.alpha >= 4
+                if cmyk:  # convert before measuring or encoding
+                    pix = fitz.Pixmap(fitz.csRGB, pix)
+                if image_entropy(pix.samples, pix.width, pix.height, pix.n) < settings["min_entropy"]:
+                    continue
+
+                ext = base_image["ext"].lower()
+                data, mime_type = base_image["image"], _PASSTHROUGH_MIME.get(ext)
+                scale = settings["max_side"] / max(pix.width, pix.height)
+                if scale < 1:
+                    pix = fitz.Pixmap(pix, max(1, int(pix.width * scale)), max(1, int(pix.height * scale)), None)
+                if scale < 1 or mime_type is None or cmyk:
+                    if mime_type == "image/jpeg" and not pix.alpha:
+                        data = pix.tobytes("jpg", jpg_quality=90)
+                    else:
+                        data, mime_type = pix.tobytes("png"), "image/png"
+
+                images.append(ExtractedImage(
+                    image_id=f"img-{digest[:12]}",
+                    page=page_index + 1,
+                    width=pix.width,
+                    height=pix.height,
+                    mime_type=mime_type,
+                    data=data,
+                ))
+    return images
+
+
+class _RateLimiter:
+    """Spaces request starts at least 60/requests_per_minute seconds apart, across threads."""
+
+    def __init__(self, requests_per_minute: float):
+        self.interval = 60.0 / requests_per_minute if requests_per_minute > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+class VisionService:
+    """
+    One InferenceClient shared by every vision call in the process, a
+    concurrency cap and rate limit, and a disk cache of answers keyed by
+    (image bytes, prompt, model) so a re-audited report costs no calls.
+    """
+
+    def __init__(self, api_key: str, settings: Optional[Dict] = None):
+        self.api_key = api_key
+        self.settings = settings or vision_settings()
+        self._client = None
+        self._client_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max(1, self.settings["concurrency"]))
+        self._rate = _RateLimiter(self.settings["requests_per_minute"])
+        self.calls = 0
+        self.cache_hits = 0
+        self._stats_lock = threading.Lock()
+
+    @property
+    def client(self):
+        with self._client_lock:
+            if self._client is None:
+                from huggingface_hub import InferenceClient
+                self._client = InferenceClient(api_key=self.api_key, timeout=llm_timeout_seconds())
+            return self._client
+
+    def _cache_path(self, data: bytes, prompt: str) -> Path:
+        key = hashlib.sha256(b"\0".join([
+            hashlib.sha256(data).hexdigest().encode(), prompt.encode("utf-8"), self.settings["model"].encode("utf-8")
+        ])).hexdigest()
+        return get_cache_dir() / "vision" / f"{key}.json"
+
+    def analyze(self, data: bytes, mime_type: str, prompt: str) -> str:
+        """The model's answer about one image. Failures raise and are never cached."""
+        cache_path = self._cache_path(data, prompt)
+        if cache_path.exists():
+            try:
+                answer = json.loads(cache_path.read_text(encoding="utf-8"))["answer"]
+            except (OSError, ValueError, KeyError):
+                pass
+            else:
+                with self._stats_lock:
+                    self.cache_hits += 1
+                return answer
+
+        encoded = base64.b64encode(data).decode("utf-8")
+        messages = [
+            {
+                "role": "user",
+                "content": [
+                    {"type": "image_url", "image_url": {"url": f"data:{mime_type};base64,{encoded}"}},
+                    {"type": "text", "text": prompt},
+                ]
+            }
+        ]
+        with self._slots:
+            self._rate.wait()
+            response = self.client.chat_completion(
+                model=self.settings["model"],
+                messages=messages,
+                max_tokens=self.settings["max_tokens"]
+            )
+        with self._stats_lock:
+            self.calls += 1
+        answer = response.choices[0].message.content
+
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = cache_path.with_suffix(f".{threading.get_ident()}.tmp")
+        tmp.write_text(json.dumps({"model": self.settings["model"], "prompt": prompt, "answer": answer}), encoding="utf-8")
+        tmp.replace(cache_path)
+        return answer
+
+    def analyze_many(self, images: List[ExtractedImage], prompt: str) -> List[Tuple[ExtractedImage, str]]:
+        """Analyzes images concurrently (within the rate limit); results in input order, errors as text."""
+        def _one(image: ExtractedImage) -> str:
+            try:
+                return self.analyze(image.data, image.mime_type, prompt)
+            except Exception as e:
+                return f"Error analyzing image: {str(e)}"
+
+        if not images:
+            return []
+        with ThreadPoolExecutor(max_workers=min(len(images), max(1, self.settings["concurrency"]))) as pool:
+            return list(zip(images, pool.map(_one, images)))
+
+
+_services: Dict[str, VisionService] = {}
+_services_lock = threading.Lock()
+
+
+def get_vision_service(api_key: str) -> VisionService:
+    """The process-wide VisionService for this API key."""
+    with _services_lock:
+        if api_key not in _services:
+            _services[api_key] = VisionService(api_key)
+        return _services[api_key]
+
+
+def get_extracted_image(image_id: str) -> Optional[ExtractedImage]:
+    with _images_lock:
+        return _images.get(current_audit_id(), {}).get(image_id)
 
-# Global registry for vision temp dirs
-_active_vision_dirs = []
 
 @tool
 def extract_images_from_pdf(pdf_path: str) -> str:
     """
-    Extracts all images from a PDF file to a temporary directory.
-    Returns a comma-separated list of image paths.
+    Extracts the distinct, non-trivial images from a PDF (logos repeated on
+    every page and tiny icons are skipped). Returns one line per image with
+    its id, page and size; pass the id to analyze_image_with_vision.
     """
     if not os.path.exists(pdf_path):
         return f"Error: PDF not found at {pdf_path}"
-    
-    # Use a temporary directory
-    temp_dir = tempfile.TemporaryDirectory(prefix="auditor_vision_")
-    _active_vision_dirs.append(temp_dir)
-    output_path = Path(temp_dir.name)
-    
-    doc = fitz.open(pdf_path)
-    extracted_images = []
-    
-    for page_index in range(len(doc)):
-        page = doc[page_index]
-        image_list = page.get_images(full=True)
-        
-        for img_index, img in enumerate(image_list):
-            xref = img[0]
-            base_image = doc.extract_image(xref)
-            image_bytes = base_image["image"]
-            image_ext = base_image["ext"]
-            
-            image_filename = f"page_{page_index+1}_img_{img_index+1}.{image_ext}"
-            image_full_path = output_path / image_filename
-            
-            with open(image_full_path, "wb") as f:
-                f.write(image_bytes)
-            
-            extracted_images.append(str(image_full_path))
-            
-    doc.close()
-    
-    if not extracted_images:
+
+    try:
+        images = extract_pdf_images(pdf_path)
+    except Exception as e:
+        return f"Error extracting images: {str(e)}"
+
+    if not images:
         return "No images found in the PDF."
-    
-    return ",".join(extracted_images)
+
+    with _images_lock:
+        store = _images.setdefault(current_audit_id(), {})
+        for image in images:
+            store[image.image_id] = image
+    return "\n".join(f"{image.image_id} (page {image.page}, {image.width}x{image.height}, {image.mime_type})"
+                     for image in images)
+
 
 @tool
 def analyze_image_with_vision(image_path: str, prompt: str) -> str:
     """
     Analyzes an image using Qwen2.5-VL via Hugging Face Inference API.
+    `image_path` is an image id from extract_images_from_pdf or a file path.
     Use this to inspect architectural diagrams or visual evidence.
     """
-    if not os.path.exists(image_path):
+    image = get_extracted_image(image_path)
+    if image is None and not os.path.exists(image_path):
         return f"Error: Image not found at {image_path}"
-    
+
     hf_token = os.getenv("HF_TOKEN")
     if not hf_token:
         return "Error: HUGGING_FACE_KEY not found in .env"
-    
+
     try:
-        # Encode image to base64
-        with open(image_path, "rb") as image_file:
-            encoded_string = base64.b64encode(image_file.read()).decode("utf-8")
-        
-        client = InferenceClient(api_key=hf_token)
-        
-        messages = [
-            {
-                "role": "user",
-                "content": [
-                    {
-                        "type": "image_url",
-                        "image_url": {"url": f"data:image/jpeg;base64,{encoded_string}"}
-                    },
-                    {
-                        "type": "text",
-                        "text": prompt
-                    }
-                ]
-            }
-        ]
-        
-        response = client.chat_completion(
-            model="Qwen/Qwen2.5-VL-7B-Instruct",
-            messages=messages,
-            max_tokens=500
-        )
-        
-        return response.choices[0].message.content
+        if image is not None:
+            data, mime_type = image.data, image.mime_type
+        else:
+            mime_type = mimetypes.guess_type(image_path)[0] or "image/jpeg"
+            with open(image_path, "rb") as image_file:
+                data = image_file.read()
+        return get_vision_service(hf_token).analyze(data, mime_type, prompt)
     except Exception as e:
         return f"Error analyzing image via Hugging Face API: {str(e)}"
 
+def render_diagram_candidates(pdf_path: str, settings: Optional[Dict] = None) -> Tuple[List[ExtractedImage], List[DiagramCandidate]]:
+    """
+    Runs the local diagram pre-pass and renders the top-ranked regions (at
+    most max_candidates, scoring at least min_score) as PNGs. Returns the
+    renders, stored for analyze_image_with_vision, and every candidate found.
+    """
+    settings = settings or diagram_settings()
+    candidates = find_diagram_candidates(pdf_path, settings)
+    selected = [c for c in candidates if c.score >= settings["min_score"]][:settings["max_candidates"]]
+    images = []
+    for candidate in selected:
+        data = render_region(pdf_path, candidate, settings["dpi"])
+        scale = settings["dpi"] / 72
+        images.append(ExtractedImage(
+            image_id=f"fig-p{candidate.page}-{hashlib.sha256(data).hexdigest()[:8]}",
+            page=candidate.page,
+            width=round((candidate.bbox[2] - candidate.bbox[0]) * scale),
+            height=round((candidate.bbox[3] - candidate.bbox[1]) * scale),
+            mime_type="image/png",
+            data=data,
+        ))
+    with _images_lock:
+        store = _images.setdefault(current_audit_id(), {})
+        for image in images:
+            store[image.image_id] = image
+    return images, candidates
+
+
+@tool
+def find_diagrams(pdf_path: str) -> str:
+    """
+    Locally (no model calls) ranks the regions of a PDF most likely to be
+    architecture diagrams, including diagrams drawn as vector graphics.
+    Returns the ranked candidates; the top ones get an id that
+    analyze_image_with_vision accepts.
+    """
+    if not os.path.exists(pdf_path):
+        return f"Error: PDF not found at {pdf_path}"
+    try:
+        images, candidates = render_diagram_candidates(pdf_path)
+    except Exception as e:
+        return f"Error finding diagrams: {str(e)}"
+    if not candidates:
+        return "No diagram-like regions or images found in the PDF."
+
+    # Renders are the leading candidates, in rank order
+    lines = []
+    for rank, candidate in enumerate(candidates, start=1):
+        image_id = images[rank - 1].image_id if rank <= len(images) else "-"
+        caption = f", caption: {candidate.caption}" if candidate.caption else ""
+        lines.append(f"{rank}. {image_id} page {candidate.page}, {candidate.kind}, score {candidate.score}{caption}")
+    return "\n".join(lines)
+
+
+@tool
+def analyze_pdf_images(pdf_path: str, prompt: str) -> str:
+    """
+    Finds the likely architecture diagrams in a PDF locally (vector drawings
+    and embedded images, ranked by layout and captions) and analyzes only the
+    top-ranked ones with Qwen2.5-VL, all at once. Prefer this over looping
+    over analyze_image_with_vision. Returns one analysis per diagram.
+    """
+    if not os.path.exists(pdf_path):
+        return f"Error: PDF not found at {pdf_path}"
+
+    hf_token = os.getenv("HF_TOKEN")
+    if not hf_token:
+        return "Error: HUGGING_FACE_KEY not found in .env"
+
+    try:
+        images, candidates = render_diagram_candidates(pdf_path)
+    except Exception as e:
+        return f"Error finding diagrams: {str(e)}"
+    if not images:
+        return f"No diagram-like regions found in the PDF ({len(candidates)} regions scored too low to analyze)."
+
+    results = get_vision_service(hf_token).analyze_many(images, prompt)
+    sections = []
+    for (image, answer), candidate in zip(results, candidates):
+        caption = f", caption: {candidate.caption}" if candidate.caption else ""
+        sections.append(f"### {image.image_id} (page {image.page}, {candidate.kind}, score {candidate.score}{caption})\n{answer}")
+    if len(candidates) > len(images):
+        sections.append(f"({len(candidates) - len(images)} lower-ranked regions not analyzed; see find_diagrams)")
+    return "\n\n".join(sections)
+
 def cleanup_vision_images():
-    """Cleans up all temporary vision directories created during the run."""
-    global _active_vision_dirs
-    for td in _active_vision_dirs:
-        try:
-            td.cleanup()
-        except:
-            pass
-    _active_vision_dirs = []
+    """Drops the extracted images of the current audit only."""
+    with _images_lock:
+        _images.pop(current_audit_id(), None)
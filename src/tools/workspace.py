@@ -0,0 +1,217 @@
+import os
+import shutil
+import tempfile
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+# The audit (and graph node) that the current thread/task is working for.
+# ContextVars are copied into LangGraph node threads, ToolNode worker threads
+# and asyncio tasks, so every tool call resolves to its own audit's workspace.
+_current_audit_id: ContextVar[str] = ContextVar("auditor_audit_id", default="default")
+_current_holder: ContextVar[Optional[str]] = ContextVar("auditor_workspace_holder", default=None)
+
+_workspaces: Dict[str, "Workspace"] = {}
+_registry_lock = threading.Lock()
+
+
+class WorkspaceQuotaExceeded(Exception):
+    """Raised when an audit's temp directories exceed its disk quota."""
+
+
+def _default_quota_bytes() -> int:
+    return int(float(os.getenv("AUDITOR_WORKSPACE_QUOTA_MB", "1024")) * 1024 * 1024)
+
+
+def _dir_size(path: Path) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                pass
+    return total
+
+
+class _Entry:
+    def __init__(self, path: Path, kind: str, key: Optional[str]):
+        self.path = path
+        self.kind = kind
+        self.key = key
+        self.size = 0
+        self.holders: Dict[Optional[str], int] = {}
+
+    @property
+    def refcount(self) -> int:
+        return sum(self.holders.values())
+
+
+class Workspace:
+    """
+    Temp directories owned by a single audit.
+
+    Directories are reference counted per holder (usually the graph node that
+    asked for them): a keyed directory such as a clone of a given repo URL is
+    created once and shared, and is deleted when its last holder releases it
+    or when the audit's workspace is closed, whichever comes first.
+    """
+
+    def __init__(self, audit_id: str, quota_bytes: Optional[int] = None):
+        self.audit_id = audit_id
+        self.quota_bytes = quota_bytes if quota_bytes is not None else _default_quota_bytes()
+        self._lock = threading.RLock()
+        self._entries: Dict[Path, _Entry] = {}
+        self._keys: Dict[str, Path] = {}
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self._notes: Dict[str, str] = {}
+        self.root = Path(tempfile.mkdtemp(prefix=f"auditor_{audit_id}_"))
+
+    def acquire_dir(
+        self,
+        kind: str,
+        key: Optional[str] = None,
+        prefix: Optional[str] = None,
+        populate: Optional[Callable[[Path], None]] = None,
+    ) -> Path:
+        """
+        Returns a directory for the current holder. If `key` is already
+        registered the existing directory is shared (refcount + 1); otherwise a
+        fresh one is created and filled by `populate`, then checked against the
+        disk quota. A failed populate leaves nothing behind.
+        """
+        holder = _current_holder.get()
+        if key is not None:
+            with self._lock:
+                key_lock = self._key_locks.setdefault(key, threading.Lock())
+            # Serialize on the key only, so unrelated clones still run in parallel
+            with key_lock:
+                with self._lock:
+                    path = self._keys.get(key)
+                    if path is not None:
+                        entry = self._entries[path]
+                        entry.holders[holder] = entry.holders.get(holder, 0) + 1
+                        return path
+                return self._create(kind, key, prefix, populate, holder)
+        return self._create(kind, key, prefix, populate, holder)
+
+    def _create(self, kind, key, prefix, populate, holder) -> Path:
+        path = Path(tempfile.mkdtemp(prefix=prefix or f"{kind}_", dir=self.root))
+        try:
+            if populate is not None:
+                populate(path)
+            size = _dir_size(path)
+            with self._lock:
+                used = sum(e.size for e in self._entries.values())
+                if used + size > self.quota_bytes:
+                    raise WorkspaceQuotaExceeded(
+                        f"Audit {self.audit_id} workspace would use {(used + size) / 1e6:.1f} MB "
+                        f"(quota {self.quota_bytes / 1e6:.1f} MB)"
+                    )
+                entry = _Entry(path, kind, key)
+                entry.size = size
+                entry.holders[holder] = 1
+                self._entries[path] = entry
+                if key is not None:
+                    self._keys[key] = path
+            return path
+        except Exception:
+            shutil.rmtree(path, ignore_errors=True)
+            raise
+
+    def release(self, path: Path, holder: Optional[str] = None) -> None:
+        """Drops one reference held by `holder`; deletes the dir at refcount zero."""
+        with self._lock:
+            entry = self._entries.get(Path(path))
+            if entry is None or holder not in entry.holders:
+                return
+            entry.holders[holder] -= 1
+            if entry.holders[holder] <= 0:
+                del entry.holders[holder]
+            if entry.refcount == 0:
+                self._drop(entry)
+
+    def release_holder(self, holder: Optional[str]) -> None:
+        """Drops every reference taken by `holder` (e.g. when a node finishes)."""
+        with self._lock:
+            for entry in list(self._entries.values()):
+                if entry.holders.pop(holder, None) is not None and entry.refcount == 0:
+                    self._drop(entry)
+
+    def cleanup(self, kind: Optional[str] = None) -> None:
+        """Deletes all directories of `kind` (or all of them) regardless of refcount."""
+        with self._lock:
+            for entry in list(self._entries.values()):
+                if kind is None or entry.kind == kind:
+                    self._drop(entry)
+            if kind is None:
+                shutil.rmtree(self.root, ignore_errors=True)
+
+    def _drop(self, entry: _Entry) -> None:
+        self._entries.pop(entry.path, None)
+        if entry.key is not None and self._keys.get(entry.key) == entry.path:
+            del self._keys[entry.key]
+        shutil.rmtree(entry.path, ignore_errors=True)
+
+    def remember(self, name: str, value: str) -> None:
+        """Records a fact about the audit (e.g. the commit a clone checked out); outlives the dirs."""
+        with self._lock:
+            self._notes[name] = value
+
+    def recall(self, name: str) -> Optional[str]:
+        with self._lock:
+            return self._notes.get(name)
+
+    def dirs(self, kind: Optional[str] = None) -> List[Path]:
+        with self._lock:
+            return [e.path for e in self._entries.values() if kind is None or e.kind == kind]
+
+    def usage_bytes(self) -> int:
+        with self._lock:
+            return sum(e.size for e in self._entries.values())
+
+
+def current_audit_id() -> str:
+    return _current_audit_id.get()
+
+
+def get_workspace(audit_id: Optional[str] = None) -> Workspace:
+    """Returns (creating on first use) the workspace for audit_id or the current audit."""
+    audit_id = audit_id or _current_audit_id.get()
+    with _registry_lock:
+        workspace = _workspaces.get(audit_id)
+        if workspace is None:
+            workspace = Workspace(audit_id)
+            _workspaces[audit_id] = workspace
+        return workspace
+
+
+def release_workspace(audit_id: Optional[str] = None) -> None:
+    """Deterministic end-of-audit cleanup: deletes everything the audit created."""
+    audit_id = audit_id or _current_audit_id.get()
+    with _registry_lock:
+        workspace = _workspaces.pop(audit_id, None)
+    if workspace is not None:
+        workspace.cleanup()
+
+
+@contextmanager
+def audit_scope(audit_id: Optional[str], holder: Optional[str] = None):
+    """
+    Binds tool calls made inside the block to `audit_id`'s workspace.
+    When `holder` is given, every directory it acquired is released on exit.
+    Safe to use from threads and coroutines alike, as the binding lives in ContextVars.
+    """
+    audit_token = _current_audit_id.set(audit_id or "default")
+    holder_token = _current_holder.set(holder)
+    try:
+        yield get_workspace()
+    finally:
+        if holder is not None:
+            workspace = _workspaces.get(_current_audit_id.get())
+            if workspace is not None:
+                workspace.release_holder(holder)
+        _current_holder.reset(holder_token)
+        _current_audit_id.reset(audit_token)
@@ -0,0 +1,31 @@
+import uuid
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, LLMResult
+from src.agent_metrics import AgentMetrics
+
+def _llm_result(input_tokens, output_tokens):
+    message = AIMessage(content="ok", usage_metadata={
+        "input_tokens": input_tokens, "output_tokens": output_tokens, "total_tokens": input_tokens + output_tokens
+    })
+    return LLMResult(generations=[[ChatGeneration(message=message)]])
+
+def test_agent_metrics_counts_turns_tokens_and_tools():
+    metrics = AgentMetrics(mode="react")
+
+    for tokens in [(100, 10), (250, 20)]:
+        run_id = uuid.uuid4()
+        metrics.on_chat_model_start({}, [], run_id=run_id)
+        metrics.on_llm_end(_llm_result(*tokens), run_id=run_id)
+
+    for _ in range(3):
+        run_id = uuid.uuid4()
+        metrics.on_tool_start({}, "input", run_id=run_id)
+        metrics.on_tool_end("output", run_id=run_id)
+
+    summary = metrics.summary()
+    assert summary["mode"] == "react"
+    assert summary["llm_calls"] == 2
+    assert summary["tool_calls"] == 3
+    assert summary["input_tokens"] == 350
+    assert summary["output_tokens"] == 30
+    assert summary["llm_latency_s"] >= 0.0
@@ -0,0 +1,140 @@
+import json
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+from src.batch import AuditJob, AuditOutcome, find_similar_reports, load_manifest, summarize, _drain
+
+def test_load_manifest_csv(tmp_path):
+    manifest = tmp_path / "cohort.csv"
+    manifest.write_text(
+        "repo_url,pdf_path,rubric_path\n"
+        "https://github.com/a/repo-one.git,reports/one.pdf,\n"
+        "https://github.com/b/repo-two,reports/two.pdf,rubric/custom.json\n"
+    )
+
+    jobs = load_manifest(str(manifest), run_id="fall26")
+
+    assert len(jobs) == 2
+    assert jobs[0].audit_id == "fall26_0001_repo_one"
+    assert jobs[0].rubric_path is None
+    assert jobs[1].rubric_path == "rubric/custom.json"
+
+def test_load_manifest_default_ids_are_unique_across_runs(tmp_path):
+    manifest = tmp_path / "cohort.csv"
+    manifest.write_text("repo_url,pdf_path\nhttps://github.com/a/repo-one,one.pdf\n")
+
+    first, second = load_manifest(str(manifest)), load_manifest(str(manifest))
+
+    assert first[0].audit_id != second[0].audit_id
+    assert first[0].audit_id.endswith("_0001_repo_one")
+
+def test_load_manifest_jsonl(tmp_path):
+    manifest = tmp_path / "cohort.jsonl"
+    manifest.write_text(
+        json.dumps({"repo_url": "https://github.com/a/x", "pdf_path": "x.pdf", "audit_id": "student_x"}) + "\n\n"
+    )
+
+    jobs = load_manifest(str(manifest))
+
+    assert [j.audit_id for j in jobs] == ["student_x"]
+
+def test_load_manifest_missing_field(tmp_path):
+    manifest = tmp_path / "bad.jsonl"
+    manifest.write_text(json.dumps({"repo_url": "https://github.com/a/x"}) + "\n")
+
+    with pytest.raises(ValueError):
+        load_manifest(str(manifest))
+
+def test_drain_retries_failed_audit_without_stopping_batch():
+    jobs = [
+        AuditJob(audit_id="ok", repo_url="r1", pdf_path="p1"),
+        AuditJob(audit_id="flaky", repo_url="r2", pdf_path="p2"),
+    ]
+    calls = {"flaky": 0}
+
+    def fake_run(job, output_dir):
+        if job.audit_id == "flaky":
+            calls["flaky"] += 1
+            if calls["flaky"] == 1:
+                return AuditOutcome(audit_id=job.audit_id, repo_url=job.repo_url, status="failed", error="boom")
+        return AuditOutcome(audit_id=job.audit_id, repo_url=job.repo_url, status="succeeded", overall_score=4.0)
+
+    with patch("src.batch.run_audit_job", side_effect=fake_run):
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            outcomes = _drain(pool, jobs, "out", max_retries=2)
+
+    by_id = {o.audit_id: o for o in outcomes}
+    assert by_id["ok"].status == "succeeded"
+    assert by_id["flaky"].status == "succeeded"
+    assert by_id["flaky"].attempts == 2
+
+def test_drain_gives_up_after_max_retries():
+    jobs = [AuditJob(audit_id="broken", repo_url="r", pdf_path="p")]
+    failed = AuditOutcome(audit_id="broken", repo_url="r", status="failed", error="boom")
+
+    with patch("src.batch.run_audit_job", return_value=failed) as mock_run:
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            outcomes = _drain(pool, jobs, "out", max_retries=1)
+
+    assert mock_run.call_count == 2
+    assert outcomes[0].status == "failed"
+
+def test_summarize_reports_throughput():
+    outcomes = [
+        AuditOutcome(audit_id="a", repo_url="r", status="succeeded", overall_score=4.0),
+        AuditOutcome(audit_id="b", repo_url="r", status="succeeded", overall_score=2.0, attempts=2),
+        AuditOutcome(audit_id="c", repo_url="r", status="failed", error="boom"),
+    ]
+
+    summary = summarize(outcomes, wall_time_s=1800)
+
+    assert summary["succeeded"] == 2
+    assert summary["failed"] == 1
+    assert summary["retried"] == 1
+    assert summary["throughput_audits_per_hour"] == 4.0
+    assert summary["mean_overall_score"] == 3.0
+
+def test_find_similar_reports_maps_documents_to_audits(tmp_path):
+    import numpy as np
+    from src.tools.chunking import Chunk
+    from src.tools.corpus_index import get_corpus_index
+    from src.tools.docs_tools import embedding_index_key, pdf_digest
+
+    pdfs = {}
+    for name in ("a", "b", "c"):
+        pdfs[name] = tmp_path / f"{name}.pdf"
+        pdfs[name].write_bytes(f"%PDF {name}".encode())
+    rng = np.random.default_rng(0)
+    shared = rng.normal(size=(10, 16))
+    index = get_corpus_index(tmp_path / "cache" / "corpus" / embedding_index_key())
+    chunks = [Chunk(text=str(i)) for i in range(10)]
+    index.add_document(pdf_digest(str(pdfs["a"])), chunks, shared)
+    index.add_document(pdf_digest(str(pdfs["b"])), chunks, shared + rng.normal(scale=0.01, size=shared.shape))
+    index.add_document(pdf_digest(str(pdfs["c"])), chunks, rng.normal(size=(10, 16)))
+    jobs = [
+        AuditJob(audit_id="x", repo_url="r", pdf_path=str(pdfs["a"])),
+        AuditJob(audit_id="y", repo_url="r", pdf_path=str(pdfs["b"])),
+        AuditJob(audit_id="z", repo_url="r", pdf_path=str(pdfs["c"])),
+        AuditJob(audit_id="x2", repo_url="r", pdf_path=str(pdfs["a"])),
+    ]
+
+    pairs = find_similar_reports(jobs, str(tmp_path / "cache"))
+
+    found = {(p["audit_a"], p["audit_b"]) for p in pairs}
+    assert ("x", "x2") in found
+    assert ("x", "y") in found or ("y", "x") in found
+    assert not any("z" in pair for pair in found)
+
+def test_successful_retry_removes_error_log(tmp_path):
+    from src.batch import run_audit_job
+    from src.state import AuditReport
+    job = AuditJob(audit_id="a1", repo_url="https://github.com/org/repo", pdf_path="r.pdf")
+    report = AuditReport(repo_url=job.repo_url, executive_summary="ok", overall_score=4.0, criteria=[], remediation_plan="")
+    with patch("src.batch.get_graph") as graph:
+        graph.return_value.invoke.side_effect = [RuntimeError("rate limited"), {"final_report": report}]
+        assert run_audit_job(job, str(tmp_path)).status == "failed"
+        assert (tmp_path / "a1" / "error.log").exists()
+
+        assert run_audit_job(job, str(tmp_path)).status == "succeeded"
+
+    assert sorted(p.name for p in (tmp_path / "a1").iterdir()) == ["report.md", "state.json"]
@@ -0,0 +1,56 @@
+from docling_core.types.doc import DoclingDocument
+from src.tools.chunking import chunk_docling, chunk_document, chunk_markdown
+
+MARKDOWN = """# Report
+
+Intro paragraph.
+
+## Architecture
+
+The StateGraph fans out to detectives.
+
+| Node | Role |
+|------|------|
+| judges | debate |
+
+## Judges
+
+Three personas score each dimension.
+"""
+
+def test_markdown_chunks_follow_sections_without_overlap():
+    chunks = chunk_markdown(MARKDOWN)
+
+    assert [c.section for c in chunks] == ["Report", "Report > Architecture", "Report > Judges"]
+    # The table stays with its section and is not split
+    assert "| judges | debate |" in chunks[1].text
+    joined = "".join(c.text for c in chunks)
+    assert joined.count("StateGraph") == 1
+
+def test_long_sections_are_split_at_max_chars():
+    markdown = "# Big\n\n" + "\n\n".join(f"Paragraph {i} " + "x" * 300 for i in range(10))
+
+    chunks = chunk_markdown(markdown, max_chars=1000)
+
+    assert len(chunks) > 1
+    assert all(len(c.text) <= 1000 for c in chunks)
+    assert all(c.section == "Big" for c in chunks)
+
+def test_docling_structure_records_heading_path():
+    doc = DoclingDocument(name="report")
+    doc.add_heading("Architecture", level=1)
+    doc.add_text(label="paragraph", text="Detectives run in parallel.")
+    doc.add_heading("Judges", level=2)
+    doc.add_text(label="paragraph", text="Three judges debate.")
+
+    chunks = chunk_docling(doc.export_to_dict())
+
+    assert [(c.section, c.text) for c in chunks] == [
+        ("Architecture", "Detectives run in parallel."),
+        ("Architecture > Judges", "Three judges debate."),
+    ]
+    assert chunks[1].render().startswith("[Architecture > Judges]")
+
+def test_invalid_structure_falls_back_to_markdown():
+    chunks = chunk_document(MARKDOWN, {"not": "a docling document"})
+    assert chunks[0].section == "Report"
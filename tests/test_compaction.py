@@ -0,0 +1,58 @@
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from src.agent_metrics import AgentMetrics
+from src.compaction import ContextCompactor, compact_messages, count_message_tokens, extract_pinned_facts
+
+SETTINGS = {"enabled": True, "max_tokens": 100000, "keep_recent": 1, "head_chars": 50}
+
+def _history(outputs):
+    messages = [HumanMessage(content="Investigate the graph wiring")]
+    for i, output in enumerate(outputs):
+        call_id = f"call_{i}"
+        messages.append(AIMessage(content="", tool_calls=[{"name": "grep_repo", "args": {}, "id": call_id}]))
+        messages.append(ToolMessage(content=output, tool_call_id=call_id))
+    return messages
+
+def test_extract_pinned_facts_keeps_paths_lines_and_commits():
+    text = "src/graph.py:42: builder.add_node\na1b2c3d Add judges\nREADME.md mentions v1.2.3"
+
+    facts = extract_pinned_facts(text)
+
+    assert "src/graph.py:42" in facts
+    assert "a1b2c3d" in facts
+    assert "README.md" in facts
+    assert "v1.2.3" not in facts and "1.2.3" not in facts
+
+def test_older_tool_outputs_are_elided_but_paired():
+    old = "src/nodes/judges.py:10: def prosecutor_node\n" + "x" * 2000
+    recent = "y" * 2000
+    messages = _history([old, recent])
+
+    compacted = compact_messages(messages, SETTINGS)
+
+    assert len(compacted) == len(messages)
+    assert [m.tool_call_id for m in compacted if isinstance(m, ToolMessage)] == ["call_0", "call_1"]
+    assert "ELIDED" in compacted[2].content
+    assert "src/nodes/judges.py:10" in compacted[2].content
+    assert compacted[4].content == recent
+    # The graph state itself is untouched
+    assert messages[2].content == old
+
+def test_recent_outputs_are_elided_when_over_budget():
+    messages = _history(["a" * 4000, "b" * 4000])
+
+    compacted = compact_messages(messages, dict(SETTINGS, max_tokens=200))
+
+    assert all("ELIDED" in m.content for m in compacted if isinstance(m, ToolMessage))
+    assert count_message_tokens(compacted) < count_message_tokens(messages)
+
+def test_compactor_hook_records_metrics():
+    metrics = AgentMetrics()
+    hook = ContextCompactor(metrics, SETTINGS)
+    messages = _history(["z" * 4000, "short"])
+
+    result = hook({"messages": messages})
+
+    assert len(result["llm_input_messages"]) == len(messages)
+    summary = metrics.summary()
+    assert summary["prompt_tokens_before_compaction"] == count_message_tokens(messages)
+    assert summary["prompt_tokens_after_compaction"] < summary["prompt_tokens_before_compaction"]
@@ -0,0 +1,111 @@
+import numpy as np
+from unittest.mock import patch
+from src.tools.chunking import Chunk
+from src.tools import corpus_index
+from src.tools.corpus_index import CorpusIndex, train_ivf
+
+def _chunks(n):
+    return [Chunk(text=f"passage {i}", section="Intro") for i in range(n)]
+
+def _cohort(index, n_docs=6, n_chunks=20, copy_of=None, seed=0):
+    rng = np.random.default_rng(seed)
+    original = rng.normal(size=(n_chunks, 32))
+    for d in range(n_docs):
+        vectors = rng.normal(size=(n_chunks, 32))
+        if d == copy_of:
+            vectors = original + rng.normal(scale=0.01, size=original.shape)
+        elif d == 0:
+            vectors = original
+        index.add_document(f"doc{d}", _chunks(n_chunks), vectors, name=f"report{d}.pdf")
+    return original
+
+def test_add_document_is_idempotent_and_persists(tmp_path):
+    index = CorpusIndex(tmp_path)
+    vectors = np.eye(3, 8)
+
+    assert index.add_document("a", _chunks(3), vectors, name="a.pdf") is True
+    assert index.add_document("a", _chunks(3), vectors, name="a.pdf") is False
+    index.add_document("b", _chunks(2), np.eye(2, 8), name="b.pdf")
+
+    reopened = CorpusIndex(tmp_path)
+    assert reopened.documents()["b"] == {"name": "b.pdf", "start": 3, "end": 5}
+    assert reopened.chunk(4)["doc"] == "b"
+    assert (tmp_path / "vectors.f16").stat().st_size == 5 * 8 * 2  # float16 rows
+
+def test_add_document_recovers_from_crash_before_commit(tmp_path):
+    index = CorpusIndex(tmp_path)
+    index.add_document("a", _chunks(3), np.eye(3, 8), name="a.pdf")
+    # The process dies after appending rows but before docs.json is replaced
+    with patch("pathlib.Path.replace", side_effect=OSError("killed")):
+        try:
+            index.add_document("crashed", [Chunk(text="orphan", section="X")] * 4, np.ones((4, 8)))
+        except OSError:
+            pass
+    assert "crashed" not in index.documents()
+
+    reopened = CorpusIndex(tmp_path)
+    b = np.zeros((2, 8))
+    b[:, 7] = 1
+    reopened.add_document("b", [Chunk(text="b text", section="B")] * 2, b, name="b.pdf")
+
+    assert reopened.documents()["b"] == {"name": "b.pdf", "start": 3, "end": 5}
+    assert reopened.chunk(3) == {"doc": "b", "section": "B", "text": "b text"}
+    assert (tmp_path / "vectors.f16").stat().st_size == 5 * 8 * 2
+    assert [(doc, reopened.chunk(row)["text"]) for doc, row, _ in reopened.search(b[0], k=1)] == [("b", "b text")]
+
+def test_search_filters_by_document(tmp_path):
+    index = CorpusIndex(tmp_path)
+    original = _cohort(index, copy_of=3)
+
+    overall = index.search(original[0], k=2)
+    assert {doc for doc, _, _ in overall} == {"doc0", "doc3"}
+
+    filtered = index.search(original[0], k=3, doc_ids={"doc3"})
+    assert [doc for doc, _, _ in filtered] == ["doc3"] * 3
+    assert filtered[0][2] > 0.99
+
+def test_search_uses_ivf_on_large_corpora(tmp_path):
+    index = CorpusIndex(tmp_path)
+    original = _cohort(index, n_docs=10, n_chunks=50, copy_of=7)
+
+    with patch.object(corpus_index, "EXACT_SEARCH_ROWS", 100):
+        hits = index.search(original[5], k=2)
+
+    assert {doc for doc, _, _ in hits} == {"doc0", "doc7"}
+    assert (tmp_path / "ivf.npz").exists()
+
+def test_ivf_is_retrained_when_corpus_grows(tmp_path):
+    index = CorpusIndex(tmp_path)
+    _cohort(index, n_docs=3)
+    index.similar_documents()
+    index.add_document("late", _chunks(4), np.random.default_rng(9).normal(size=(4, 32)))
+
+    index.similar_documents()
+
+    assert int(np.load(tmp_path / "ivf.npz")["rows"]) == 64
+
+def test_similar_documents_flags_copied_report(tmp_path):
+    index = CorpusIndex(tmp_path)
+    _cohort(index, copy_of=4)
+
+    pairs = index.similar_documents(threshold=0.9)
+
+    assert len(pairs) == 1
+    assert {pairs[0]["doc_a"], pairs[0]["doc_b"]} == {"doc0", "doc4"}
+    assert pairs[0]["similarity"] > 0.8
+
+def test_similar_documents_restricted_to_cohort(tmp_path):
+    index = CorpusIndex(tmp_path)
+    _cohort(index, copy_of=4)
+
+    assert index.similar_documents(doc_ids={"doc0", "doc1", "doc2"}) == []
+
+def test_train_ivf_assigns_every_row():
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(200, 16)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    centroids, assign = train_ivf(vectors, 8)
+
+    assert centroids.shape == (8, 16)
+    assert assign.shape == (200,) and assign.max() < 8
@@ -0,0 +1,56 @@
+import threading
+import pytest
+from unittest.mock import patch
+from src.batch import AuditOutcome
+from src.daemon import AuditDaemon, DaemonUnavailable, request
+
+@pytest.fixture
+def daemon(tmp_path):
+    daemon = AuditDaemon(tmp_path / "d.sock", warm=False)
+    daemon.start()
+    thread = threading.Thread(target=daemon.serve_forever, daemon=True)
+    thread.start()
+    yield daemon
+    daemon.shutdown()
+    thread.join(5)
+
+def test_request_without_daemon_raises(tmp_path):
+    with pytest.raises(DaemonUnavailable):
+        request({"op": "ping"}, tmp_path / "missing.sock", timeout=1)
+
+def test_ping_reports_daemon_status(daemon):
+    response = request({"op": "ping"}, daemon.socket_path, timeout=5)
+    assert response["ok"] is True
+    assert response["audits_served"] == 0
+
+def test_audit_runs_in_daemon(daemon, tmp_path):
+    outcome = AuditOutcome(audit_id="a1", repo_url="https://github.com/org/repo", status="succeeded", overall_score=4.0)
+
+    with patch("src.daemon.run_audit_job", return_value=outcome) as run_job:
+        response = request({
+            "op": "audit",
+            "job": {"audit_id": "a1", "repo_url": "https://github.com/org/repo", "pdf_path": "r.pdf"},
+            "output_dir": str(tmp_path / "out"),
+        }, daemon.socket_path, timeout=5)
+
+    assert response["outcome"]["overall_score"] == 4.0
+    assert run_job.call_args.args[0].audit_id == "a1"
+    assert request({"op": "ping"}, daemon.socket_path, timeout=5)["audits_served"] == 1
+
+def test_unknown_op_is_an_error(daemon):
+    assert request({"op": "explode"}, daemon.socket_path, timeout=5)["ok"] is False
+
+def test_second_daemon_on_same_socket_is_refused(daemon):
+    with pytest.raises(RuntimeError):
+        AuditDaemon(daemon.socket_path, warm=False).start()
+
+def test_stale_socket_is_replaced(tmp_path):
+    import socket
+    path = tmp_path / "stale.sock"
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(str(path))
+    stale.close()  # socket file left behind with nobody listening
+
+    daemon = AuditDaemon(path, warm=False)
+    daemon.start()
+    daemon._server.server_close()
@@ -0,0 +1,106 @@
+import asyncio
+import time
+import pytest
+from src.deadlines import (
+    DeadlineExceeded,
+    dimension_deadline,
+    invoke_before,
+    node_deadline,
+    run_before,
+    time_left,
+)
+
+def test_node_deadline_reserves_time_for_later_stages(monkeypatch):
+    monkeypatch.setenv("AUDITOR_DETECTIVES_BUDGET_S", "1000")
+    monkeypatch.setenv("AUDITOR_JUDGES_BUDGET_S", "100")
+    monkeypatch.setenv("AUDITOR_JUSTICE_BUDGET_S", "10")
+    audit_deadline = time.time() + 300
+
+    deadline = node_deadline({"deadline": audit_deadline}, "detectives")
+
+    # Judges (100s) and justice (10s) keep their budgets out of the 300s SLA
+    assert deadline == pytest.approx(audit_deadline - 110)
+
+def test_node_deadline_without_sla():
+    assert node_deadline({}, "judges") is None
+    assert dimension_deadline(None, 3) is None
+    assert time_left(None) == float("inf")
+
+def test_dimension_deadline_is_fair_share(monkeypatch):
+    monkeypatch.setenv("AUDITOR_DIMENSION_BUDGET_S", "1000")
+    deadline = dimension_deadline(time.time() + 90, dims_left=3)
+    assert time_left(deadline) == pytest.approx(30, abs=1)
+
+def test_run_before_cancels_slow_coroutine():
+    cancelled = {}
+
+    async def _slow():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled["yes"] = True
+            raise
+
+    start = time.time()
+    with pytest.raises(DeadlineExceeded):
+        run_before(_slow(), time.time() + 0.1)
+
+    assert time.time() - start < 2
+    assert cancelled.get("yes") is True
+
+def test_run_before_expired_deadline_does_not_start():
+    async def _never():
+        raise AssertionError("should not run")
+
+    with pytest.raises(DeadlineExceeded):
+        run_before(_never(), time.time() - 1)
+
+def test_invoke_before_without_deadline_uses_sync_invoke():
+    class _Runnable:
+        def invoke(self, value):
+            return value * 2
+
+    assert invoke_before(_Runnable(), 21, None) == 42
+
+@pytest.fixture
+def http_server():
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class _Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, like an LLM API
+
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            self.wfile.write(b"ok")
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/"
+    server.shutdown()
+
+def test_back_to_back_calls_share_one_async_client(http_server):
+    """Like langchain_openai's cached httpx.AsyncClient: pooled connections outlive a single call."""
+    import httpx
+    client = httpx.AsyncClient()
+
+    class _Runnable:
+        async def ainvoke(self, value, config=None):
+            return (await client.get(http_server)).status_code
+
+    assert [invoke_before(_Runnable(), None, time.time() + 10) for _ in range(3)] == [200, 200, 200]
+
+def test_run_before_keeps_context_variables():
+    import contextvars
+    audit = contextvars.ContextVar("audit", default=None)
+
+    async def _read():
+        return audit.get()
+
+    audit.set("audit-1")
+    assert run_before(_read(), time.time() + 5) == "audit-1"
@@ -64,3 +64,110 @@ def test_vision_inspector_node(mock_run_agent, mock_get_llm, mock_state):
     assert "swarm_visual" in result["evidences"]
     assert len(result["evidences"]["swarm_visual"]) == 1
     assert result["evidences"]["swarm_visual"][0].found is True
+
+@patch("src.nodes.detectives.get_llm")
+@patch("src.nodes.detectives._run_forensic_agent")
+def test_vision_inspector_drops_images_when_analysis_fails(mock_run_agent, mock_get_llm, mock_state):
+    from src.tools import vision_tools
+    mock_state["audit_id"] = "audit-vision-fail"
+
+    def _fail(*args, **kwargs):
+        vision_tools._images.setdefault("audit-vision-fail", {})["img-1"] = MagicMock()
+        raise RuntimeError("vision backend down")
+
+    mock_run_agent.side_effect = _fail
+    with pytest.raises(RuntimeError):
+        vision_inspector_node(mock_state)
+
+    assert "audit-vision-fail" not in vision_tools._images
+
+def test_run_forensic_agent_deadline_returns_partial_evidence():
+    import asyncio
+    import time
+    from langchain_core.messages import AIMessage
+    from src.nodes.detectives import _run_forensic_agent
+
+    class StalledAgent:
+        async def astream(self, inputs, config, stream_mode=None):
+            yield {"messages": [AIMessage(content="Checking src/graph.py", tool_calls=[{"name": "read_file", "args": {}, "id": "1"}])]}
+            await asyncio.sleep(10)
+
+    with patch("src.nodes.detectives.create_react_agent", return_value=StalledAgent()):
+        ev = _run_forensic_agent(MagicMock(), [], "instr", "Graph Orchestration", deadline=time.time() + 0.2)
+
+    assert ev.found is False
+    assert ev.confidence < 0.5
+    assert ev.content.startswith("EVIDENCE_INCONCLUSIVE")
+    assert "read_file" in ev.content
+
+def test_planned_agent_runs_tool_calls_in_parallel(monkeypatch):
+    import threading
+    from langchain_core.messages import AIMessage
+    from langchain_core.tools import tool
+    from src.nodes.detectives import _run_forensic_agent, InvestigationPlan, PlannedToolCall
+
+    monkeypatch.setenv("AUDITOR_AGENT_MODE", "plan")
+    barrier = threading.Barrier(2, timeout=5)
+    seen = []
+
+    @tool
+    def clone_repository(repo_url: str) -> str:
+        """Clones a repo."""
+        return "/tmp/cloned"
+
+    @tool
+    def read_file(repo_path: str, file_path: str) -> str:
+        """Reads a file."""
+        # Both reads must be in flight at the same time to pass the barrier
+        barrier.wait()
+        seen.append((repo_path, file_path))
+        return f"contents of {file_path}"
+
+    plan = InvestigationPlan(calls=[
+        PlannedToolCall(tool="clone_repository", arguments='{"repo_url": "https://github.com/example/repo"}'),
+        PlannedToolCall(tool="read_file", arguments='{"repo_path": "{repo_path}", "file_path": "src/state.py"}'),
+        PlannedToolCall(tool="read_file", arguments='{"repo_path": "{repo_path}", "file_path": "src/graph.py"}'),
+    ])
+    llm = MagicMock()
+    llm.with_structured_output.return_value.invoke.return_value = plan
+    llm.invoke.return_value = AIMessage(content="EVIDENCE_FOUND:\nRationale: Both files exist.")
+
+    ev = _run_forensic_agent(llm, [clone_repository, read_file], "instr", "State Management")
+
+    assert ev.found is True
+    assert ev.rationale == "Both files exist."
+    assert sorted(seen) == [("/tmp/cloned", "src/graph.py"), ("/tmp/cloned", "src/state.py")]
+    # One planning call and one answering call
+    assert llm.with_structured_output.return_value.invoke.call_count == 1
+    assert llm.invoke.call_count == 1
+    assert "contents of src/graph.py" in llm.invoke.call_args[0][0][0].content
+
+def test_planned_agent_bounds_the_clone_phase(monkeypatch):
+    import threading
+    import time
+    from unittest.mock import AsyncMock
+    from langchain_core.tools import tool
+    from src.nodes.detectives import _run_forensic_agent, InvestigationPlan, PlannedToolCall
+
+    monkeypatch.setenv("AUDITOR_AGENT_MODE", "plan")
+    release = threading.Event()
+
+    @tool
+    def clone_repository(repo_url: str) -> str:
+        """Clones a repo."""
+        release.wait(10)  # a clone that hangs past the budget
+        return "/tmp/cloned"
+
+    plan = InvestigationPlan(calls=[
+        PlannedToolCall(tool="clone_repository", arguments='{"repo_url": "https://github.com/example/repo"}'),
+    ])
+    llm = MagicMock()
+    llm.with_structured_output.return_value.ainvoke = AsyncMock(return_value=plan)
+
+    start = time.time()
+    ev = _run_forensic_agent(llm, [clone_repository], "instr", "Git History", deadline=time.time() + 1)
+    release.set()
+
+    assert time.time() - start < 5
+    assert ev.content.startswith("EVIDENCE_INCONCLUSIVE") and "cloning" in ev.content
+    llm.ainvoke.assert_not_called()
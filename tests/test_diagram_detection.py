@@ -0,0 +1,97 @@
+import fitz
+import numpy as np
+from src.tools.diagram_detection import (
+    cluster_boxes, find_diagram_candidates, page_candidates, render_region, score_raster_region, score_vector_region,
+)
+
+SETTINGS = {"min_drawings": 12, "gap": 20, "min_side": 64, "min_score": 0.3, "max_candidates": 4, "dpi": 72}
+
+def make_report(path):
+    """Page 1: drawn architecture diagram. Page 2: ruled table. Page 3: captioned screenshot. Logo on every page."""
+    rng = np.random.default_rng(0)
+    def _png(w, h):
+        return fitz.Pixmap(fitz.csRGB, w, h, rng.integers(0, 255, w * h * 3, dtype=np.uint8).tobytes(), False).tobytes("png")
+    logo, screenshot = _png(120, 120), _png(800, 500)
+    doc = fitz.open()
+    for _ in range(3):
+        page = doc.new_page()
+        page.insert_image(fitz.Rect(500, 20, 560, 80), stream=logo)
+        page.insert_text((72, 120), "A paragraph of body text that describes the system in enough words.")
+
+    page = doc[0]
+    for k in range(6):
+        x = 80 + k * 80
+        page.draw_rect(fitz.Rect(x, 200, x + 60, 240))
+        page.insert_text((x + 5, 225), f"Node{k}")
+        if k:
+            page.draw_line((x - 20, 220), (x, 220))
+            page.draw_line((x - 5, 215), (x, 220))
+            page.draw_line((x - 5, 225), (x, 220))
+    page.draw_bezier((100, 240), (150, 320), (300, 320), (350, 240))
+    page.insert_text((80, 350), "Figure 1: StateGraph architecture with fan-out")
+
+    page = doc[1]
+    for r in range(10):
+        page.draw_line((72, 200 + r * 20), (520, 200 + r * 20))
+    for c in range(5):
+        page.draw_line((72 + c * 112, 200), (72 + c * 112, 380))
+
+    page = doc[2]
+    page.insert_image(fitz.Rect(72, 200, 520, 480), stream=screenshot)
+    page.insert_text((72, 500), "Figure 3: screenshot of terminal output")
+    doc.save(str(path))
+
+def test_cluster_boxes_merges_nearby_and_keeps_distant_apart():
+    boxes = [(0, 0, 10, 10), (15, 0, 25, 10), (100, 100, 110, 110), (30, 0, 40, 10)]
+
+    clusters = cluster_boxes(boxes, gap=6)
+
+    assert sorted(sorted(members) for _, members in clusters) == [[0, 1, 3], [2]]
+    assert (0, 0, 40, 10) in [bounds for bounds, _ in clusters]
+
+def test_vector_score_prefers_shapes_labels_and_captions():
+    diagram = score_vector_region(30, 0.6, 6, 0, "Figure 2: pipeline architecture", 12)
+    table = score_vector_region(30, 0.0, 0, 0, "", 12)
+    assert diagram > 0.7 > 0.4 > table
+
+def test_raster_score_penalizes_screenshots():
+    assert score_raster_region("Figure 4: screenshot of the console", False, 0.8) < 0.3
+    assert score_raster_region("Figure 5: agent workflow", False, 0.8) > 0.6
+
+def test_find_diagram_candidates_ranks_drawn_diagram_first(tmp_path):
+    pdf = tmp_path / "report.pdf"
+    make_report(pdf)
+
+    candidates = find_diagram_candidates(str(pdf), SETTINGS)
+
+    top = candidates[0]
+    assert (top.page, top.kind) == (1, "vector")
+    assert top.caption.startswith("Figure 1")
+    assert top.score >= SETTINGS["min_score"]
+    assert all(c.score < SETTINGS["min_score"] for c in candidates[1:])
+    assert sum(1 for c in candidates if c.kind == "raster" and c.bbox[0] == 500) == 1  # logo counted once
+
+def test_inline_images_without_xref_are_all_candidates():
+    def _inline(y, seed):
+        data = np.random.default_rng(seed).integers(0, 255, 80 * 80 * 3, dtype=np.uint8).tobytes().hex()
+        return f"q 200 0 0 100 72 {y} cm BI /W 80 /H 80 /CS /RGB /BPC 8 /F /AHx ID {data}> EI Q\n"
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_text((72, 72), "Inline images have xref 0")
+    xref = page.get_contents()[0]
+    doc.update_stream(xref, doc.xref_stream(xref) + (_inline(300, 1) + _inline(500, 2)).encode())
+
+    candidates = page_candidates(page, SETTINGS)
+
+    assert len([c for c in candidates if c.kind == "raster"]) == 2
+
+def test_render_region_at_requested_dpi(tmp_path):
+    pdf = tmp_path / "report.pdf"
+    make_report(pdf)
+    top = find_diagram_candidates(str(pdf), SETTINGS)[0]
+
+    png = render_region(str(pdf), top, dpi=144)
+
+    pix = fitz.Pixmap(png)
+    assert png[:4] == b"\x89PNG"
+    assert abs(pix.width - (top.bbox[2] - top.bbox[0] + 16) * 2) <= 2
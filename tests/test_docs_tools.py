@@ -12,21 +12,325 @@ def test_query_pdf_report_success(mock_get_rag):
     
     assert "architecture" in result
 
-@patch("src.tools.docs_tools.get_llm")
 @patch("src.tools.docs_tools.get_rag")
-def test_extract_paths_from_pdf_success(mock_get_rag, mock_get_llm):
+def test_extract_paths_from_pdf_success(mock_get_rag):
     mock_rag = MagicMock()
     mock_rag.document_text = "Check out /src/main.py and also config.json."
     mock_get_rag.return_value = mock_rag
     
-    mock_llm = MagicMock()
-    mock_response = MagicMock()
-    mock_response.content = "['/src/main.py', 'config.json']"
-    mock_llm.invoke.return_value = mock_response
-    mock_get_llm.return_value = mock_llm
-    
     result = extract_paths_from_pdf.invoke({"pdf_path": "fake.pdf"})
     
-    assert "/src/main.py" in result
+    assert "src/main.py" in result
     assert "config.json" in result
     assert "Error" not in result
+
+@patch("src.tools.docs_tools.get_rag")
+def test_extract_paths_from_pdf_cross_checks_repo(mock_get_rag, tmp_path):
+    for rel in ["src/graph.py", "src/state.py", "tests/state.py"]:
+        (tmp_path / rel).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / rel).write_text("")
+    mock_rag = MagicMock()
+    # Far past the old 8000-character window, with docling's escaped underscores
+    mock_rag.document_text = "x " * 10000 + r"We wire `src/graph.py`, keep state.py and add src/evidence\_aggregator.py."
+    mock_get_rag.return_value = mock_rag
+
+    result = extract_paths_from_pdf.invoke({"pdf_path": "fake.pdf", "repo_path": str(tmp_path)})
+
+    assert "Verified (1): src/graph.py" in result
+    assert "Missing (1): src/evidence_aggregator.py" in result
+    assert "Ambiguous (1): state.py -> src/state.py | tests/state.py" in result
+
+def _fake_converter(calls):
+    converter = MagicMock()
+    def _convert(path):
+        calls.append(path)
+        result = MagicMock()
+        result.document.export_to_markdown.return_value = "# Report"
+        result.document.export_to_dict.return_value = {"name": "report"}
+        return result
+    converter.return_value.convert.side_effect = _convert
+    return converter
+
+def test_conversion_cache_is_keyed_by_content(tmp_path, monkeypatch):
+    from src.tools.docs_tools import _convert_to_markdown, conversion_cache_paths, pdf_digest
+    monkeypatch.setenv("AUDITOR_CACHE_DIR", str(tmp_path / "cache"))
+    first, second = tmp_path / "a.pdf", tmp_path / "renamed.pdf"
+    first.write_bytes(b"%PDF-1.4 same bytes")
+    second.write_bytes(b"%PDF-1.4 same bytes")
+    calls = []
+
+    with patch("src.tools.docs_tools.get_document_converter", _fake_converter(calls)):
+        assert _convert_to_markdown(str(first)) == "# Report"
+        assert _convert_to_markdown(str(second)) == "# Report"
+
+    assert calls == [str(first)]
+    _, json_path = conversion_cache_paths(pdf_digest(str(first)))
+    assert json_path.exists()
+
+def test_converter_upgrade_invalidates_cache(tmp_path, monkeypatch):
+    from src.tools.docs_tools import _convert_to_markdown
+    monkeypatch.setenv("AUDITOR_CACHE_DIR", str(tmp_path / "cache"))
+    pdf = tmp_path / "a.pdf"
+    pdf.write_bytes(b"%PDF-1.4")
+    calls = []
+
+    with patch("src.tools.docs_tools.get_document_converter", _fake_converter(calls)):
+        with patch("src.tools.docs_tools.converter_version", return_value="2.0"):
+            _convert_to_markdown(str(pdf))
+        with patch("src.tools.docs_tools.converter_version", return_value="2.1"):
+            _convert_to_markdown(str(pdf))
+
+    assert len(calls) == 2
+
+class _KeywordEmbeddings:
+    """Deterministic stand-in for the sentence-transformers model."""
+    vocabulary = ["judge", "graph", "vision"]
+
+    def __init__(self):
+        self.embedded = 0
+        self.queries = 0
+
+    def _vector(self, text):
+        return [float(text.lower().count(word)) for word in self.vocabulary]
+
+    def embed_documents(self, texts):
+        self.embedded += len(texts)
+        return [self._vector(t) for t in texts]
+
+    def embed_query(self, text):
+        self.queries += 1
+        return self._vector(text)
+
+@patch("src.tools.docs_tools.get_llm")
+def test_embedding_index_is_persisted_and_reused(mock_get_llm, tmp_path, monkeypatch):
+    from src.tools.docs_tools import DocumentRAG
+    monkeypatch.setenv("AUDITOR_CACHE_DIR", str(tmp_path))
+    text = ("The judge panel " * 80) + "\n\n" + ("The graph wiring " * 80)
+    embeddings = _KeywordEmbeddings()
+
+    with patch("src.tools.docs_tools.get_embeddings", return_value=embeddings):
+        first = DocumentRAG(text, "abc123")
+        embedded = embeddings.embedded
+        second = DocumentRAG(text, "abc123")
+        hits = second.similarity_search("graph", k=1)
+
+    assert embedded > 1
+    assert embeddings.embedded == embedded
+    assert second.vectors.dtype == "float16"
+    assert second.chunks == first.chunks
+    assert "graph" in hits[0]
+
+@patch("src.tools.docs_tools.get_llm")
+def test_streamed_index_is_keyed_apart_from_whole_document_index(mock_get_llm, tmp_path, monkeypatch):
+    from src.tools.docs_tools import DocumentRAG, _StreamingIndexer
+    monkeypatch.setenv("AUDITOR_CACHE_DIR", str(tmp_path))
+    monkeypatch.setenv("AUDITOR_PDF_PAGES_PER_RANGE", "4")
+    ranges = ["# Judges\n\n" + "The judge panel " * 80, "# Graph\n\n" + "The graph wiring " * 80]
+    embeddings = _KeywordEmbeddings()
+
+    with patch("src.tools.docs_tools.get_embeddings", return_value=embeddings):
+        streaming = _StreamingIndexer()
+        for first_page, markdown in zip((1, 5), ranges):
+            streaming.add(first_page, markdown, None)
+        streamed = DocumentRAG("\n\n".join(ranges), "d1", prebuilt=streaming.result())
+        embedded = embeddings.embedded
+        reloaded = DocumentRAG("\n\n".join(ranges), "d1")
+
+    root = tmp_path / "embeddings" / "all-MiniLM-L6-v2"
+    assert (root / "structure-v1-ranges4" / "d1" / "vectors.npy").exists()
+    assert not (root / "structure-v1" / "d1").exists()
+    # A later load without streamed ranges reuses the streamed index instead of re-embedding
+    assert embeddings.embedded == embedded and reloaded.chunks == streamed.chunks
+
+def test_rag_cache_is_single_flight():
+    import threading
+    from src.tools.docs_tools import RAGCache
+    cache = RAGCache(max_bytes=10**6)
+    started = threading.Event()
+    loads = []
+
+    def _loader():
+        loads.append(1)
+        started.wait(0.2)
+        rag = MagicMock()
+        rag.approx_bytes.return_value = 100
+        return rag
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_load("pdf", _loader))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    started.set()
+    for t in threads:
+        t.join()
+
+    assert len(loads) == 1
+    assert len({id(r) for r in results}) == 1
+    assert cache.stats()["hits"] == 7
+
+def test_rag_cache_evicts_least_recently_used_by_bytes():
+    from src.tools.docs_tools import RAGCache
+    cache = RAGCache(max_bytes=250)
+
+    def _rag(size):
+        rag = MagicMock()
+        rag.approx_bytes.return_value = size
+        return lambda: rag
+
+    cache.get_or_load("a", _rag(100))
+    cache.get_or_load("b", _rag(100))
+    cache.get_or_load("a", _rag(100))  # touch a, so b is the oldest
+    cache.get_or_load("c", _rag(100))
+
+    stats = cache.stats()
+    assert stats["entries"] == 2
+    assert stats["bytes"] == 200
+    assert stats["evictions"] == 1
+    assert cache.get_or_load("b", lambda: None) is None
+
+@patch("src.tools.docs_tools.get_llm")
+def test_parallel_conversion_streams_ranges_into_index(mock_get_llm, tmp_path, monkeypatch):
+    from src.tools import docs_tools
+    monkeypatch.setenv("AUDITOR_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setenv("AUDITOR_PDF_WORKERS", "2")
+    pdf = tmp_path / "report.pdf"
+    pdf.write_bytes(b"%PDF-1.4 parallel")
+    embeddings = _KeywordEmbeddings()
+
+    def _fake_parallel(pdf_path, workers, pages_per_range, on_range):
+        # Ranges complete out of order
+        on_range(9, "# Judges\n\nThe judge panel.", None)
+        on_range(1, "# Graph\n\nThe graph wiring.", None)
+        return "# Graph\n\nThe graph wiring.\n\n# Judges\n\nThe judge panel.", None
+
+    with patch("src.tools.docs_tools.convert_pages_parallel", side_effect=_fake_parallel), \
+         patch("src.tools.docs_tools.get_embeddings", return_value=embeddings):
+        rag = docs_tools._build_full_rag(str(pdf), docs_tools.pdf_digest(str(pdf)))
+
+    assert [c.section for c in rag.chunks] == ["Graph", "Judges"]
+    assert embeddings.embedded == 2  # embedded once, while streaming
+    corpus = docs_tools.get_corpus_index()
+    assert corpus.documents()[docs_tools.pdf_digest(str(pdf))]["name"] == "report.pdf"
+
+@patch("src.tools.docs_tools.get_llm")
+def test_image_only_ranges_do_not_break_the_index(mock_get_llm, tmp_path, monkeypatch):
+    from src.tools import docs_tools
+    monkeypatch.setenv("AUDITOR_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setenv("AUDITOR_PDF_WORKERS", "2")
+    embeddings = _KeywordEmbeddings()
+
+    def _fake_parallel(pdf_path, workers, pages_per_range, on_range):
+        on_range(1, "# Graph\n\nThe graph wiring.", None)
+        on_range(9, "", None)  # scanned pages: no text layer
+        return "# Graph\n\nThe graph wiring.", None
+
+    def _scanned_only(pdf_path, workers, pages_per_range, on_range):
+        on_range(1, "", None)
+        return "", None
+
+    with patch("src.tools.docs_tools.get_embeddings", return_value=embeddings):
+        assert docs_tools._embed_chunks([]).shape == (0, 3)
+        for name, convert in [("mixed.pdf", _fake_parallel), ("scanned.pdf", _scanned_only)]:
+            pdf = tmp_path / name
+            pdf.write_bytes(f"%PDF-1.4 {name}".encode())
+            with patch("src.tools.docs_tools.convert_pages_parallel", side_effect=convert):
+                rag = docs_tools._build_full_rag(str(pdf), docs_tools.pdf_digest(str(pdf)))
+            assert rag is not None
+            assert len(rag.chunks) == (1 if name == "mixed.pdf" else 0)
+
+@patch("src.tools.docs_tools.get_llm")
+def test_fast_text_rag_is_upgraded_in_background(mock_get_llm, tmp_path, monkeypatch):
+    import threading
+    from src.tools import docs_tools
+    monkeypatch.setenv("AUDITOR_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setenv("AUDITOR_PDF_FAST_TEXT", "1")
+    monkeypatch.setattr(docs_tools, "_rag_cache", docs_tools.RAGCache(10**9))
+    pdf = tmp_path / "report.pdf"
+    pdf.write_bytes(b"%PDF-1.4 fast")
+    release, upgraded = threading.Event(), threading.Event()
+    full = MagicMock()
+    full.approx_bytes.return_value = 10
+
+    def _slow_full(pdf_path, digest):
+        release.wait(5)
+        upgraded.set()
+        return full
+
+    with patch("src.tools.docs_tools.fast_text", return_value="# Page 1\n\nquick text"), \
+         patch("src.tools.docs_tools.get_embeddings", return_value=_KeywordEmbeddings()), \
+         patch("src.tools.docs_tools._build_full_rag", side_effect=_slow_full):
+        first = docs_tools.get_rag(str(pdf))
+        assert "quick text" in first.document_text
+        # Not a daemon: interpreter shutdown waits for the upgrade instead of dropping it
+        assert not any(t.daemon for t in threading.enumerate() if t.name.startswith("rag-upgrade"))
+        assert docs_tools.wait_for_rag_upgrades(timeout=0.01) is False
+        release.set()
+        assert docs_tools.wait_for_rag_upgrades(timeout=5) is True
+
+    assert upgraded.is_set()
+    assert docs_tools.get_rag(str(pdf)) is full
+
+@patch("src.tools.docs_tools.get_llm")
+def test_query_many_retrieves_once_and_answers_in_one_call(mock_get_llm, tmp_path, monkeypatch):
+    from langchain_core.runnables import RunnableLambda
+    from src.tools.docs_tools import BatchAnswers, DocumentRAG, QuestionAnswer
+    monkeypatch.setenv("AUDITOR_CACHE_DIR", str(tmp_path))
+    prompts = []
+
+    def _answer(prompt_value):
+        prompts.append(prompt_value.to_string())
+        return BatchAnswers(answers=[
+            QuestionAnswer(question_number=1, answer="Three judges.", source_chunks=[1]),
+            QuestionAnswer(question_number=2, answer="A StateGraph.", source_chunks=[0]),
+        ])
+
+    mock_get_llm.return_value.with_structured_output.return_value = RunnableLambda(_answer)
+    text = "# Graph\n\nThe graph wiring.\n\n# Judges\n\nThe judge panel.\n\n# Vision\n\nThe vision step."
+    embeddings = _KeywordEmbeddings()
+
+    with patch("src.tools.docs_tools.get_embeddings", return_value=embeddings):
+        rag = DocumentRAG(text, "multi")
+        embedded, queries = embeddings.embedded, embeddings.queries
+        batch = rag.query_many(["Who are the judge personas?", "How is the graph built?"], k=1)
+
+    assert len(prompts) == 1
+    # Questions go through embed_query, like similarity_search, never embed_documents
+    assert (embeddings.embedded - embedded, embeddings.queries - queries) == (0, 2)
+    assert "[chunk 0] [Graph]" in prompts[0] and "[chunk 1] [Judges]" in prompts[0]
+    assert "Vision" not in prompts[0]
+    assert [a.answer for a in batch.answers] == ["Three judges.", "A StateGraph."]
+
+@patch("src.tools.docs_tools.get_rag")
+def test_query_pdf_report_batch_formats_answers_in_question_order(mock_get_rag):
+    from src.tools.docs_tools import BatchAnswers, QuestionAnswer, query_pdf_report_batch
+    mock_get_rag.return_value.query_many.return_value = BatchAnswers(answers=[
+        QuestionAnswer(question_number=2, answer="Yes.", source_chunks=[4, 7]),
+    ])
+
+    result = query_pdf_report_batch.invoke({"pdf_path": "fake.pdf", "questions": ["First?", "Second?"]})
+
+    assert result.splitlines() == [
+        "Q1: First?", "A: [No answer returned]",
+        "Q2: Second?", "A: Yes.", "Sources: chunk 4, chunk 7",
+    ]
+
+def test_embedding_backend_is_configurable(monkeypatch):
+    from src.tools.docs_tools import build_embeddings, embedding_index_key
+    monkeypatch.setenv("AUDITOR_EMBEDDING_BACKEND", "onnx-int8")
+    monkeypatch.setenv("AUDITOR_EMBEDDING_BATCH_SIZE", "64")
+
+    with patch("langchain_huggingface.HuggingFaceEmbeddings") as embeddings_cls:
+        build_embeddings()
+
+    kwargs = embeddings_cls.call_args.kwargs
+    assert kwargs["model_kwargs"] == {"backend": "onnx", "model_kwargs": {"file_name": "onnx/model_quint8_avx2.onnx"}}
+    assert kwargs["encode_kwargs"] == {"batch_size": 64}
+    # Vectors from different backends never share a persisted index
+    assert embedding_index_key() == "all-MiniLM-L6-v2@onnx-int8-model_quint8_avx2"
+    monkeypatch.setenv("AUDITOR_EMBEDDING_ONNX_FILE", "onnx/model_qint8_arm64.onnx")
+    assert embedding_index_key() == "all-MiniLM-L6-v2@onnx-int8-model_qint8_arm64"
+
+def test_unknown_embedding_backend_is_rejected():
+    from src.tools.docs_tools import embedding_backend_kwargs
+    with pytest.raises(ValueError):
+        embedding_backend_kwargs("tpu", "")
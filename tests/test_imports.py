@@ -0,0 +1,18 @@
+import subprocess
+import sys
+
+HEAVY_MODULES = ["docling", "torch", "sentence_transformers", "fitz", "huggingface_hub", "langchain_google_genai", "langchain_openai"]
+
+def _loaded_after(statement):
+    probe = f"import sys; {statement}; print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, check=True)
+    return [m for m in result.stdout.strip().split(",") if m]
+
+def test_graph_import_does_not_load_heavy_dependencies():
+    assert _loaded_after("import src.graph") == []
+
+def test_get_llm_imports_only_the_configured_provider(monkeypatch):
+    monkeypatch.setenv("GOOGLE_API_KEY", "key")
+    monkeypatch.delenv("LLM_FALLBACK_PROVIDER", raising=False)
+    loaded = _loaded_after("from src.llm_factory import get_llm; get_llm(provider='gemini')")
+    assert loaded == ["langchain_google_genai"]
@@ -81,3 +81,29 @@ def test_judge_handles_exception(mock_get_llm, base_state_with_evidence):
     # Fallback should kick in
     assert result["opinions"][0].score == 1
     assert "API Timeout" in result["opinions"][0].argument
+
+@patch("src.nodes.judges.get_llm")
+def test_judge_deadline_yields_low_confidence_placeholder(mock_get_llm, base_state_with_evidence):
+    import asyncio
+    import time
+
+    async def _stalled(*args, **kwargs):
+        await asyncio.sleep(10)
+
+    mock_structured_llm = MagicMock()
+    mock_structured_llm.ainvoke.side_effect = _stalled
+    mock_llm = MagicMock()
+    mock_llm.with_structured_output.return_value = mock_structured_llm
+    mock_get_llm.return_value = mock_llm
+
+    # The audit SLA expires almost immediately
+    base_state_with_evidence["deadline"] = time.time() + 0.2
+    start = time.time()
+    result = judge_prosecutor(base_state_with_evidence)
+
+    assert time.time() - start < 5
+    opinion = result["opinions"][0]
+    assert opinion.argument.startswith("DEADLINE_EXCEEDED")
+    # Flagged so the Chief Justice reports it without counting it as a vote
+    assert opinion.placeholder is True
+    assert "placeholder" not in JudicialOpinion.model_json_schema()["properties"]
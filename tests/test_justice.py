@@ -1,8 +1,26 @@
 import pytest
 from unittest.mock import patch, MagicMock
-from src.nodes.justice import synthesize_verdicts, generate_report_markdown
+from src.nodes.justice import (
+    synthesize_verdicts, generate_executive_summary, write_report_skeleton, publish_report, generate_report_markdown,
+    _generate_llm_summary, template_summary,
+)
+from src.results_store import get_results_store
 from src.state import JudicialOpinion, Evidence
 
+@pytest.fixture(autouse=True)
+def results_db(tmp_path, monkeypatch):
+    monkeypatch.setenv("AUDITOR_RESULTS_DB", str(tmp_path / "results.db"))
+    monkeypatch.setenv("AUDITOR_CACHE_DIR", str(tmp_path / "cache"))
+
+def run_chief_justice(state):
+    """ChiefJustice, then ExecutiveSummary and ReportWriter, then PublishReport, as the graph runs them."""
+    state = dict(state)
+    state.update(synthesize_verdicts(state))
+    for update in [generate_executive_summary(state), write_report_skeleton(state)]:
+        state.update(update)
+    state.update(publish_report(state))
+    return state
+
 @pytest.fixture
 def mock_state_with_opinions():
     return {
@@ -21,15 +39,13 @@ def mock_state_with_opinions():
     }
 
 @patch("src.nodes.justice.get_llm")
-@patch("src.nodes.justice.Path.mkdir")
-@patch("builtins.open")
-def test_synthesize_verdicts_base_case(mock_open, mock_mkdir, mock_get_llm, mock_state_with_opinions):
+def test_synthesize_verdicts_base_case(mock_get_llm, mock_state_with_opinions):
     """Test standard synthesis without triggering special rules."""
     mock_llm = MagicMock()
     mock_llm.invoke.return_value = MagicMock(content="Mocked Summary")
     mock_get_llm.return_value = mock_llm
     
-    result = synthesize_verdicts(mock_state_with_opinions)
+    result = run_chief_justice(mock_state_with_opinions)
     
     assert "final_report" in result
     report = result["final_report"]
@@ -41,9 +57,7 @@ def test_synthesize_verdicts_base_case(mock_open, mock_mkdir, mock_get_llm, mock
     assert report.criteria[0].final_score == 4
 
 @patch("src.nodes.justice.get_llm")
-@patch("src.nodes.justice.Path.mkdir")
-@patch("builtins.open")
-def test_rule_of_security_cap(mock_open, mock_mkdir, mock_get_llm, mock_state_with_opinions):
+def test_rule_of_security_cap(mock_get_llm, mock_state_with_opinions):
     """Test that a security flaw reported by Prosecutor caps the score at 3."""
     mock_llm = MagicMock()
     mock_llm.invoke.return_value = MagicMock(content="Mocked Summary")
@@ -53,7 +67,7 @@ def test_rule_of_security_cap(mock_open, mock_mkdir, mock_get_llm, mock_state_wi
         judge="Prosecutor", criterion_id="dim_1", score=1, argument="Critical security vulnerability found.", cited_evidence=[]
     )
     
-    result = synthesize_verdicts(mock_state_with_opinions)
+    result = run_chief_justice(mock_state_with_opinions)
     
     # Base score = (1 + 5 + 4) / 3 = 3.33
     # Rule of Security caps at 3.0
@@ -61,9 +75,7 @@ def test_rule_of_security_cap(mock_open, mock_mkdir, mock_get_llm, mock_state_wi
     assert "Rule of Security" in result["final_report"].criteria[0].dissent_summary
 
 @patch("src.nodes.justice.get_llm")
-@patch("src.nodes.justice.Path.mkdir")
-@patch("builtins.open")
-def test_rule_of_evidence_hallucination(mock_open, mock_mkdir, mock_get_llm, mock_state_with_opinions):
+def test_rule_of_evidence_hallucination(mock_get_llm, mock_state_with_opinions):
     """Test that Defense hallucinating a high score without missing evidence triggers a penalty."""
     mock_llm = MagicMock()
     mock_llm.invoke.return_value = MagicMock(content="Mocked Summary")
@@ -75,31 +87,93 @@ def test_rule_of_evidence_hallucination(mock_open, mock_mkdir, mock_get_llm, moc
     ]
     mock_state_with_opinions["evidences"]["dim_1"][0].found = False
     
-    result = synthesize_verdicts(mock_state_with_opinions)
+    result = run_chief_justice(mock_state_with_opinions)
     
     # Base score = 5.0. Missing evidence penalty = -1.5 => 3.5 => rounded to 4
     assert result["final_report"].criteria[0].final_score == 4
     # Wait, the rule says max 1.0, wait, it says max(1.0, final_score - 1.5). 5 - 1.5 = 3.5.
 
 @patch("src.nodes.justice.get_llm")
-@patch("src.nodes.justice.Path.mkdir")
-@patch("builtins.open")
-def test_timestamped_report_generation(mock_open, mock_mkdir, mock_get_llm, mock_state_with_opinions):
-    """Test that it tries to save the files with timestamping."""
+def test_report_saved_to_results_store(mock_get_llm, mock_state_with_opinions):
+    """The report goes to the results store under the audit id; no shared Markdown file is written."""
     mock_llm = MagicMock()
     mock_llm.invoke.return_value = MagicMock(content="Mocked Summary")
     mock_get_llm.return_value = mock_llm
-    
+    mock_state_with_opinions["audit_id"] = "audit-42"
+
+    with patch("builtins.open") as mock_open:
+        result = run_chief_justice(mock_state_with_opinions)
+    mock_open.assert_not_called()
+
+    store = get_results_store()
+    assert store.load_report("audit-42") == result["final_report"]
+    assert store.load_evidences("audit-42") == mock_state_with_opinions["evidences"]
+    assert "Mocked Summary" in store.render_markdown("audit-42")
+
+@patch("src.nodes.justice.get_llm")
+def test_audit_id_defaults_to_timestamp(mock_get_llm, mock_state_with_opinions):
+    mock_get_llm.return_value.invoke.return_value = MagicMock(content="Mocked Summary")
+
+    with patch("src.nodes.justice.datetime") as mock_datetime:
+        mock_datetime.now.return_value.strftime.return_value = "audit_20240101_120000"
+        run_chief_justice(mock_state_with_opinions)
+
+    assert get_results_store().load_report("audit_20240101_120000") is not None
+
+def test_report_skeleton_persisted_before_summary(mock_state_with_opinions):
+    mock_state_with_opinions["audit_id"] = "audit-7"
+    mock_state_with_opinions["repo_commits"] = {"https://github.com/example/repo": "abc123"}
+    state = dict(mock_state_with_opinions)
+    state.update(synthesize_verdicts(state))
+
+    skeleton = write_report_skeleton(state)["final_report"]
+
+    stored = get_results_store().load_report("audit-7")
+    assert stored == skeleton and stored.executive_summary.startswith("Overall Score: 4.00/5.0")
+    assert get_results_store().commit_of("audit-7") == "abc123"  # the clone's commit, not the mirror's
+
+    state.update(final_report=skeleton, executive_summary="LLM summary")
+    assert publish_report(state)["final_report"].executive_summary == "LLM summary"
+    assert get_results_store().load_report("audit-7").executive_summary == "LLM summary"
+
+@patch("src.nodes.justice.get_llm")
+def test_summary_prompt_is_cacheable(mock_get_llm, mock_state_with_opinions):
+    """No timestamp in the prompt: identical findings are answered from the cache."""
+    mock_get_llm.return_value.invoke.return_value = MagicMock(content="Cached Summary")
+    results = synthesize_verdicts(mock_state_with_opinions)["criterion_results"]
+
     with patch("src.nodes.justice.datetime") as mock_datetime:
-        mock_datetime.now.return_value.strftime.return_value = "20240101_120000"
-        
-        synthesize_verdicts(mock_state_with_opinions)
-        
-        # Check if the correct files were opened for writing
-        # open is called twice: once for timestamped, once for standard name
-        calls = mock_open.call_args_list
-        assert any("audit_report_20240101_120000.md" in str(call) for call in calls)
-        assert any("audit_report.md" in str(call) for call in calls)
+        mock_datetime.now.return_value.strftime.return_value = "2024-01-01 12:00:00"
+        first = _generate_llm_summary(4.0, results)
+    second = _generate_llm_summary(4.0, results)
+
+    assert first == second == "Cached Summary"
+    assert mock_get_llm.return_value.invoke.call_count == 1
+    prompt = mock_get_llm.return_value.invoke.call_args[0][0][0].content
+    assert "2024" not in prompt and "Completion Time" not in prompt
+
+@patch("src.nodes.justice.get_llm")
+def test_failed_summary_is_not_cached(mock_get_llm, mock_state_with_opinions):
+    mock_get_llm.return_value.invoke.side_effect = [RuntimeError("down"), MagicMock(content="Recovered")]
+    results = synthesize_verdicts(mock_state_with_opinions)["criterion_results"]
+
+    assert _generate_llm_summary(4.0, results) == template_summary(4.0, results)
+    assert _generate_llm_summary(4.0, results) == "Recovered"
+
+@patch("src.nodes.justice.get_llm")
+def test_template_summary_mode_skips_llm(mock_get_llm, mock_state_with_opinions, monkeypatch):
+    monkeypatch.setenv("AUDITOR_SUMMARY_MODE", "template")
+
+    state = run_chief_justice(mock_state_with_opinions)
+
+    mock_get_llm.assert_not_called()
+    assert state["final_report"].executive_summary.startswith("Overall Score: 4.00/5.0")
+
+def test_summary_and_report_persistence_run_in_parallel():
+    from src.graph import build_graph
+    edges = {(e.source, e.target) for e in build_graph().get_graph().edges}
+    assert {("ChiefJustice", "ExecutiveSummary"), ("ChiefJustice", "ReportWriter"),
+            ("ExecutiveSummary", "PublishReport"), ("ReportWriter", "PublishReport")} <= edges
 
 def test_generate_report_markdown():
     """Test markdown rendering function."""
@@ -0,0 +1,29 @@
+import threading
+import uuid
+import pytest
+from src.llm_factory import LLMConcurrencyLimiter, get_llm
+
+def test_concurrency_limiter_holds_slot_until_call_ends():
+    semaphore = threading.BoundedSemaphore(1)
+    limiter = LLMConcurrencyLimiter(semaphore)
+    run_id = uuid.uuid4()
+
+    limiter.on_chat_model_start({}, [], run_id=run_id)
+    assert semaphore.acquire(blocking=False) is False
+
+    limiter.on_llm_end(None, run_id=run_id)
+    assert semaphore.acquire(blocking=False) is True
+
+def test_concurrency_limiter_releases_on_error_once():
+    semaphore = threading.BoundedSemaphore(1)
+    limiter = LLMConcurrencyLimiter(semaphore)
+    run_id = uuid.uuid4()
+
+    limiter.on_chat_model_start({}, [], run_id=run_id)
+    limiter.on_llm_error(Exception("boom"), run_id=run_id)
+    # A second end event for the same run must not over-release
+    limiter.on_llm_end(None, run_id=run_id)
+
+def test_get_llm_unsupported_provider():
+    with pytest.raises(ValueError):
+        get_llm(provider="unknown")
@@ -0,0 +1,120 @@
+import asyncio
+import pytest
+from unittest.mock import MagicMock
+from langchain_core.runnables import RunnableLambda
+from src.llm_hedging import HedgedChatModel, LatencyTracker
+
+def _model(name, delay=0.0, error=None, log=None):
+    async def _acall(value):
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            if log is not None:
+                log.append(f"{name} cancelled")
+            raise
+        if error:
+            raise error
+        return f"{name}:{value}"
+
+    def _call(value):
+        if error:
+            raise error
+        return f"{name}:{value}"
+
+    return RunnableLambda(_call, afunc=_acall)
+
+@pytest.fixture(autouse=True)
+def fast_hedging(monkeypatch):
+    monkeypatch.setenv("AUDITOR_HEDGE_DEFAULT_DELAY_S", "0.05")
+    monkeypatch.setenv("AUDITOR_HEDGE_MIN_DELAY_S", "0.01")
+    monkeypatch.setenv("AUDITOR_FAILOVER_THRESHOLD", "2")
+
+def test_fast_primary_wins_without_hedge():
+    tracker = LatencyTracker()
+    model = HedgedChatModel([("a", _model("a")), ("b", _model("b"))], tracker)
+
+    assert model.invoke("q") == "a:q"
+    assert tracker.stats()["a"]["wins"] == 1
+    assert "b" not in tracker.stats()
+
+def test_slow_primary_is_hedged_and_cancelled():
+    tracker = LatencyTracker()
+    log = []
+    model = HedgedChatModel([("slow", _model("slow", delay=5, log=log)), ("fast", _model("fast"))], tracker)
+
+    assert model.invoke("q") == "fast:q"
+    assert log == ["slow cancelled"]
+    assert tracker.stats()["fast"]["hedges"] == 1
+
+def test_error_fails_over_immediately():
+    tracker = LatencyTracker()
+    model = HedgedChatModel([("bad", _model("bad", error=RuntimeError("500"))), ("good", _model("good"))], tracker)
+
+    assert model.invoke("q") == "good:q"
+    assert tracker.stats()["bad"]["errors"] == 1
+
+def test_persistent_errors_move_provider_to_back():
+    tracker = LatencyTracker()
+    model = HedgedChatModel([("bad", _model("bad", error=RuntimeError("500"))), ("good", _model("good"))], tracker)
+
+    model.invoke("q")
+    model.invoke("q")
+
+    assert tracker.is_healthy("bad") is False
+    assert model._ordered()[0][0] == "good"
+
+def test_all_providers_failing_raises_last_error():
+    model = HedgedChatModel([
+        ("a", _model("a", error=RuntimeError("a down"))),
+        ("b", _model("b", error=RuntimeError("b down"))),
+    ], LatencyTracker())
+
+    with pytest.raises(RuntimeError):
+        model.invoke("q")
+
+def test_hedge_delay_follows_p95(monkeypatch):
+    monkeypatch.setenv("AUDITOR_HEDGE_MIN_SAMPLES", "3")
+    tracker = LatencyTracker()
+    for latency in [1.0, 2.0, 3.0, 10.0]:
+        tracker.record_success("p", latency)
+
+    assert tracker.hedge_delay("p") == 10.0
+
+def test_bind_tools_and_structured_output_apply_to_all_candidates():
+    a, b = MagicMock(), MagicMock()
+    model = HedgedChatModel([("a", a), ("b", b)], LatencyTracker())
+
+    bound = model.bind_tools(["tool"])
+    structured = model.with_structured_output(dict)
+
+    a.bind_tools.assert_called_once_with(["tool"])
+    b.bind_tools.assert_called_once_with(["tool"])
+    a.with_structured_output.assert_called_once_with(dict)
+    assert isinstance(bound, HedgedChatModel)
+    assert isinstance(structured, HedgedChatModel)
+
+def test_get_llm_wraps_when_fallback_configured(monkeypatch):
+    from src.llm_factory import get_llm
+    monkeypatch.setenv("OPENROUTER_API_KEY", "key")
+    monkeypatch.setenv("GOOGLE_API_KEY", "key")
+    monkeypatch.setenv("LLM_FALLBACK_PROVIDER", "gemini")
+
+    model = get_llm(provider="openrouter")
+
+    assert isinstance(model, HedgedChatModel)
+    assert [k.split(":")[0] for k, _ in model.candidates] == ["openrouter", "gemini"]
+
+def test_sync_invoke_reuses_one_event_loop():
+    """Cached async clients keep connections on the loop of their first call; it must stay open."""
+    loops = []
+
+    async def _acall(value):
+        loop = asyncio.get_running_loop()
+        assert all(seen is loop for seen in loops) and not loop.is_closed()
+        loops.append(loop)
+        return value
+
+    model = HedgedChatModel([("a", RunnableLambda(lambda v: v, afunc=_acall))], LatencyTracker())
+
+    assert [model.invoke(i) for i in range(3)] == [0, 1, 2]
+    assert len(loops) == 3
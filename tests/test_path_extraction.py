@@ -0,0 +1,38 @@
+from src.tools.path_extraction import cross_check, extract_path_mentions, normalize_path
+
+def test_extract_path_mentions_normalizes_and_skips_urls():
+    text = (
+        "See ./src/nodes/judges.py, `/src/graph.py` and evidence\\_aggregator.py. "
+        "Code at https://github.com/org/repo/blob/main/setup.py and tools in src/tools/. "
+        "Version 1.2.3 and and/or are not paths."
+    )
+
+    mentions = extract_path_mentions(text)
+
+    assert mentions == ["src/nodes/judges.py", "src/graph.py", "evidence_aggregator.py", "src/tools/"]
+
+def test_cross_check_reports_bare_script_names_as_unverified():
+    text = "Built on Node.js and Vue.js; entry point is app.js, UI in src/react.js."
+    mentions = extract_path_mentions(text)
+
+    result = cross_check(mentions, {"app.js", "src/ui.js"})
+
+    assert mentions == ["Node.js", "Vue.js", "app.js", "src/react.js"]
+    assert result["verified"] == ["app.js"]
+    # Library names can't be told apart from files by name, so they aren't called missing
+    assert result["unverified"] == ["Node.js", "Vue.js"]
+    assert result["missing"] == ["src/react.js"]
+
+def test_normalize_path():
+    assert normalize_path("./src\\nodes\\judges.py") == "src/nodes/judges.py"
+    assert normalize_path("/rubric/rubric.json") == "rubric/rubric.json"
+
+def test_cross_check_resolves_partial_paths_and_directories():
+    manifest = {"src/graph.py", "src/nodes/judges.py", "src/state.py", "tests/state.py"}
+    mentions = ["src/graph.py", "judges.py", "nodes/", "state.py", "src/missing.py"]
+
+    result = cross_check(mentions, manifest)
+
+    assert result["verified"] == ["src/graph.py", "judges.py -> src/nodes/judges.py", "nodes/ -> src/nodes/"]
+    assert result["missing"] == ["src/missing.py"]
+    assert result["ambiguous"] == ["state.py -> src/state.py | tests/state.py"]
@@ -0,0 +1,38 @@
+import fitz
+from src.tools.pdf_conversion import fast_text, page_count, page_ranges
+
+def _pdf(tmp_path, pages):
+    doc = fitz.open()
+    for text in pages:
+        doc.new_page().insert_text((72, 72), text)
+    path = tmp_path / "report.pdf"
+    doc.save(str(path))
+    return str(path)
+
+def test_page_ranges_cover_document_in_order():
+    assert page_ranges(20, 8) == [(1, 8), (9, 16), (17, 20)]
+    assert page_ranges(3, 8) == [(1, 3)]
+
+def test_fast_text_extracts_every_page(tmp_path):
+    path = _pdf(tmp_path, ["StateGraph wiring", "", "Judges debate"])
+
+    text = fast_text(path)
+
+    assert page_count(path) == 3
+    assert "## Page 1" in text and "StateGraph wiring" in text
+    assert "## Page 3" in text and "Judges debate" in text
+    assert "## Page 2" not in text
+
+def test_worker_converter_is_built_once_and_reused(monkeypatch):
+    from unittest.mock import patch
+    from src.tools import pdf_conversion
+
+    monkeypatch.setattr(pdf_conversion, "_worker_converter", None)
+    with patch("docling.document_converter.DocumentConverter") as converter_cls:
+        converter_cls.return_value.convert.return_value.document.export_to_markdown.return_value = "md"
+        for first, last in [(1, 8), (9, 16), (17, 20)]:
+            assert pdf_conversion._convert_range("r.pdf", first, last)[:2] == (first, "md")
+
+    converter_cls.assert_called_once()
+    converter_cls.return_value.initialize_pipeline.assert_called_once()
+    assert converter_cls.return_value.convert.call_count == 3
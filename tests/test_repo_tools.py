@@ -1,7 +1,8 @@
 import pytest
 from unittest.mock import patch, MagicMock
 from pathlib import Path
-from src.tools.repo_tools import clone_repository, list_files, read_file, run_git_log, grep_search, cleanup_temp_dirs, _active_temp_dirs
+from src.tools.repo_tools import clone_repository, list_files, read_file, run_git_log, grep_search, cleanup_temp_dirs
+from src.tools.workspace import get_workspace
 
 def test_clone_repository_success():
     with patch("subprocess.run") as mock_run:
@@ -10,10 +11,21 @@ def test_clone_repository_success():
         repo_url = "https://github.com/example/repo.git"
         result = clone_repository.invoke({"repo_url": repo_url})
         
-        mock_run.assert_called_once()
+        # The clone, then reading the commit it checked out
+        assert [c[0][0][1] for c in mock_run.call_args_list] == ["clone", "-C"]
         assert not result.startswith("Error")
+        assert Path(result) in get_workspace().dirs(kind="repo")
+        cleanup_temp_dirs()
+        assert len(get_workspace().dirs(kind="repo")) == 0
+
+def test_clone_repository_reuses_checkout_within_audit():
+    with patch("subprocess.run") as mock_run:
+        first = clone_repository.invoke({"repo_url": "https://github.com/example/repo.git"})
+        second = clone_repository.invoke({"repo_url": "https://github.com/example/repo.git"})
+
+        assert first == second
+        assert [c[0][0][1] for c in mock_run.call_args_list].count("clone") == 1
         cleanup_temp_dirs()
-        assert len(_active_temp_dirs) == 0
 
 def test_clone_repository_failure():
     with patch("subprocess.run") as mock_run:
@@ -21,7 +33,8 @@ def test_clone_repository_failure():
         result = clone_repository.invoke({"repo_url": "test"})
         
         assert result.startswith("Error cloning repository")
-        cleanup_temp_dirs()
+        # A failed clone must not leave a directory registered
+        assert len(get_workspace().dirs(kind="repo")) == 0
 
 def test_list_files(tmp_path):
     # Create some mock files
@@ -63,3 +76,28 @@ def test_grep_search_success():
         
         result = grep_search.invoke({"repo_path": "/fake/path", "pattern": "def"})
         assert result == "file.py: def test():\n"
+
+def test_clone_records_commit_of_working_clone(tmp_path, monkeypatch):
+    import subprocess
+    from src.tools.repo_tools import cloned_commit
+    from src.tools.workspace import audit_scope, release_workspace
+    monkeypatch.setenv("AUDITOR_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.delenv("AUDITOR_CLONE_CACHE", raising=False)
+    origin = tmp_path / "origin"
+    origin.mkdir()
+    git = ["git", "-C", str(origin), "-c", "user.name=t", "-c", "user.email=t@example.com"]
+    subprocess.run(["git", "init", "-q", str(origin)], check=True)
+    (origin / "main.py").write_text("print('hi')\n")
+    subprocess.run(git + ["add", "main.py"], check=True)
+    subprocess.run(git + ["commit", "-qm", "init"], check=True)
+    head = subprocess.run(git + ["rev-parse", "HEAD"], check=True, capture_output=True, text=True).stdout.strip()
+
+    with audit_scope("commit_audit", holder="RepoInvestigator"):
+        assert cloned_commit(str(origin)) is None
+        path = clone_repository.invoke({"repo_url": str(origin)})
+        assert not path.startswith("Error")
+        # Later commits upstream don't change what this audit saw
+        (origin / "main.py").write_text("print('bye')\n")
+        subprocess.run(git + ["commit", "-qam", "later"], check=True)
+        assert cloned_commit(str(origin)) == head
+    release_workspace("commit_audit")
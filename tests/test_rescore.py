@@ -0,0 +1,147 @@
+import json
+import pytest
+from unittest.mock import patch
+from src.batch import _serialize_state
+from src.nodes.justice import build_report, template_summary
+from src.rescore import find_state_files, rescore_audits, rescore_store
+from src.state import Evidence, JudicialOpinion
+from src.synthesis import synthesize
+
+DIMENSIONS = [
+    {"id": "graph_orchestration", "name": "Graph", "target_artifact": "github_repo"},
+    {"id": "report_accuracy", "name": "Report", "target_artifact": "pdf_report"},
+]
+
+def _write_audit(root, audit_id, techlead_score=5):
+    opinions = [
+        JudicialOpinion(judge="Prosecutor", criterion_id="graph_orchestration", score=2, argument="Weak", cited_evidence=[]),
+        JudicialOpinion(judge="Defense", criterion_id="graph_orchestration", score=3, argument="Fine", cited_evidence=[]),
+        JudicialOpinion(judge="TechLead", criterion_id="graph_orchestration", score=techlead_score, argument="Modular", cited_evidence=[]),
+        JudicialOpinion(judge="Defense", criterion_id="report_accuracy", score=4, argument="Accurate", cited_evidence=[]),
+    ]
+    evidences = {"report_accuracy": [Evidence(goal="g", found=True, location="x", rationale="r", confidence=1.0)]}
+    results = synthesize(DIMENSIONS, opinions, evidences)
+    state = {
+        "repo_url": f"https://github.com/org/{audit_id}", "pdf_path": "r.pdf", "rubric_dimensions": DIMENSIONS,
+        "evidences": evidences, "opinions": opinions, "agent_metrics": {},
+        "final_report": build_report(f"https://github.com/org/{audit_id}", results, "LLM summary"),
+    }
+    job_dir = root / audit_id
+    job_dir.mkdir(parents=True)
+    (job_dir / "state.json").write_text(json.dumps(_serialize_state(state)), encoding="utf-8")
+    return job_dir / "state.json"
+
+def test_rescore_applies_new_rubric_without_llm(tmp_path):
+    paths = [_write_audit(tmp_path / "batch", f"a{i}") for i in range(3)]
+    rubric = tmp_path / "rubric.json"
+    # This term the graph criterion is judged on the report: no Tech Lead weighting
+    new_dims = [dict(DIMENSIONS[0], target_artifact="pdf_report"), DIMENSIONS[1]]
+    rubric.write_text(json.dumps({"dimensions": new_dims}), encoding="utf-8")
+
+    with patch("src.nodes.justice.get_llm") as mock_get_llm:
+        outcomes = rescore_audits(find_state_files([str(tmp_path / "batch")]), rubric_path=str(rubric))
+
+    mock_get_llm.assert_not_called()
+    assert [o.audit_id for o in outcomes] == ["a0", "a1", "a2"]
+    assert outcomes[0].changed_dimensions == ["graph_orchestration"]
+    assert outcomes[0].old_overall_score == 4.0 and outcomes[0].new_overall_score == 3.5
+    state = json.loads(paths[0].read_text(encoding="utf-8"))
+    assert state["final_report"]["criteria"][0]["final_score"] == 3
+    assert state["rubric_dimensions"][0]["target_artifact"] == "pdf_report"
+    assert state["final_report"]["executive_summary"].startswith("Overall Score: 3.50/5.0")
+    assert "`3/5`" in (paths[0].parent / "report.md").read_text(encoding="utf-8")
+
+def test_rescore_keeps_summary_and_writes_elsewhere(tmp_path):
+    path = _write_audit(tmp_path / "batch", "a0")
+    before = path.read_text(encoding="utf-8")
+
+    outcomes = rescore_audits([path], summary="keep", output_dir=str(tmp_path / "out"))
+
+    assert outcomes[0].changed_dimensions == []
+    assert path.read_text(encoding="utf-8") == before
+    rewritten = json.loads((tmp_path / "out" / "a0" / "state.json").read_text(encoding="utf-8"))
+    assert rewritten["final_report"]["executive_summary"] == "LLM summary"
+
+def test_rescore_reports_unreadable_state(tmp_path):
+    good = _write_audit(tmp_path, "good")
+    bad = tmp_path / "bad" / "state.json"
+    bad.parent.mkdir()
+    bad.write_text("{not json", encoding="utf-8")
+
+    outcomes = rescore_audits([bad, good])
+
+    assert outcomes[0].error.startswith("JSONDecodeError")
+    assert outcomes[1].error is None
+
+def test_rescore_rejects_unknown_summary_mode(tmp_path):
+    with pytest.raises(ValueError):
+        rescore_audits([], summary="fancy")
+
+def test_template_summary_names_strengths_and_risks():
+    results = synthesize(DIMENSIONS, [
+        JudicialOpinion(judge="Defense", criterion_id="graph_orchestration", score=5, argument="", cited_evidence=[]),
+        JudicialOpinion(judge="Defense", criterion_id="report_accuracy", score=1, argument="", cited_evidence=[]),
+    ], {})
+
+    summary = template_summary(3.0, results)
+
+    assert "Strongest areas: Graph." in summary
+    assert "Critical risk areas: Report." in summary
+
+def test_rescore_updates_audits_in_results_store(tmp_path):
+    from src.results_store import ResultsStore
+    from src.state import AuditReport
+
+    paths = [_write_audit(tmp_path / "batch", f"a{i}") for i in range(2)]
+    store = ResultsStore(tmp_path / "results.db")
+    old = AuditReport.model_validate(json.loads(paths[0].read_text(encoding="utf-8"))["final_report"])
+    store.save_audit("a0", old, commit_sha="abc123", created_at=1000.0)
+    rubric = tmp_path / "rubric.json"
+    rubric.write_text(json.dumps({"dimensions": [dict(DIMENSIONS[0], target_artifact="pdf_report"), DIMENSIONS[1]]}),
+                      encoding="utf-8")
+
+    rescore_audits(paths, rubric_path=str(rubric), store=store)
+
+    assert store.load_report("a0").overall_score == 3.5
+    assert store.commit_of("a0") == "abc123"
+    # Still in its original cohort
+    assert [r["audit_id"] for r in store.find_audits(since=500.0)] == ["a0"]
+    assert store.find_audits(since=2000.0) == []
+    assert store.load_evidences("a0")["report_accuracy"][0].location == "x"
+    assert store.load_report("a1") is None  # only audits already stored are updated
+
+def test_rescore_from_store_without_state_files(tmp_path):
+    from src.results_store import ResultsStore
+    from src.state import AuditReport
+
+    store = ResultsStore(tmp_path / "results.db")
+    for i, created_at in enumerate([1000.0, 3000.0]):
+        path = _write_audit(tmp_path / "batch", f"a{i}")
+        data = json.loads(path.read_text(encoding="utf-8"))
+        store.save_audit(f"a{i}", AuditReport.model_validate(data["final_report"]),
+                         {"report_accuracy": [Evidence.model_validate(data["evidences"]["report_accuracy"][0])]},
+                         commit_sha=f"sha{i}", pdf_path="r.pdf", created_at=created_at)
+    rubric = tmp_path / "rubric.json"
+    rubric.write_text(json.dumps({"dimensions": [dict(DIMENSIONS[0], target_artifact="pdf_report"), DIMENSIONS[1]]}),
+                      encoding="utf-8")
+
+    outcomes = rescore_store(store, str(rubric), since=2000.0)
+
+    assert [(o.audit_id, o.old_overall_score, o.new_overall_score) for o in outcomes] == [("a1", 4.0, 3.5)]
+    assert outcomes[0].changed_dimensions == ["graph_orchestration"] and outcomes[0].state_path is None
+    assert store.load_report("a1").overall_score == 3.5
+    assert store.load_report("a0").overall_score == 4.0  # before --since
+    assert store.audit_info("a1") == {"repo_url": "https://github.com/org/a1", "commit_sha": "sha1",
+                                      "pdf_path": "r.pdf", "created_at": 3000.0}
+    assert store.load_evidences("a1")["report_accuracy"][0].location == "x"
+
+def test_rescore_records_failed_write_and_continues(tmp_path):
+    paths = [_write_audit(tmp_path / "batch", f"a{i}") for i in range(2)]
+    data = json.loads(paths[0].read_text(encoding="utf-8"))
+    data["final_report"]["overall_score"] = "not a score"
+    paths[0].write_text(json.dumps(data), encoding="utf-8")
+
+    outcomes = rescore_audits(paths)
+
+    assert outcomes[0].error.startswith("ValidationError")
+    assert outcomes[1].error is None and outcomes[1].new_overall_score == 4.0
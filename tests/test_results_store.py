@@ -0,0 +1,91 @@
+import threading
+import pytest
+from src.results_store import ResultsStore, get_results_store
+from src.state import AuditReport, CriterionResult, Evidence, JudicialOpinion
+
+def make_report(repo_url, scores, summary="Summary"):
+    criteria = [
+        CriterionResult(
+            dimension_id=dim_id, dimension_name=dim_id.title(), final_score=score,
+            judge_opinions=[
+                JudicialOpinion(judge="Prosecutor", criterion_id=dim_id, score=score, argument=f"{dim_id} p", cited_evidence=["a.py"]),
+                JudicialOpinion(judge="Defense", criterion_id=dim_id, score=min(5, score + 1), argument=f"{dim_id} d", cited_evidence=[],
+                                placeholder=score == 1),
+            ],
+            dissent_summary="DISSENT" if score == 1 else None,
+            remediation=f"Fix {dim_id}",
+        )
+        for dim_id, score in scores.items()
+    ]
+    overall = sum(scores.values()) / len(scores)
+    return AuditReport(repo_url=repo_url, executive_summary=summary, overall_score=overall, criteria=criteria,
+                       remediation_plan="\n".join(f"- Fix {d}" for d, s in scores.items() if s < 4))
+
+@pytest.fixture
+def store(tmp_path):
+    return ResultsStore(tmp_path / "results.db")
+
+def test_round_trip_and_markdown(store):
+    report = make_report("https://github.com/org/a", {"graph": 4, "security": 1})
+    evidences = {"graph": [Evidence(goal="g", found=True, content="StateGraph", location="src/graph.py",
+                                    rationale="r", confidence=0.9)]}
+
+    store.save_audit("a", report, evidences, commit_sha="abc123", pdf_path="a.pdf")
+
+    assert store.load_report("a") == report
+    assert store.load_evidences("a") == evidences
+    assert store.commit_of("a") == "abc123"
+    markdown = store.render_markdown("a")
+    assert "# Judicial Audit Report: https://github.com/org/a" in markdown and "DISSENT" in markdown
+    assert store.load_report("missing") is None and store.render_markdown("missing") is None
+
+def test_save_replaces_previous_rows(store):
+    store.save_audit("a", make_report("r", {"graph": 2, "security": 3}),
+                     {"graph": [Evidence(goal="g", found=False, location="x", rationale="r", confidence=1.0)]},
+                     created_at=1000.0)
+    store.save_audit("a", make_report("r", {"graph": 5}))
+
+    assert [c.final_score for c in store.load_report("a").criteria] == [5]
+    assert store.load_evidences("a") == {}
+    # A plain replace is a new audit run, so it's dated now
+    assert store.audit_info("a")["created_at"] > 1000.0
+
+def test_find_filters_by_dimension_score_repo_and_date(store):
+    store.save_audit("old", make_report("r1", {"graph": 1}), created_at=1000)
+    store.save_audit("low", make_report("r2", {"graph": 2, "security": 5}), created_at=2000)
+    store.save_audit("high", make_report("r2", {"graph": 5, "security": 1}), created_at=3000)
+
+    assert [r["audit_id"] for r in store.find_audits(dimension_id="graph", max_score=2)] == ["old", "low"]
+    assert [r["audit_id"] for r in store.find_audits(dimension_id="graph", max_score=2, since=1500)] == ["low"]
+    assert [r["audit_id"] for r in store.find_audits(min_score=3)] == ["high", "low"]  # overall 3.0, 3.5
+    assert {r["audit_id"] for r in store.find_audits(repo_url="r2")} == {"low", "high"}
+
+def test_dimension_summary_and_percentiles(store):
+    for i, score in enumerate([1, 2, 3, 4, 5]):
+        store.save_audit(f"a{i}", make_report("r", {"graph": score, "security": 5 - score + 1}))
+
+    summary = {row["dimension_id"]: row for row in store.dimension_summary()}
+    assert summary["graph"] == {"dimension_id": "graph", "audits": 5, "mean": 3.0, "min": 1, "max": 5}
+    assert store.percentiles(dimension_id="graph", q=(0, 50, 100)) == {"p0": 1.0, "p50": 3.0, "p100": 5.0}
+    assert store.percentile_rank("a3", dimension_id="graph") == 80.0
+    assert store.percentile_rank("missing") is None
+    assert store.percentiles(since=10 ** 12) == {}
+
+def test_concurrent_writers(store):
+    def save(i):
+        store.save_audit(f"a{i}", make_report("r", {"graph": i % 5 + 1}))
+
+    threads = [threading.Thread(target=save, args=(i,)) for i in range(16)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(store.find_audits()) == 16
+    assert sum(row["audits"] for row in store.dimension_summary()) == 16
+
+def test_get_results_store_uses_env_path(tmp_path, monkeypatch):
+    monkeypatch.setenv("AUDITOR_RESULTS_DB", str(tmp_path / "db" / "results.db"))
+    store = get_results_store()
+    assert store is get_results_store()
+    assert store.db_path == (tmp_path / "db" / "results.db").resolve() and store.db_path.exists()
@@ -0,0 +1,52 @@
+import numpy as np
+from src.tools.retrieval import BM25Index, HybridIndex, tokenize, top_k
+
+def _unit(rows):
+    rows = np.asarray(rows, dtype=np.float32)
+    return rows / np.linalg.norm(rows, axis=1, keepdims=True)
+
+def test_tokenize_keeps_paths_and_their_parts():
+    tokens = tokenize("See src/nodes/judges.py.")
+    assert "src/nodes/judges.py" in tokens
+    assert "judges" in tokens
+
+def test_top_k_matches_full_sort():
+    scores = np.random.default_rng(0).random(1000).astype(np.float32)
+    assert top_k(scores, 10).tolist() == np.argsort(-scores)[:10].tolist()
+    assert top_k(scores[:3], 10).tolist() == np.argsort(-scores[:3]).tolist()
+
+def test_bm25_finds_exact_identifier():
+    chunks = ["The judges debate.", "Wiring lives in src/graph.py.", "Nothing here."]
+    scores = BM25Index(chunks).scores("where is src/graph.py")
+    assert int(np.argmax(scores)) == 1
+
+def test_hybrid_search_recovers_keyword_match_missed_by_dense():
+    chunks = ["general architecture overview", "StateGraph is built in src/graph.py", "unrelated"]
+    vectors = _unit([[1, 0], [0, 1], [0.9, 0.1]])
+    index = HybridIndex(chunks, vectors.astype(np.float16))
+
+    # Dense alone would rank chunk 0 first; the exact path pulls chunk 1 in
+    hits = index.search("src/graph.py", query_vector=np.array([1.0, 0.0]), k=2)
+
+    assert 1 in hits
+
+def test_mmr_drops_near_duplicates():
+    chunks = ["judge opinion one", "judge opinion one", "judge verdict two"]
+    vectors = _unit([[1, 0], [1, 0], [0.6, 0.8]])
+    index = HybridIndex(chunks, vectors)
+
+    hits = index.search("judge opinion", query_vector=np.array([1.0, 0.0]), k=2, mmr_lambda=0.3)
+
+    assert sorted(hits) != [0, 1]
+    assert 2 in hits
+
+def test_search_many_matches_individual_searches():
+    rng = np.random.default_rng(1)
+    chunks = [f"chunk {i} about topic{i % 7}" for i in range(200)]
+    index = HybridIndex(chunks, _unit(rng.standard_normal((200, 16))))
+    queries = ["topic3", "topic5 chunk 12", "nothing"]
+    vectors = rng.standard_normal((3, 16))
+
+    batched = index.search_many(queries, vectors, k=4)
+
+    assert batched == [index.search(q, v, k=4) for q, v in zip(queries, vectors)]
@@ -0,0 +1,109 @@
+import random
+import numpy as np
+from src.state import CriterionResult, Evidence, JudicialOpinion
+from src.synthesis import apply_rules, ScoreMatrix, synthesize, synthesize_many
+
+def _reference(rubric_dimensions, opinions, evidences):
+    """The per-dimension loop synthesize_verdicts used before the score matrix, kept as the oracle."""
+    results = []
+    for dimension in rubric_dimensions:
+        dim_id = dimension.get("id")
+        dim_opinions = [op for op in opinions if op.criterion_id == dim_id]
+        if not dim_opinions:
+            continue
+        prosecutor_op = next((op for op in dim_opinions if op.judge == "Prosecutor"), None)
+        defense_op = next((op for op in dim_opinions if op.judge == "Defense"), None)
+        techlead_op = next((op for op in dim_opinions if op.judge == "TechLead"), None)
+        scores = [op.score for op in dim_opinions]
+        final_score = sum(scores) / len(scores)
+        applied_rules = []
+        is_sec_flaw = False
+        if prosecutor_op and prosecutor_op.score <= 2:
+            is_sec_flaw = any(w in prosecutor_op.argument.lower() for w in ["security", "flaw", "vulnerability", "injection", "unsanitized"])
+        if defense_op and defense_op.score >= 4:
+            if any(ev.found is False for ev in evidences.get(dim_id, []) if ev.confidence > 0.8):
+                final_score = max(1.0, final_score - 1.5)
+                applied_rules.append("Rule of Evidence: Defense overruled for evidence hallucination.")
+        if dimension.get("target_artifact") == "github_repo" and techlead_op and techlead_op.score >= 4:
+            final_score = (final_score + techlead_op.score) / 2
+            applied_rules.append("Rule of Functionality: Tech Lead confirms modular architecture.")
+        if is_sec_flaw:
+            final_score = min(final_score, 3.0)
+            applied_rules.append("Rule of Security: Flaw detected, score capped at 3.")
+        score_variance = max(scores) - min(scores)
+        dissent_summary = None
+        if score_variance >= 2:
+            dissent_summary = f"DISSENT DETECTED: Variance of {score_variance} between {prosecutor_op.judge if prosecutor_op else 'Judges'} and {defense_op.judge if defense_op else 'Judges'}."
+            if applied_rules:
+                dissent_summary += " Resolved by: " + "; ".join(applied_rules)
+        remediation = f"Fix findings in {dim_id}."
+        if prosecutor_op and prosecutor_op.score < 3:
+            remediation = f"Address Critical Lens findings: {prosecutor_op.argument[:200]}..."
+        results.append(CriterionResult(dimension_id=dim_id, dimension_name=dimension.get("name", dim_id),
+                                       final_score=int(round(final_score)), judge_opinions=dim_opinions,
+                                       dissent_summary=dissent_summary, remediation=remediation))
+    return results
+
+def _random_audit(rng):
+    dims = [{"id": f"d{i}", "name": f"Dim {i}", "target_artifact": rng.choice(["github_repo", "pdf_report"])}
+            for i in range(rng.randint(0, 6))]
+    arguments = ["Solid work.", "Unsanitized shell injection found.", "A security flaw in tools.", "x" * 300]
+    opinions = []
+    for dim in dims + [{"id": "not_in_rubric"}]:
+        for judge in ("Prosecutor", "Defense", "TechLead"):
+            # Missing judges and duplicate opinions (e.g. retried judges) both happen
+            for _ in range(rng.choice([0, 1, 1, 1, 2])):
+                opinions.append(JudicialOpinion(judge=judge, criterion_id=dim["id"], score=rng.randint(1, 5),
+                                                argument=rng.choice(arguments), cited_evidence=[]))
+    rng.shuffle(opinions)
+    evidences = {dim["id"]: [Evidence(goal="g", found=rng.random() < 0.6, location="x", rationale="r",
+                                      confidence=rng.choice([0.5, 0.9, 1.0]))] for dim in dims if rng.random() < 0.8}
+    return dims, opinions, evidences
+
+def test_matches_reference_synthesis_exactly():
+    rng = random.Random(7)
+    audits = [_random_audit(rng) for _ in range(300)]
+
+    batched = synthesize_many(audits)
+
+    for audit, results in zip(audits, batched):
+        expected = [r.model_dump() for r in _reference(*audit)]
+        assert [r.model_dump() for r in results] == expected
+        assert [r.model_dump() for r in synthesize(*audit)] == expected
+
+def test_overall_scores_match_mean_of_criteria():
+    rng = random.Random(3)
+    audits = [_random_audit(rng) for _ in range(50)]
+
+    overall = apply_rules(ScoreMatrix(audits)).overall_scores()
+
+    for audit, score in zip(audits, overall):
+        results = _reference(*audit)
+        expected = sum(c.final_score for c in results) / len(results) if results else 0.0
+        assert np.isclose(score, expected)
+
+def test_duplicate_rubric_ids_each_get_a_result():
+    dims = [{"id": "d", "name": "A"}, {"id": "d", "name": "B"}]
+    opinions = [JudicialOpinion(judge="Defense", criterion_id="d", score=4, argument="ok", cited_evidence=[])]
+
+    assert [r.dimension_name for r in synthesize(dims, opinions, {})] == ["A", "B"]
+
+def test_timed_out_judge_does_not_vote():
+    dims = [{"id": "graph", "name": "Graph", "target_artifact": "github_repo"},
+            {"id": "docs", "name": "Docs", "target_artifact": "pdf_report"}]
+    timed_out = JudicialOpinion(judge="TechLead", criterion_id="graph", score=3, argument="DEADLINE_EXCEEDED: ...",
+                                cited_evidence=[], placeholder=True)
+    opinions = [
+        JudicialOpinion(judge="Prosecutor", criterion_id="graph", score=5, argument="Solid", cited_evidence=[]),
+        JudicialOpinion(judge="Defense", criterion_id="graph", score=5, argument="Great", cited_evidence=[]),
+        timed_out,
+        JudicialOpinion(judge="Prosecutor", criterion_id="docs", score=1, argument="x", cited_evidence=[], placeholder=True),
+    ]
+
+    graph, docs = synthesize(dims, opinions, {})
+
+    # Counted as a vote, the placeholder would pull 5 down to 4 and, as the TechLead, trigger the Functionality rule
+    assert graph.final_score == 5 and graph.dissent_summary is None
+    assert timed_out in graph.judge_opinions
+    # Only placeholders: neutral score, still reported
+    assert docs.final_score == 3 and docs.dissent_summary is None and len(docs.judge_opinions) == 1
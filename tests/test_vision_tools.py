@@ -2,46 +2,106 @@ import pytest
 import os
 from unittest.mock import patch, MagicMock
 from pathlib import Path
-from src.tools.vision_tools import extract_images_from_pdf, analyze_image_with_vision, cleanup_vision_images, _active_vision_dirs
+import numpy as np
+from src.tools.vision_tools import (
+    analyze_image_with_vision, cleanup_vision_images, extract_images_from_pdf, extract_pdf_images, get_extracted_image,
+    image_entropy,
+)
+from src.tools import vision_tools
+from src.tools.vision_tools import VisionService, analyze_pdf_images, find_diagrams
+from src.tools.workspace import get_workspace
+
+@pytest.fixture(autouse=True)
+def _isolated_vision(tmp_path, monkeypatch):
+    # Fresh client per test and no answers cached across tests
+    monkeypatch.setenv("AUDITOR_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(vision_tools, "_services", {})
+
+class _CountingClient:
+    def __init__(self, answer="A diagram.", delay=0.0):
+        import threading
+        self.answer, self.delay = answer, delay
+        self.calls, self.active, self.peak = [], 0, 0
+        self._lock = threading.Lock()
+
+    def chat_completion(self, **kwargs):
+        import time
+        with self._lock:
+            self.calls.append(kwargs)
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+        response = MagicMock()
+        response.choices = [MagicMock()]
+        response.choices[0].message.content = self.answer
+        return response
+
+def _settings(**overrides):
+    settings = {"model": "vlm", "concurrency": 2, "requests_per_minute": 0, "max_tokens": 50}
+    settings.update(overrides)
+    return settings
 
 def test_extract_images_from_pdf_not_found():
     result = extract_images_from_pdf.invoke({"pdf_path": "/fake/not/exist.pdf"})
     assert result.startswith("Error: PDF not found")
 
-@patch("src.tools.vision_tools.fitz.open")
-def test_extract_images_from_pdf_success(mock_fitz_open, tmp_path):
-    # Create an actual dummy file so the tool thinks it exists
-    fake_pdf = tmp_path / "fake.pdf"
-    fake_pdf.touch()
-    
-    mock_doc = MagicMock()
-    mock_page = MagicMock()
-    # Return one fake image on the first page
-    mock_page.get_images.return_value = [("xref_mock",)]
-    mock_doc.extract_image.return_value = {"image": b"fake_byte_data", "ext": "png"}
-    
-    # Doc has 1 page
-    mock_doc.__len__.return_value = 1
-    mock_doc.__getitem__.return_value = mock_page
-    
-    mock_fitz_open.return_value = mock_doc
-    
-    result = extract_images_from_pdf.invoke({"pdf_path": str(fake_pdf)})
-    
-    assert "page_1_img_1.png" in result
-    assert "auditor_vision_" in result
-    
-    # Verify cleanup works
-    import src.tools.vision_tools
-    assert len(src.tools.vision_tools._active_vision_dirs) > 0
+def _make_pdf(path, pages=3):
+    import fitz
+    rng = np.random.default_rng(0)
+    def _noise(w, h):
+        return fitz.Pixmap(fitz.csRGB, w, h, rng.integers(0, 255, w * h * 3, dtype=np.uint8).tobytes(), False)
+    flat = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 200, 200), False)
+    flat.clear_with(200)
+    icon, diagram, photo = _noise(16, 16), _noise(400, 300).tobytes("png"), _noise(2000, 1000).tobytes("jpg")
+    doc = fitz.open()
+    for _ in range(pages):
+        page = doc.new_page()
+        page.insert_image(fitz.Rect(0, 0, 50, 50), pixmap=flat)
+        page.insert_image(fitz.Rect(0, 60, 20, 80), pixmap=icon)
+        # Same bytes inserted on every page: a new xref each time, one content hash
+        page.insert_image(fitz.Rect(100, 100, 300, 250), stream=diagram)
+    page.insert_image(fitz.Rect(0, 300, 500, 550), stream=photo)
+    doc.save(str(path))
+
+def test_extract_pdf_images_dedups_filters_and_downsamples(tmp_path):
+    pdf = tmp_path / "report.pdf"
+    _make_pdf(pdf)
+
+    images = extract_pdf_images(str(pdf), {"min_side": 64, "min_entropy": 1.5, "max_side": 1000})
+
+    assert [(i.page, i.width, i.height, i.mime_type) for i in images] == [
+        (1, 400, 300, "image/png"),   # diagram once, not once per page; flat fill and icon dropped
+        (3, 1000, 500, "image/jpeg"),  # downsampled, still JPEG
+    ]
+    assert images[1].data[:2] == b"\xff\xd8"
+
+def test_extract_images_from_pdf_keeps_images_in_memory(tmp_path):
+    pdf = tmp_path / "report.pdf"
+    _make_pdf(pdf, pages=1)
+
+    result = extract_images_from_pdf.invoke({"pdf_path": str(pdf)})
+
+    image_id = result.split()[0]
+    assert image_id.startswith("img-")
+    assert "page 1, 400x300, image/png" in result
+    assert get_extracted_image(image_id).data[:4] == b"\x89PNG"
+    assert get_workspace().dirs(kind="vision") == []
     cleanup_vision_images()
-    assert len(src.tools.vision_tools._active_vision_dirs) == 0
+    assert get_extracted_image(image_id) is None
+
+def test_image_entropy_separates_flat_from_detailed():
+    flat = bytes([200]) * (64 * 64 * 3)
+    noise = np.random.default_rng(0).integers(0, 255, 64 * 64 * 3, dtype=np.uint8).tobytes()
+    assert image_entropy(flat, 64, 64, 3) == 0.0
+    assert image_entropy(noise, 64, 64, 3) > 5
 
 def test_analyze_image_with_vision_not_found():
     result = analyze_image_with_vision.invoke({"image_path": "/fake/image.png", "prompt": "test"})
     assert result.startswith("Error: Image not found")
 
-@patch("src.tools.vision_tools.InferenceClient")
+@patch("huggingface_hub.InferenceClient")
 def test_analyze_image_with_vision_success(mock_hf_client, tmp_path, monkeypatch):
     # Set a fake API key
     monkeypatch.setenv("HF_TOKEN", "fake_key")
@@ -72,3 +132,93 @@ def test_analyze_image_with_vision_missing_key(tmp_path, monkeypatch):
     
     result = analyze_image_with_vision.invoke({"image_path": str(fake_img), "prompt": "test"})
     assert result.startswith("Error: HUGGING_FACE_KEY not found")
+
+
+@patch("huggingface_hub.InferenceClient")
+def test_analyze_extracted_image_sends_its_mime_type(mock_hf_client, tmp_path, monkeypatch):
+    monkeypatch.setenv("HF_TOKEN", "fake_key")
+    pdf = tmp_path / "report.pdf"
+    _make_pdf(pdf, pages=1)
+    image_id = extract_images_from_pdf.invoke({"pdf_path": str(pdf)}).split()[0]
+    sent = {}
+
+    class FakeClient:
+        def chat_completion(self, **kwargs):
+            sent.update(kwargs)
+            response = MagicMock()
+            response.choices = [MagicMock()]
+            response.choices[0].message.content = "A diagram."
+            return response
+
+    mock_hf_client.return_value = FakeClient()
+    result = analyze_image_with_vision.invoke({"image_path": image_id, "prompt": "Describe"})
+    cleanup_vision_images()
+
+    assert result == "A diagram."
+    assert sent["messages"][0]["content"][0]["image_url"]["url"].startswith("data:image/png;base64,")
+
+
+@patch("huggingface_hub.InferenceClient")
+def test_vision_service_reuses_client_and_caches_on_disk(mock_hf_client):
+    client = _CountingClient()
+    mock_hf_client.return_value = client
+    service = VisionService("key", _settings())
+
+    assert service.analyze(b"img", "image/png", "Describe") == "A diagram."
+    assert service.analyze(b"img", "image/png", "Describe") == "A diagram."
+    assert VisionService("key", _settings()).analyze(b"img", "image/png", "Describe") == "A diagram."
+    service.analyze(b"img", "image/png", "Other prompt")
+    VisionService("key", _settings(model="other-vlm")).analyze(b"img", "image/png", "Describe")
+
+    assert len(client.calls) == 3  # only new (image, prompt, model) triples reach the API
+    assert mock_hf_client.call_count == 2  # one client per service, not per call
+    assert service.cache_hits == 1
+
+@patch("huggingface_hub.InferenceClient")
+def test_vision_service_bounds_concurrency(mock_hf_client):
+    client = _CountingClient(delay=0.05)
+    mock_hf_client.return_value = client
+    service = VisionService("key", _settings(concurrency=2))
+    images = [vision_tools.ExtractedImage(image_id=f"img-{i}", page=1, width=1, height=1,
+                                          mime_type="image/png", data=bytes([i])) for i in range(6)]
+
+    results = service.analyze_many(images, "Describe")
+
+    assert [image.image_id for image, _ in results] == [f"img-{i}" for i in range(6)]
+    assert client.peak == 2
+
+def test_rate_limiter_spaces_requests():
+    import time
+    limiter = vision_tools._RateLimiter(requests_per_minute=1200)  # one every 50ms
+    start = time.monotonic()
+    for _ in range(3):
+        limiter.wait()
+    assert time.monotonic() - start >= 0.09
+
+@patch("huggingface_hub.InferenceClient")
+def test_analyze_pdf_images_sends_only_top_diagrams(mock_hf_client, tmp_path, monkeypatch):
+    from tests.test_diagram_detection import make_report
+    monkeypatch.setenv("HF_TOKEN", "fake_key")
+    monkeypatch.setenv("AUDITOR_VISION_RPM", "0")
+    client = _CountingClient()
+    mock_hf_client.return_value = client
+    pdf = tmp_path / "report.pdf"
+    make_report(pdf)
+
+    result = analyze_pdf_images.invoke({"pdf_path": str(pdf), "prompt": "Is this an architecture diagram?"})
+
+    assert len(client.calls) == 1  # the drawn diagram; not the logo, table or screenshot
+    assert "page 1, vector" in result and "Figure 1" in result
+    assert "lower-ranked regions not analyzed" in result
+
+def test_find_diagrams_lists_ranked_candidates_with_ids(tmp_path):
+    from tests.test_diagram_detection import make_report
+    pdf = tmp_path / "report.pdf"
+    make_report(pdf)
+
+    result = find_diagrams.invoke({"pdf_path": str(pdf)})
+
+    first = result.splitlines()[0]
+    assert first.startswith("1. fig-p1-") and "vector" in first
+    assert get_extracted_image(first.split()[1]).mime_type == "image/png"
+    cleanup_vision_images()
@@ -0,0 +1,87 @@
+import threading
+import pytest
+from src.tools.workspace import (
+    Workspace,
+    WorkspaceQuotaExceeded,
+    audit_scope,
+    get_workspace,
+    release_workspace,
+)
+
+def test_keyed_dir_is_shared_and_refcounted(tmp_path):
+    ws = Workspace("refcount")
+    populate_calls = []
+
+    with audit_scope("refcount", holder="A"):
+        first = ws.acquire_dir(kind="repo", key="url", populate=populate_calls.append)
+    with audit_scope("refcount", holder="B"):
+        second = ws.acquire_dir(kind="repo", key="url", populate=populate_calls.append)
+
+    assert first == second
+    assert len(populate_calls) == 1
+
+    ws.release_holder("A")
+    assert first.exists()
+    ws.release_holder("B")
+    assert not first.exists()
+    ws.cleanup()
+
+def test_release_workspace_only_touches_its_own_audit():
+    with audit_scope("audit_one") as ws_one:
+        dir_one = ws_one.acquire_dir(kind="repo")
+    with audit_scope("audit_two") as ws_two:
+        dir_two = ws_two.acquire_dir(kind="repo")
+
+    release_workspace("audit_one")
+
+    assert not dir_one.exists()
+    assert dir_two.exists()
+    release_workspace("audit_two")
+    assert not dir_two.exists()
+
+def test_holder_dirs_released_when_scope_exits():
+    with audit_scope("scoped", holder="RepoInvestigator") as ws:
+        path = ws.acquire_dir(kind="repo", key="url")
+        assert path.exists()
+    assert not path.exists()
+    release_workspace("scoped")
+
+def test_quota_exceeded_removes_new_dir():
+    ws = Workspace("quota", quota_bytes=10)
+
+    def _populate(path):
+        (path / "big.bin").write_bytes(b"x" * 100)
+
+    with pytest.raises(WorkspaceQuotaExceeded):
+        ws.acquire_dir(kind="repo", key="url", populate=_populate)
+
+    assert ws.dirs() == []
+    assert ws.usage_bytes() == 0
+    ws.cleanup()
+
+def test_concurrent_acquire_populates_once():
+    ws = Workspace("threads")
+    calls = []
+    barrier = threading.Barrier(8)
+
+    def _populate(path):
+        calls.append(path)
+
+    def _worker():
+        barrier.wait()
+        ws.acquire_dir(kind="repo", key="same-url", populate=_populate)
+
+    threads = [threading.Thread(target=_worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert len(ws.dirs()) == 1
+    ws.cleanup()
+
+def test_get_workspace_uses_current_audit():
+    with audit_scope("ctx_audit"):
+        assert get_workspace().audit_id == "ctx_audit"
+    release_workspace("ctx_audit")